@@ -9,13 +9,27 @@ python3 -m pip install -r requirements.txt
 # Create static directories
 mkdir -p static staticfiles
 
-# Make migrations
-python3 manage.py makemigrations
+# The module registry (Module.bundle_hash) must be current before bundles are installed
+python3 manage.py migrate module_engine
+
+# Install prebuilt module bundles (python manage.py build_module_bundle).
+# .bundles/ is not committed, so a fresh build extracts every bundle; the
+# install step is skipped for bundles whose hash is already recorded
+for bundle in bundles/*.zip; do
+    [ -e "$bundle" ] || continue
+    python3 manage.py install_module --bundle "$bundle" || exit 1
+done
+
+# Migrations are committed with each module (bundles ship theirs), so they
+# are only applied here; makemigrations would write into the extracted bundles
 python3 manage.py migrate
 
 # Collect static files
 python3 manage.py collectstatic --noinput
 
+# Pre-render public module pages into the static root
+python3 manage.py prerender_pages
+
 # Optional: Create superuser (you might want to handle this differently)
 # export DJANGO_SUPERUSER_PASSWORD=your_password
 # export DJANGO_SUPERUSER_EMAIL=admin@example.com
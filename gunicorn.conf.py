@@ -0,0 +1,44 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings.
+
+By default the application is preloaded: Django and every active module are
+imported and warmed once in the master, and workers are forked from it and
+share that memory copy-on-write. Set GUNICORN_PRELOAD=False to build the
+application separately in each worker.
+
+Rolling upgrades (ROLLING_UPGRADES=True) restart workers one at a time to load
+new module code. A preloaded worker is forked from the master's imports and
+never sees it, so preloading is off by default with rolling upgrades and the
+two cannot be combined.
+
+    gunicorn modular_django.wsgi
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+rolling_upgrades = os.environ.get('ROLLING_UPGRADES', 'False') == 'True'
+preload_app = os.environ.get('GUNICORN_PRELOAD', str(not rolling_upgrades)) == 'True'
+
+if preload_app and rolling_upgrades:
+    raise RuntimeError(
+        "ROLLING_UPGRADES=True requires GUNICORN_PRELOAD=False: "
+        "preloaded workers are forked from the master's code and cannot load an upgrade"
+    )
+
+# Tells modular_django.wsgi to warm up synchronously in the master
+os.environ['MODULE_PRELOAD'] = str(preload_app)
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        from module_engine.preload import prepare_fork
+        prepare_fork()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from module_engine.preload import after_fork
+        after_fork()
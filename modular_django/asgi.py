@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "modular_django.settings")
 
 application = get_asgi_application()
+
+# Prime active modules in the background; /modules/ready/ reports when done
+from module_engine.warmup import start_warm_up
+
+start_warm_up()
+
+# Report loaded module versions for rolling upgrades (ROLLING_UPGRADES)
+from module_engine.rolling import start_heartbeat
+
+start_heartbeat()
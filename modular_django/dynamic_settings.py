@@ -1,5 +1,6 @@
 """Dynamic settings loader for modular Django"""
 import importlib
+import os
 import sys
 
 def get_installed_modules():
@@ -20,4 +21,15 @@ def get_installed_modules():
     except Exception as e:
         # During initial setup/migrations, the Module model might not exist yet
         # In that case, return an empty list
-        return []
\ No newline at end of file
+        return []
+
+
+def get_available_modules(base_dir):
+    """
+    Get the module packages next to the project (those with a module_info.py).
+    Used to install every module while the test suite runs.
+    """
+    return sorted(
+        entry.name for entry in os.scandir(base_dir)
+        if entry.is_dir() and os.path.isfile(os.path.join(entry.path, 'module_info.py'))
+    )
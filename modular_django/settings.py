@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 import dj_database_url
 
@@ -27,6 +28,12 @@ INSTALLED_APPS = [
     # Dynamically installed modules will be added here
 ]
 
+# Modules installed from bundles (install_module --bundle) take precedence
+# over source packages of the same name
+MODULE_BUNDLE_ROOT = os.path.join(BASE_DIR, '.bundles')
+if os.path.isdir(MODULE_BUNDLE_ROOT) and MODULE_BUNDLE_ROOT not in sys.path:
+    sys.path.insert(0, MODULE_BUNDLE_ROOT)
+
 # Dynamically add installed modules from the database
 try:
     from modular_django.dynamic_settings import get_installed_modules
@@ -36,8 +43,64 @@ except (ImportError, ModuleNotFoundError):
     # During initial setup, this might fail
     INSTALLED_MODULES = []
 
-# Use database sessions instead of file-based
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Caches
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared by every worker on this host; see SESSION_ENGINE below
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SESSION_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'sessions')),
+    },
+}
+
+# Cache used by module_engine.cache handles: locmem, file or memcached.
+# Without MODULE_CACHE_URL the memcached backend falls back to local memory.
+MODULE_CACHE_BACKEND = os.environ.get('MODULE_CACHE_BACKEND', 'locmem')
+MODULE_CACHE_URL = os.environ.get('MODULE_CACHE_URL')
+
+if MODULE_CACHE_BACKEND == 'file':
+    CACHES['modules'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('MODULE_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'modules')),
+    }
+elif MODULE_CACHE_BACKEND == 'memcached' and MODULE_CACHE_URL:
+    CACHES['modules'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': MODULE_CACHE_URL.split(','),
+    }
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': MODULE_CACHE_URL.split(','),
+        'KEY_PREFIX': 'sessions',
+    }
+else:
+    CACHES['modules'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'modules',
+    }
+
+# Vercel instances share no disk, so a file cache would be per instance there
+if os.environ.get('VERCEL') and CACHES['sessions']['BACKEND'].endswith('FileBasedCache'):
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    }
+
+MODULE_CACHE_ALIAS = 'modules'
+
+# Database sessions served from the session cache, with expiry-only saves
+# coalesced into periodic batched writes. The cache is skipped while it is
+# per-process local memory (on Vercel without MODULE_CACHE_URL)
+SESSION_ENGINE = 'module_engine.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+# Sliding expiry: every request saves the session, which only moves the
+# expiry date and is written in the next batch
+SESSION_SAVE_EVERY_REQUEST = True
+# Seconds between batched expiry writes, and sessions per batched UPDATE
+SESSION_TOUCH_INTERVAL = 60
+SESSION_TOUCH_BATCH_SIZE = 500
 
 # Adjust cookie settings for Vercel
 SESSION_COOKIE_SECURE = True  # Use secure cookies
@@ -46,6 +109,10 @@ CSRF_COOKIE_SECURE = True     # Use secure CSRF cookies
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'module_engine.middleware.AdmissionControlMiddleware',
+    'module_engine.middleware.ProfilerMiddleware',
+    'module_engine.middleware.QueryBudgetMiddleware',
+    'module_engine.middleware.TenantMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,6 +123,17 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'modular_django.urls'
 
+# Tenants are resolved from the request host, or from this header on requests
+# from the trusted proxies (REMOTE_ADDR values, '*' for any); off by default
+# because any client can send the header
+TENANT_HEADER = 'HTTP_X_TENANT'
+TENANT_TRUSTED_PROXIES = []
+# Seconds a tenant lookup is cached per worker, and the LRU bounds for
+# tenant lookups and for per-module-set URLconfs
+TENANT_CACHE_TTL = 60
+TENANT_LOOKUP_CACHE_SIZE = 10000
+TENANT_URLCONF_CACHE_SIZE = 32
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -72,14 +150,53 @@ TEMPLATES = [
     },
 ]
 
+# Modules may opt into Jinja2 (MODULE_INFO['template_engine'] = 'jinja2');
+# it is in requirements.txt, but modules fall back to their Django templates
+# if it is missing
+try:
+    import jinja2  # noqa: F401
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'environment': 'module_engine.templating.environment',
+            'auto_reload': DEBUG,
+        },
+    })
+except ImportError:
+    pass
+# Compiled Jinja2 templates are cached here across worker restarts
+JINJA2_BYTECODE_CACHE = os.path.join(BASE_DIR, '.cache', 'jinja2')
+
 WSGI_APPLICATION = 'modular_django.wsgi.application'
 
+# Warm up active modules in parallel threads when a worker starts
+MODULE_WARMUP = os.environ.get('MODULE_WARMUP', 'True') == 'True'
+MODULE_WARMUP_THREADS = None  # defaults to one thread per active module
+
+# Threads per worker process (gunicorn.conf.py reads the same variable);
+# module admission limits are shares of it
+WORKER_THREADS = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Rolling module upgrades: workers report their module versions every
+# WORKER_HEARTBEAT_INTERVAL seconds and restart one at a time, after up to
+# WORKER_DRAIN_TIMEOUT seconds of draining, when an upgrade needs them to
+ROLLING_UPGRADES = os.environ.get('ROLLING_UPGRADES', 'False') == 'True'
+WORKER_HEARTBEAT_INTERVAL = 10
+WORKER_DRAIN_TIMEOUT = 30
 
-# Default to SQLite
+
+# Default to SQLite, tuned for concurrent workers (WAL, synchronous=NORMAL,
+# mmap reads, busy timeout and BEGIN IMMEDIATE write transactions)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'module_engine.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -137,6 +254,30 @@ STATICFILES_DIRS = [
 ]
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Compressed exports of module data purged on uninstall
+MODULE_ARCHIVE_ROOT = os.path.join(BASE_DIR, 'archives')
+
+# Pre-rendered public module pages (python manage.py prerender_pages)
+PRERENDER_ROOT = os.path.join(STATIC_ROOT, 'prerendered')
+# Seconds browsers and CDNs may cache a pre-rendered page
+PRERENDER_MAX_AGE = 60
+# Hosts pre-rendered pages are served on (any when empty); list the main
+# site's hosts when tenants are resolved by host
+PRERENDER_HOSTS = []
+
+# Memory-mapped product catalog (python manage.py refresh_catalog_snapshot),
+# and the seconds it may lag behind the database before reads fall back
+CATALOG_SNAPSHOT_PATH = os.path.join(BASE_DIR, '.cache', 'catalog.snapshot')
+CATALOG_SNAPSHOT_MAX_LAG = 30
+
+# Sampling profiler: the fraction of requests profiled, and a token that
+# profiles any request sending it in an X-Module-Profile header
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '0'))
+PROFILER_TOKEN = os.environ.get('PROFILER_TOKEN', '')
+# Seconds between stack samples of a profiled request
+PROFILER_INTERVAL = 0.005
+PROFILE_ROOT = os.path.join(BASE_DIR, '.cache', 'profiles')
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,16 @@
+"""
+Settings for running the test suites.
+
+The module registry is not read in tests, so every module package in the
+project is installed instead and each module's suite runs against its tables:
+
+    python manage.py test --settings=modular_django.test_settings
+
+Other runners pick it up through DJANGO_SETTINGS_MODULE.
+"""
+from .dynamic_settings import get_available_modules
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = INSTALLED_APPS + [
+    module for module in get_available_modules(BASE_DIR) if module not in INSTALLED_APPS
+]
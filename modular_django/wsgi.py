@@ -15,5 +15,24 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'modular_django.settings')
 
 application = get_wsgi_application()
 
+# Pre-rendered pages are sent before Django's middleware or the database run
+from module_engine.prerender import PrerenderedPages
+
+application = PrerenderedPages(application)
+
+from module_engine.preload import is_preloading, preload
+
+if is_preloading():
+    # Loaded once in the gunicorn master: warm up now, workers inherit it
+    preload()
+else:
+    # Prime active modules in the background; /modules/ready/ reports when done
+    from module_engine.warmup import start_warm_up
+    start_warm_up()
+
+    # Report loaded module versions for rolling upgrades (ROLLING_UPGRADES)
+    from module_engine.rolling import start_heartbeat
+    start_heartbeat()
+
 # Add Vercel handler
 app = application
\ No newline at end of file
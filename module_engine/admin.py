@@ -1,6 +1,46 @@
 from django.contrib import admin
-from .models import Module, ModuleField
+from .models import Module, ModuleField, ModulePurge, ModuleUpgrade, Tenant, WorkerHeartbeat
 
 # Register your models here.
-admin.site.register(Module)
-admin.site.register(ModuleField)
\ No newline at end of file
+@admin.register(Module)
+class ModuleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'identifier', 'version', 'installed', 'active']
+    list_filter = ['installed', 'active']
+    # Also what the autocomplete widgets search
+    search_fields = ['identifier', 'name']
+
+
+@admin.register(ModuleField)
+class ModuleFieldAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'field_type', 'is_active']
+    list_filter = ['is_active']
+    list_select_related = ['module']
+    search_fields = ['=model_name', '^field_name']
+    autocomplete_fields = ['module']
+
+
+@admin.register(Tenant)
+class TenantAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'domain', 'active']
+    search_fields = ['=slug', '^name']
+    autocomplete_fields = ['modules']
+
+
+@admin.register(ModulePurge)
+class ModulePurgeAdmin(admin.ModelAdmin):
+    list_display = ['identifier', 'status', 'rows_archived', 'rows_deleted', 'updated_at', 'error']
+    list_filter = ['status']
+    readonly_fields = [field.name for field in ModulePurge._meta.fields]
+
+
+@admin.register(ModuleUpgrade)
+class ModuleUpgradeAdmin(admin.ModelAdmin):
+    list_display = ['module', 'from_version', 'to_version', 'phase', 'owner', 'started_at', 'finished_at']
+    list_filter = ['phase']
+    readonly_fields = [field.name for field in ModuleUpgrade._meta.fields]
+
+
+@admin.register(WorkerHeartbeat)
+class WorkerHeartbeatAdmin(admin.ModelAdmin):
+    list_display = ['worker_id', 'module_versions', 'draining', 'in_flight', 'last_seen']
+    readonly_fields = [field.name for field in WorkerHeartbeat._meta.fields]
@@ -0,0 +1,109 @@
+# module_engine/admission.py
+"""
+Per-module admission control.
+
+Modules declare limits in MODULE_INFO::
+
+    'admission': {
+        'max_share': 0.5,   # fraction of the worker's threads the module may hold
+        'retry_after': 1,   # Retry-After sent with the 503
+    },
+
+A module may serve ``max_share`` of WORKER_THREADS requests at once (at least
+one). Requests over that are refused with an immediate 503 rather than queued,
+since a queued request would hold one of the threads it is meant to keep free
+for the rest of the site.
+"""
+import threading
+
+from django.conf import settings
+
+from .registry import get_module_apps
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_totals = {'in_flight': 0}
+_totals_lock = threading.Lock()
+
+
+class ModuleLimiter:
+    """Concurrency limit that sheds the requests over it."""
+
+    def __init__(self, identifier, max_concurrency, retry_after=1):
+        self.identifier = identifier
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot; return False to shed the request."""
+        with self._lock:
+            if self.in_flight >= self.max_concurrency:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'max_concurrency': self.max_concurrency,
+            }
+
+
+def get_max_concurrency(limits, threads=None):
+    """Return how many requests a module may serve at once in one worker."""
+    if threads is None:
+        threads = getattr(settings, 'WORKER_THREADS', 1)
+    return max(1, int(threads * limits.get('max_share', 0.5)))
+
+
+def get_limiter(info):
+    """Return the limiter for a module, or None if it declares no limits."""
+    limits = info.get('admission')
+    if not limits:
+        return None
+    identifier = info['identifier']
+    limiter = _limiters.get(identifier)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(identifier, ModuleLimiter(
+                identifier, get_max_concurrency(limits), limits.get('retry_after', 1),
+            ))
+    return limiter
+
+
+def request_started():
+    with _totals_lock:
+        _totals['in_flight'] += 1
+
+
+def request_finished():
+    with _totals_lock:
+        _totals['in_flight'] -= 1
+
+
+def get_in_flight():
+    """Return the number of requests this worker is currently serving."""
+    return _totals['in_flight']
+
+
+def get_admission_stats():
+    """Return in-flight and rejected counts for every limited module."""
+    for _, info in get_module_apps():
+        get_limiter(info)
+    return {
+        'in_flight': get_in_flight(),
+        'modules': {identifier: limiter.get_stats() for identifier, limiter in list(_limiters.items())},
+    }
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ModuleEngineConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "module_engine"
+
+    def ready(self):
+        # Import the signal receivers
+        import module_engine.events
+        import module_engine.roles
+        import module_engine.cache
+        import module_engine.tenants
@@ -0,0 +1,95 @@
+# module_engine/budgets.py
+"""
+Per-view query and latency budgets.
+
+Modules declare budgets per URL name in MODULE_INFO::
+
+    'budgets': {
+        'product_list': {'queries': 6, 'ms': 150},
+    },
+
+QueryBudgetMiddleware counts the queries of every request to a module that
+declares budgets and logs a warning when a view goes over its budget.
+Violations are also counted per worker (get_budget_stats). The test case
+built by module_engine.testing.budget_test_case fails on the same budgets.
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from .registry import get_module_info
+
+logger = logging.getLogger(__name__)
+
+_stats = defaultdict(lambda: {
+    'requests': 0,
+    'query_violations': 0,
+    'latency_violations': 0,
+    'max_queries': 0,
+    'max_ms': 0.0,
+})
+_stats_lock = threading.Lock()
+
+
+def get_budgets(info):
+    return (info or {}).get('budgets') or {}
+
+
+def get_budget(identifier, url_name):
+    """Return a module's budget for a URL name, or None."""
+    return get_budgets(get_module_info(identifier)).get(url_name)
+
+
+class QueryCounter:
+    """Execute wrapper that only counts; cheap enough for every request."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    """Count the queries this thread runs on any database inside the block."""
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+def check_budget(budget, queries, ms):
+    """Return ``(over_queries, over_latency, description)`` for one request."""
+    over_queries = budget.get('queries') is not None and queries > budget['queries']
+    over_latency = budget.get('ms') is not None and ms > budget['ms']
+    problems = []
+    if over_queries:
+        problems.append(f"{queries} queries (budget {budget['queries']})")
+    if over_latency:
+        problems.append(f"{ms:.1f} ms (budget {budget['ms']} ms)")
+    return over_queries, over_latency, ', '.join(problems)
+
+
+def record_request(identifier, url_name, budget, queries, ms):
+    """Count a budgeted request; returns the description of any violation."""
+    over_queries, over_latency, problems = check_budget(budget, queries, ms)
+    with _stats_lock:
+        stats = _stats[f"{identifier}:{url_name}"]
+        stats['requests'] += 1
+        stats['max_queries'] = max(stats['max_queries'], queries)
+        stats['max_ms'] = max(stats['max_ms'], round(ms, 3))
+        stats['query_violations'] += over_queries
+        stats['latency_violations'] += over_latency
+    return problems
+
+
+def get_budget_stats():
+    """Return per-view request and violation counts for this worker."""
+    with _stats_lock:
+        return {key: dict(stats) for key, stats in _stats.items()}
@@ -0,0 +1,194 @@
+# module_engine/bundles.py
+"""
+Prebuilt module bundles.
+
+A bundle is a zip archive of a module package, as built by
+``build_module_bundle``: its sources, migrations, templates and static files,
+plus bytecode compiled ahead of time and a ``bundle.json`` manifest with the
+sha256 of every file. The bundle hash is the sha256 of that file list, so it
+only changes when the content does.
+
+``install_module --bundle`` verifies a bundle and extracts it below
+MODULE_BUNDLE_ROOT, which settings put first on ``sys.path``. The bytecode is
+written as unchecked-hash ``.pyc`` files, so importing a bundled module
+neither recompiles it nor checks its sources.
+
+Extracting and installing are skipped separately. A bundle whose hash matches
+the extracted copy is not extracted again, and one whose hash matches
+``Module.bundle_hash`` is not installed again. MODULE_BUNDLE_ROOT is a build
+artifact (``.bundles/`` is not committed), so a fresh checkout always extracts
+its bundles: that copy is the code that runs. What the hash saves there is
+the install step, and on hosts that keep the directory, the extraction too.
+"""
+import hashlib
+import json
+import os
+import py_compile
+import shutil
+import sys
+import tempfile
+import zipfile
+from importlib import import_module, invalidate_caches
+from importlib.util import cache_from_source
+
+from django.conf import settings
+
+from .registry import get_module_info
+
+MANIFEST = 'bundle.json'
+# Fixed timestamp so building the same files twice gives the same archive
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+class BundleError(Exception):
+    pass
+
+
+def get_bundle_root():
+    return getattr(settings, 'MODULE_BUNDLE_ROOT', os.path.join(settings.BASE_DIR, '.bundles'))
+
+
+def get_bundle_hash(files):
+    """Return the hash of a manifest's ``{path: sha256}`` file list."""
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_package_files(package_dir):
+    """Yield the paths (relative to the package) worth bundling, sources only."""
+    for directory, dirnames, filenames in os.walk(package_dir):
+        dirnames[:] = sorted(d for d in dirnames if d != '__pycache__' and not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.startswith('.') or filename.endswith(('.pyc', '.pyo')) or filename == MANIFEST:
+                continue
+            yield os.path.relpath(os.path.join(directory, filename), package_dir)
+
+
+def build_bundle(identifier, output_dir):
+    """Build a bundle of an importable module package; returns ``(path, manifest)``."""
+    info = get_module_info(identifier)
+    if info is None:
+        raise BundleError(f"'{identifier}' is not a module")
+    package_dir = os.path.dirname(import_module(identifier).__file__)
+
+    contents = {}
+    with tempfile.TemporaryDirectory() as build_dir:
+        for relpath in get_package_files(package_dir):
+            source = os.path.join(package_dir, relpath)
+            name = f"{identifier}/{relpath.replace(os.sep, '/')}"
+            with open(source, 'rb') as f:
+                contents[name] = f.read()
+            if relpath.endswith('.py'):
+                cfile = cache_from_source(os.path.join(build_dir, identifier, relpath))
+                try:
+                    py_compile.compile(
+                        source, cfile=cfile, dfile=name, doraise=True,
+                        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+                    )
+                except py_compile.PyCompileError as e:
+                    raise BundleError(str(e))
+                with open(cfile, 'rb') as f:
+                    contents[os.path.relpath(cfile, build_dir).replace(os.sep, '/')] = f.read()
+
+    files = {name: sha256(data) for name, data in sorted(contents.items())}
+    manifest = {
+        'identifier': identifier,
+        'name': info['name'],
+        'version': info['version'],
+        'python': sys.implementation.cache_tag,
+        'hash': get_bundle_hash(files),
+        'files': files,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{identifier}-{info['version']}.zip")
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        entries = [(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode())]
+        entries += sorted(contents.items())
+        for name, data in entries:
+            bundle.writestr(zipfile.ZipInfo(name, date_time=ZIP_DATE), data, zipfile.ZIP_DEFLATED)
+    return path, manifest
+
+
+def read_manifest(bundle):
+    """Return a bundle's manifest after checking that every file matches it."""
+    try:
+        manifest = json.loads(bundle.read(MANIFEST))
+        identifier, files = manifest['identifier'], manifest['files']
+    except (KeyError, ValueError):
+        raise BundleError("Not a module bundle: bundle.json is missing or invalid")
+    if not identifier.isidentifier():
+        raise BundleError(f"Invalid module identifier '{identifier}'")
+    if get_bundle_hash(files) != manifest.get('hash'):
+        raise BundleError("The bundle hash does not match its file list")
+
+    names = set(bundle.namelist()) - {MANIFEST}
+    if names != set(files):
+        raise BundleError("The bundle's files do not match its manifest")
+    for name, digest in files.items():
+        if not name.startswith(f"{identifier}/") or '..' in name.split('/') or name.startswith('/'):
+            raise BundleError(f"Unexpected path in bundle: {name}")
+        if sha256(bundle.read(name)) != digest:
+            raise BundleError(f"{name} does not match its hash")
+    return manifest
+
+
+def get_installed_manifest(identifier):
+    """Return the manifest of a module's extracted bundle, or None."""
+    try:
+        with open(os.path.join(get_bundle_root(), identifier, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def add_bundle_root_to_path():
+    root = get_bundle_root()
+    if root not in sys.path:
+        sys.path.insert(0, root)
+        invalidate_caches()
+
+
+def is_extracted(manifest):
+    """True if this bundle is already extracted below MODULE_BUNDLE_ROOT."""
+    installed = get_installed_manifest(manifest['identifier'])
+    return installed is not None and installed.get('hash') == manifest['hash']
+
+
+def is_recorded(manifest, module):
+    """True if this bundle is recorded as the installed version of its module."""
+    return module is not None and module.installed and module.bundle_hash == manifest['hash']
+
+
+def extract_bundle(bundle, manifest):
+    """Extract a verified bundle to a staging directory, then swap it in for the previous one."""
+    identifier = manifest['identifier']
+    root = get_bundle_root()
+    os.makedirs(root, exist_ok=True)
+    target = os.path.join(root, identifier)
+    staging = tempfile.mkdtemp(prefix=f".{identifier}-", dir=root)
+    try:
+        for name in manifest['files']:
+            bundle.extract(name, staging)
+        with open(os.path.join(staging, identifier, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        previous = None
+        if os.path.exists(target):
+            previous = f"{staging}.old"
+            os.rename(target, previous)
+        os.rename(os.path.join(staging, identifier), target)
+        if previous:
+            shutil.rmtree(previous, ignore_errors=True)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    add_bundle_root_to_path()
+    return target
+
+
+def open_bundle(path):
+    try:
+        return zipfile.ZipFile(path)
+    except (OSError, zipfile.BadZipFile) as e:
+        raise BundleError(f"Cannot open bundle {path}: {e}")
@@ -0,0 +1,218 @@
+# module_engine/cache.py
+"""
+Module-scoped cache handles.
+
+``get_module_cache('product_module')`` returns a handle whose keys are prefixed
+with the module identifier and versioned with the module's ``Module.version``.
+Saving a module with a new version moves it to a fresh namespace, so an upgrade
+invalidates the module's entries without flushing the cache.
+
+Each process keeps the namespace in memory for MODULE_CACHE_NAMESPACE_TTL
+seconds before checking again, so a cache read or write costs one round trip.
+The check reads the namespace from a shared cache, where it is stored without
+expiry, or ``Module.version`` from the database for per-process caches.
+
+Which cache a module uses is configured in MODULE_INFO::
+
+    'cache': {'alias': 'modules', 'timeout': 300},
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Module
+from .registry import get_module_info
+
+NAMESPACE_KEY = 'module_engine:namespace:{}'
+
+# Sentinel that tells a stored None apart from a miss
+_MISSING = object()
+
+_handles = {}
+_handles_lock = threading.Lock()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'sets': 0, 'deletes': 0, 'evictions': 0})
+_stats_lock = threading.Lock()
+
+
+def get_cache_alias(identifier):
+    """Return the cache alias configured for a module."""
+    info = get_module_info(identifier) or {}
+    default = getattr(settings, 'MODULE_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)
+    return info.get('cache', {}).get('alias', default)
+
+
+def is_shared_cache(alias):
+    """True if every process sees the same entries in a cache."""
+    return not isinstance(caches[alias], LocMemCache)
+
+
+def get_namespace_ttl():
+    """Seconds a process trusts the namespace it last read."""
+    return getattr(settings, 'MODULE_CACHE_NAMESPACE_TTL', 10)
+
+
+def get_module_cache(identifier):
+    """Return the (shared) cache handle for a module."""
+    with _handles_lock:
+        if identifier not in _handles:
+            info = get_module_info(identifier) or {}
+            _handles[identifier] = ModuleCache(
+                identifier,
+                alias=get_cache_alias(identifier),
+                timeout=info.get('cache', {}).get('timeout', DEFAULT_TIMEOUT),
+            )
+        return _handles[identifier]
+
+
+def get_cache_stats():
+    """Return hit/miss/set/delete/eviction counters for every module in this process."""
+    with _stats_lock:
+        return {identifier: dict(counters) for identifier, counters in _stats.items()}
+
+
+class ModuleCache:
+    """Cache handle namespaced by module identifier and version."""
+
+    def __init__(self, identifier, alias=DEFAULT_CACHE_ALIAS, timeout=DEFAULT_TIMEOUT):
+        self.identifier = identifier
+        self.alias = alias
+        self.default_timeout = timeout
+        self.namespace_key = NAMESPACE_KEY.format(identifier)
+        # (namespace, monotonic time until which it is trusted)
+        self._namespace = None
+        # Recently written keys and when they expire, used to detect evictions
+        self._written = OrderedDict()
+        self._written_lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_namespace(self):
+        """Return the version token entries are currently stored under."""
+        current = self._namespace
+        if current is not None and current[1] > time.monotonic():
+            return current[0]
+        namespace = None
+        if is_shared_cache(self.alias):
+            namespace = self.cache.get(self.namespace_key)
+        if namespace is None:
+            version = (
+                Module.objects.filter(identifier=self.identifier)
+                .values_list('version', flat=True).first()
+            )
+            namespace = set_namespace(self.identifier, version or '0', self.alias)
+        self._namespace = (namespace, time.monotonic() + get_namespace_ttl())
+        return namespace
+
+    def make_key(self, key):
+        return f"{self.identifier}:{key}"
+
+    def _count(self, counter, amount=1):
+        with _stats_lock:
+            _stats[self.identifier][counter] += amount
+
+    def _get_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return self.cache.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _remember(self, namespace, key, timeout):
+        deadline = float('inf') if timeout is None else time.time() + timeout
+        limit = getattr(settings, 'MODULE_CACHE_TRACKED_KEYS', 10000)
+        with self._written_lock:
+            self._written[namespace, key] = deadline
+            self._written.move_to_end((namespace, key))
+            while len(self._written) > limit:
+                self._written.popitem(last=False)
+
+    def _record_miss(self, namespace, key):
+        self._count('misses')
+        with self._written_lock:
+            deadline = self._written.pop((namespace, key), None)
+        if deadline is not None and deadline > time.time():
+            # We wrote it and it has not expired, so the backend dropped it
+            self._count('evictions')
+
+    def get(self, key, default=None):
+        namespace = self.get_namespace()
+        value = self.cache.get(self.make_key(key), _MISSING, version=namespace)
+        if value is _MISSING:
+            self._record_miss(namespace, key)
+            return default
+        self._count('hits')
+        return value
+
+    def get_many(self, keys):
+        namespace = self.get_namespace()
+        found = self.cache.get_many([self.make_key(key) for key in keys], version=namespace)
+        prefix = len(self.make_key(''))
+        result = {key[prefix:]: value for key, value in found.items()}
+        self._count('hits', len(result))
+        for key in keys:
+            if key not in result:
+                self._record_miss(namespace, key)
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        timeout = self._get_timeout(timeout)
+        namespace = self.get_namespace()
+        self.cache.set(self.make_key(key), value, timeout, version=namespace)
+        self._remember(namespace, key, timeout)
+        self._count('sets')
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT):
+        timeout = self._get_timeout(timeout)
+        namespace = self.get_namespace()
+        self.cache.set_many({self.make_key(key): value for key, value in data.items()}, timeout, version=namespace)
+        for key in data:
+            self._remember(namespace, key, timeout)
+        self._count('sets', len(data))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT):
+        timeout = self._get_timeout(timeout)
+        namespace = self.get_namespace()
+        added = self.cache.add(self.make_key(key), value, timeout, version=namespace)
+        if added:
+            self._remember(namespace, key, timeout)
+            self._count('sets')
+        return added
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = default() if callable(default) else default
+            self.set(key, value, timeout)
+        return value
+
+    def delete(self, key):
+        namespace = self.get_namespace()
+        with self._written_lock:
+            self._written.pop((namespace, key), None)
+        self._count('deletes')
+        return self.cache.delete(self.make_key(key), version=namespace)
+
+
+def set_namespace(identifier, version, alias=None):
+    """Point a module's cache handle at the namespace for ``version``."""
+    alias = alias or get_cache_alias(identifier)
+    if is_shared_cache(alias):
+        # Other processes pick it up once their copy is older than the TTL
+        caches[alias].set(NAMESPACE_KEY.format(identifier), version, None)
+    handle = _handles.get(identifier)
+    if handle is not None:
+        handle._namespace = (version, time.monotonic() + get_namespace_ttl())
+    return version
+
+
+@receiver(post_save, sender=Module)
+def bump_module_namespace(sender, instance, **kwargs):
+    """Switch a module's cache to the namespace of its (possibly new) version."""
+    set_namespace(instance.identifier, instance.version)
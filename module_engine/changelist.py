@@ -0,0 +1,181 @@
+# module_engine/changelist.py
+"""
+Admin changelists for large tables.
+
+``HighVolumeModelAdmin`` avoids the queries that make the default
+changelist slow on big tables:
+
+* ``COUNT(*)``: an unfiltered list shows an estimated row count (the admin's
+  ``get_estimated_count`` or the database's table statistics), a filtered one a
+  count bounded by ``count_limit``, and the full result count is never taken;
+* ``OFFSET`` paging: in the default ordering (``keyset_ordering``) the list
+  pages with ``?after=<pk>`` so every page is an index range scan. Sorting by a
+  column falls back to numbered pages;
+* ``LIKE`` search: with only ``=field`` and ``^field`` search fields, the whole term
+  is matched exactly or as a prefix range (``field >= term AND field < next``)
+  that an ordinary index serves, where the admin's ``istartswith`` is a
+  case-insensitive ``LIKE`` SQLite cannot answer from an index. Prefix search
+  is therefore case-sensitive, and on PostgreSQL follows the column's
+  collation (exact with "C").
+"""
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+KEYSET_VAR = 'after'
+
+
+def estimate_row_count(model, using='default'):
+    """Return the planner's row estimate for a model's table, or None if there is none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            elif connection.vendor == 'sqlite':
+                # Filled in by ANALYZE; the first number is the row count
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # Postgres reports -1 for tables that were never analyzed
+    return estimate if estimate >= 0 else None
+
+
+def get_prefix_upper_bound(prefix):
+    """Return the smallest string greater than every string starting with ``prefix``, or None."""
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Surrogates cannot be stored; skip to the next encodable character
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+def prefix_filter(field, prefix):
+    """Q for values of ``field`` starting with ``prefix``, as an index range."""
+    condition = Q(**{f"{field}__gte": prefix})
+    upper = get_prefix_upper_bound(prefix)
+    if upper is not None:
+        condition &= Q(**{f"{field}__lt": upper})
+    return condition
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts a whole table."""
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 estimate=None, count_limit=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.estimate = estimate
+        self.count_limit = count_limit
+
+    @cached_property
+    def count(self):
+        if self.estimate is not None and not self.object_list.query.has_filters():
+            return self.estimate
+        if self.count_limit:
+            # COUNT over a LIMIT subquery stops scanning at the limit
+            return self.object_list[:self.count_limit].count()
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList that pages by primary key while the default ordering is in use."""
+
+    def __init__(self, request, *args, **kwargs):
+        self.keyset_after = None
+        value = request.GET.get(KEYSET_VAR, '')
+        if value.isdigit():
+            self.keyset_after = int(value)
+        super().__init__(request, *args, **kwargs)
+
+    def get_queryset(self, request):
+        # Keep the cursor out of the lookups and of every generated link
+        self.params.pop(KEYSET_VAR, None)
+        return super().get_queryset(request)
+
+    def uses_keyset(self, request):
+        return (
+            self.model_admin.keyset_ordering is not None
+            and ORDER_VAR not in self.params
+            and PAGE_VAR not in request.GET
+            and not self.show_all
+        )
+
+    def get_results(self, request):
+        self.keyset = self.uses_keyset(request)
+        if not self.keyset:
+            return super().get_results(request)
+
+        descending = self.model_admin.keyset_ordering.startswith('-')
+        queryset = self.queryset.order_by(self.model_admin.keyset_ordering)
+        if self.keyset_after is not None:
+            queryset = queryset.filter(**{'pk__lt' if descending else 'pk__gt': self.keyset_after})
+        rows = list(queryset[:self.list_per_page + 1])
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = rows[:self.list_per_page]
+        self.can_show_all = False
+        self.next_after = rows[self.list_per_page - 1].pk if len(rows) > self.list_per_page else None
+        self.multi_page = self.next_after is not None or self.keyset_after is not None
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string()
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({KEYSET_VAR: self.next_after})
+
+
+class HighVolumeModelAdmin(admin.ModelAdmin):
+    """ModelAdmin with estimated counts and keyset paging."""
+    change_list_template = 'module_engine/admin/change_list.html'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Ordering used for keyset paging; None pages by offset only
+    keyset_ordering = '-pk'
+    # Filtered lists count at most this many rows
+    count_limit = 10000
+
+    def get_estimated_count(self, request):
+        """Return the estimated number of rows in the unfiltered list."""
+        return estimate_row_count(self.model)
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        term = search_term.strip()
+        if not term or not search_fields or not all(name[0] in '=^' for name in search_fields):
+            return super().get_search_results(request, queryset, search_term)
+        condition = Q()
+        for name in search_fields:
+            if name.startswith('='):
+                condition |= Q(**{name[1:]: term})
+            else:
+                condition |= prefix_filter(name[1:], term)
+        return queryset.filter(condition), False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            estimate=self.get_estimated_count(request), count_limit=self.count_limit,
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
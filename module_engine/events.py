@@ -0,0 +1,165 @@
+# module_engine/events.py
+"""
+Module event bus.
+
+Handlers subscribe to an event name scoped to a module or a model::
+
+    from module_engine import events
+
+    @events.receiver('post_save', model=Product)
+    def product_saved(instance, created, **kwargs):
+        ...
+
+    @events.receiver('post_migrate', module='product_module')
+    def product_module_migrated(**kwargs):
+        ...
+
+Subscribers are indexed by ``(event, scope)``, so publishing an event only
+looks up the handlers registered for that module or model; modules that did
+not subscribe are never called. A model's events also reach subscribers of
+its module and unscoped subscribers of the event.
+
+``batch=True`` handlers receive a list of payloads per call, so
+``publish_many`` delivers a whole batch at once. ``on_commit=True`` handlers
+run after the surrounding transaction commits, and not at all if it rolls back.
+As with Django signals, an exception from a handler stops delivery and
+propagates to the publisher, so a ``pre_save`` handler can veto a save.
+
+Django's ``post_migrate`` and the model signals in MODEL_SIGNALS are bridged
+onto the bus; a model signal is only connected once something subscribes to
+that model.
+"""
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import signals
+from django.dispatch import receiver as signal_receiver
+
+MODEL_SIGNALS = {
+    'pre_save': signals.pre_save,
+    'post_save': signals.post_save,
+    'pre_delete': signals.pre_delete,
+    'post_delete': signals.post_delete,
+}
+
+_subscribers = defaultdict(list)
+_bridged = set()
+_lock = threading.Lock()
+
+
+class Subscription:
+
+    def __init__(self, handler, batch=False, on_commit=False):
+        self.handler = handler
+        self.batch = batch
+        self.on_commit = on_commit
+
+    def deliver(self, payloads, using=DEFAULT_DB_ALIAS):
+        if self.on_commit:
+            transaction.on_commit(lambda: self._call(payloads), using=using)
+        else:
+            self._call(payloads)
+
+    def _call(self, payloads):
+        if self.batch:
+            self.handler(payloads)
+        else:
+            for payload in payloads:
+                self.handler(**payload)
+
+
+def get_model_label(model):
+    """Return ``app_label.model_name`` for a model class or label string."""
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    return model._meta.label_lower
+
+
+def get_scope(module=None, model=None):
+    if model is not None:
+        return ('model', get_model_label(model))
+    if module is not None:
+        return ('module', module)
+    return None
+
+
+def subscribe(event, handler, module=None, model=None, batch=False, on_commit=False):
+    """Register ``handler`` for ``event``, optionally scoped to a module or a model."""
+    if model is not None and event in MODEL_SIGNALS:
+        _bridge_model_signal(event, model)
+    with _lock:
+        _subscribers[event, get_scope(module, model)].append(
+            Subscription(handler, batch=batch, on_commit=on_commit)
+        )
+    return handler
+
+
+def receiver(event, **kwargs):
+    """Decorator form of subscribe()."""
+    def decorator(handler):
+        return subscribe(event, handler, **kwargs)
+    return decorator
+
+
+def unsubscribe(event, handler, module=None, model=None):
+    with _lock:
+        key = (event, get_scope(module, model))
+        _subscribers[key] = [s for s in _subscribers[key] if s.handler is not handler]
+
+
+def get_subscriptions(event, module=None, model=None):
+    """Return the subscriptions an event reaches, most specific first."""
+    scopes = []
+    if model is not None:
+        label = get_model_label(model)
+        scopes.append(('model', label))
+        module = module or label.split('.')[0]
+    if module is not None:
+        scopes.append(('module', module))
+    scopes.append(None)
+    found = []
+    for scope in scopes:
+        found.extend(_subscribers.get((event, scope), ()))
+    return found
+
+
+def publish_many(event, payloads, module=None, model=None, using=DEFAULT_DB_ALIAS):
+    """Deliver a batch of payload dicts; batch handlers are called once."""
+    payloads = list(payloads)
+    if not payloads:
+        return
+    for subscription in get_subscriptions(event, module, model):
+        subscription.deliver(payloads, using)
+
+
+def publish(event, module=None, model=None, **payload):
+    """Deliver a single event; a ``using`` payload key picks the commit to wait for."""
+    using = payload.get('using') or DEFAULT_DB_ALIAS
+    publish_many(event, [payload], module=module, model=model, using=using)
+
+
+def _bridge_model_signal(event, model):
+    """Connect a Django model signal to the bus for one model, once."""
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    with _lock:
+        if (event, model) in _bridged:
+            return
+        _bridged.add((event, model))
+
+    def bridge(sender, **kwargs):
+        kwargs.pop('signal', None)
+        publish(event, model=sender, sender=sender, **kwargs)
+
+    MODEL_SIGNALS[event].connect(
+        bridge, sender=model, weak=False, dispatch_uid=f"module_engine.events.{event}.{model._meta.label_lower}"
+    )
+
+
+@signal_receiver(signals.post_migrate)
+def publish_post_migrate(sender, **kwargs):
+    """Forward post_migrate to the subscribers of the migrated app only."""
+    kwargs.pop('signal', None)
+    publish('post_migrate', module=sender.label, sender=sender, **kwargs)
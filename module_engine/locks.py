@@ -0,0 +1,65 @@
+# module_engine/locks.py
+"""
+Database-backed leases.
+
+A lock is a ``ModuleLock`` row; taking it is an insert (or taking over an
+expired row with a conditional update), so exactly one node wins even when
+several race. Holders refresh the lease while they work; if a holder dies the
+lock frees itself when the lease expires.
+"""
+import os
+import socket
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ModuleLock
+
+
+def get_owner_id():
+    """Identify this process as ``host:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lock(name, owner=None, ttl=300):
+    """Take the named lock for ``ttl`` seconds; return True if this owner holds it."""
+    owner = owner or get_owner_id()
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=ttl)
+    try:
+        with transaction.atomic():
+            ModuleLock.objects.create(name=name, owner=owner, acquired_at=now, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        pass
+    # Take over an expired lease, or re-enter our own
+    taken = (
+        ModuleLock.objects.filter(name=name)
+        .filter(Q(expires_at__lt=now) | Q(owner=owner))
+        .update(owner=owner, acquired_at=now, expires_at=expires_at)
+    )
+    return taken == 1
+
+
+def refresh_lock(name, owner=None, ttl=300):
+    """Extend a lease this owner holds; return False if it was lost."""
+    owner = owner or get_owner_id()
+    return ModuleLock.objects.filter(name=name, owner=owner).update(
+        expires_at=timezone.now() + timedelta(seconds=ttl)
+    ) == 1
+
+
+def transfer_lock(name, new_owner, owner=None):
+    """Hand a lease this owner holds to ``new_owner``, keeping its expiry; return False if it was lost."""
+    return ModuleLock.objects.filter(name=name, owner=owner or get_owner_id()).update(
+        owner=new_owner, acquired_at=timezone.now()
+    ) == 1
+
+
+def release_lock(name, owner=None, acquired_before=None):
+    locks = ModuleLock.objects.filter(name=name, owner=owner or get_owner_id())
+    if acquired_before is not None:
+        locks = locks.filter(acquired_at__lt=acquired_before)
+    locks.delete()
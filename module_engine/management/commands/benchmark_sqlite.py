@@ -0,0 +1,111 @@
+# module_engine/management/commands/benchmark_sqlite.py
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from module_engine.backends.sqlite3.base import DEFAULT_PRAGMAS, configure_connection
+
+# Stock Python/Django SQLite: rollback journal, synchronous=FULL, deferred
+# transactions and the 5 second default busy timeout
+PROFILES = {
+    'default': {'pragmas': {}, 'begin': 'BEGIN', 'timeout': 5},
+    'tuned': {'pragmas': DEFAULT_PRAGMAS, 'begin': 'BEGIN IMMEDIATE', 'timeout': 20},
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent read/write throughput of the default and tuned SQLite profiles'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help='Concurrent writer threads')
+        parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads')
+        parser.add_argument('--duration', type=float, default=5, help='Seconds to run each profile')
+        parser.add_argument('--rows', type=int, default=10000, help='Products in the benchmark table')
+        parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='Profile to run (default: all)')
+    
+    def handle(self, *args, **options):
+        for name in options['profile'] or ['default', 'tuned']:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.seed(path, options['rows'])
+                result = self.run_profile(path, PROFILES[name], options)
+            
+            duration = options['duration']
+            self.stdout.write(
+                f"{name:8} writes/s: {result['writes'] / duration:9.1f}  "
+                f"reads/s: {result['reads'] / duration:9.1f}  "
+                f"lock errors: {result['errors']}"
+            )
+    
+    def seed(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE product (id INTEGER PRIMARY KEY, barcode TEXT UNIQUE, "
+            "price NUMERIC, stock INTEGER, updated_at TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO product VALUES (?, ?, ?, ?, datetime('now'))",
+            ((i, f"BC{i:08d}", 9.99, 100) for i in range(1, rows + 1)),
+        )
+        conn.commit()
+        conn.close()
+    
+    def connect(self, path, profile):
+        conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+        configure_connection(conn, profile['pragmas'])
+        return conn
+    
+    def run_profile(self, path, profile, options):
+        counts = {'writes': 0, 'reads': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+        rows = options['rows']
+        
+        def count(key):
+            with lock:
+                counts[key] += 1
+        
+        def writer():
+            conn = self.connect(path, profile)
+            while time.monotonic() < deadline:
+                pk = random.randint(1, rows)
+                try:
+                    # Read-then-write, like a stock adjustment in a view
+                    conn.execute(profile['begin'])
+                    stock = conn.execute("SELECT stock FROM product WHERE id = ?", (pk,)).fetchone()[0]
+                    conn.execute(
+                        "UPDATE product SET stock = ?, updated_at = datetime('now') WHERE id = ?",
+                        (stock + 1, pk),
+                    )
+                    conn.execute("COMMIT")
+                    count('writes')
+                except sqlite3.OperationalError:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    count('errors')
+            conn.close()
+        
+        def reader():
+            conn = self.connect(path, profile)
+            while time.monotonic() < deadline:
+                pk = random.randint(1, rows)
+                try:
+                    conn.execute("SELECT barcode, price, stock FROM product WHERE id = ?", (pk,)).fetchone()
+                    count('reads')
+                except sqlite3.OperationalError:
+                    count('errors')
+            conn.close()
+        
+        threads = [threading.Thread(target=writer) for _ in range(options['writers'])]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts
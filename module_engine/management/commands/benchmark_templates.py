@@ -0,0 +1,72 @@
+# module_engine/management/commands/benchmark_templates.py
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template import engines
+from django.test import RequestFactory
+
+
+class Command(BaseCommand):
+    help = 'Compare rendering a row-heavy module list under each template engine'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--template', default='product_module/product_list.html',
+                            help='List template to render')
+        parser.add_argument('--rows', type=int, default=1000, help='Rows rendered per page')
+        parser.add_argument('--iterations', type=int, default=20, help='Renders per engine')
+        parser.add_argument('--username', help='Render as this user (default: anonymous)')
+    
+    def handle(self, *args, **options):
+        from product_module.models import Product
+        
+        request = RequestFactory().get('/products/list/')
+        request.user = AnonymousUser()
+        if options['username']:
+            try:
+                request.user = get_user_model().objects.get(username=options['username'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User '{options['username']}' does not exist")
+        # The session and messages context processors expect these
+        request.session = {}
+        request._messages = []
+        
+        products = [
+            Product(id=i, name=f"Product {i}", barcode=f"BC{i:08d}", price=Decimal('9.99'), stock=i % 50)
+            for i in range(1, options['rows'] + 1)
+        ]
+        page = Paginator(products, options['rows']).page(1)
+        user = request.user
+        context = {
+            'products': products,
+            'object_list': products,
+            'page_obj': page,
+            'is_paginated': False,
+            'can_add': user.has_perm('product_module.add_product'),
+            'can_change': user.has_perm('product_module.change_product'),
+            'can_delete': user.has_perm('product_module.delete_product'),
+        }
+        
+        results = {}
+        for engine in engines.all():
+            try:
+                template = engine.get_template(options['template'])
+            except Exception as e:
+                self.stdout.write(f"{engine.name:8} skipped: {e}")
+                continue
+            template.render(context, request)
+            start = time.perf_counter()
+            for _ in range(options['iterations']):
+                template.render(context, request)
+            results[engine.name] = (time.perf_counter() - start) / options['iterations']
+            self.stdout.write(
+                f"{engine.name:8} {results[engine.name] * 1000:8.2f} ms per page of {options['rows']} rows"
+            )
+        
+        if 'jinja2' not in results:
+            self.stdout.write("Jinja2 is not installed; pip install Jinja2 to compare engines")
+        elif 'django' in results:
+            self.stdout.write(f"jinja2 is {results['django'] / results['jinja2']:.1f}x faster")
@@ -0,0 +1,26 @@
+# module_engine/management/commands/build_module_bundle.py
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from module_engine.bundles import BundleError, build_bundle
+
+
+class Command(BaseCommand):
+    help = 'Build a module bundle: the package with precompiled bytecode and a hashed manifest'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('modules', nargs='+', help='Module identifiers')
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'bundles'),
+                            help='Directory the bundles are written to')
+    
+    def handle(self, *args, **options):
+        for identifier in options['modules']:
+            try:
+                path, manifest = build_bundle(identifier, options['output'])
+            except (BundleError, ImportError) as e:
+                raise CommandError(f"Failed to bundle '{identifier}': {e}")
+            self.stdout.write(self.style.SUCCESS(
+                f"Built {path}: {len(manifest['files'])} files, hash {manifest['hash'][:12]}"
+            ))
@@ -1,9 +1,15 @@
 # module_engine/management/commands/install_module.py
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.db import DatabaseError
 import importlib
 import os
+import sys
 
+from module_engine import events
+from module_engine.bundles import (
+    BundleError, add_bundle_root_to_path, extract_bundle, is_extracted, is_recorded, open_bundle, read_manifest,
+)
 from module_engine.models import Module
 
 
@@ -11,10 +17,20 @@ class Command(BaseCommand):
     help = 'Install a module by identifier'
     
     def add_arguments(self, parser):
-        parser.add_argument('module_id', type=str, help='Module identifier')
+        parser.add_argument('module_id', type=str, nargs='?', help='Module identifier')
+        parser.add_argument('--bundle', help='Install from a bundle built with build_module_bundle')
     
     def handle(self, *args, **options):
         module_id = options['module_id']
+        manifest = None
+        
+        if options['bundle']:
+            manifest = self.install_bundle(options['bundle'], module_id)
+            if manifest is None:
+                return
+            module_id = manifest['identifier']
+        elif not module_id:
+            raise CommandError("Give a module identifier or --bundle.")
         
         try:
             # Check if module exists in database
@@ -60,7 +76,12 @@ class Command(BaseCommand):
             module.installed = True
             module.active = True
             module.version = module_info.MODULE_INFO['version']
+            if manifest is not None:
+                # A source copy of the module may already be imported
+                module.version = manifest['version']
+                module.bundle_hash = manifest['hash']
             module.save()
+            events.publish('module_installed', module=module_id, instance=module)
             
             self.stdout.write(self.style.SUCCESS(f"Module '{module_id}' installed successfully"))
             
@@ -72,4 +93,40 @@ class Command(BaseCommand):
             )
             
         except Exception as e:
-            raise CommandError(f"Failed to install module: {str(e)}")
\ No newline at end of file
+            raise CommandError(f"Failed to install module: {str(e)}")
+    
+    def install_bundle(self, path, module_id=None):
+        """Verify and extract a bundle; returns its manifest, or None if it is already installed."""
+        try:
+            with open_bundle(path) as bundle:
+                manifest = read_manifest(bundle)
+                if module_id and module_id != manifest['identifier']:
+                    raise CommandError(f"{path} bundles '{manifest['identifier']}', not '{module_id}'")
+                
+                if is_extracted(manifest):
+                    add_bundle_root_to_path()
+                    self.stdout.write(f"Bundle of '{manifest['identifier']}' is already extracted ({manifest['hash'][:12]})")
+                else:
+                    target = extract_bundle(bundle, manifest)
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Extracted '{manifest['identifier']}' {manifest['version']} to {target}"
+                    ))
+                    if manifest['python'] != sys.implementation.cache_tag:
+                        self.stdout.write(self.style.WARNING(
+                            f"Bundle bytecode is for {manifest['python']}, this is {sys.implementation.cache_tag}; "
+                            "modules will be compiled on first import"
+                        ))
+            
+            module, _ = Module.objects.get_or_create(identifier=manifest['identifier'], defaults={
+                'name': manifest['name'],
+                'version': manifest['version'],
+            })
+        except BundleError as e:
+            raise CommandError(f"Invalid bundle: {e}")
+        except DatabaseError as e:
+            raise CommandError(f"Cannot record bundle of '{manifest['identifier']}' (run 'migrate module_engine' first): {e}")
+        
+        if is_recorded(manifest, module):
+            self.stdout.write(f"Bundle of '{module.identifier}' is already installed, skipping")
+            return None
+        return manifest
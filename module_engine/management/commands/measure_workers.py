@@ -0,0 +1,115 @@
+# module_engine/management/commands/measure_workers.py
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def read_memory(pid):
+    """Return RSS, PSS and USS of a process in kB from /proc (Linux only)."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+
+def get_children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The ppid follows the parenthesised command name
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children
+
+
+def get_free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = 'Measure per-worker memory (RSS/PSS/USS) and boot time of gunicorn with and without preload'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Gunicorn workers to start')
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for all workers to be ready')
+        parser.add_argument('--mode', choices=['preload', 'fork'], action='append',
+                            help='Mode to measure (default: both)')
+    
+    def handle(self, *args, **options):
+        if not os.path.exists('/proc/self/smaps_rollup'):
+            raise CommandError("Memory measurement needs Linux /proc/<pid>/smaps_rollup")
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            raise CommandError("gunicorn is not installed")
+        
+        for mode in options['mode'] or ['fork', 'preload']:
+            result = self.measure(mode == 'preload', options['workers'], options['timeout'])
+            workers = result['workers']
+            count = len(workers) or 1
+            self.stdout.write(
+                f"{mode:8} boot: {result['boot']:6.2f}s  "
+                f"master RSS: {result['master']['rss'] / 1024:6.1f} MB  "
+                f"per worker RSS: {sum(w['rss'] for w in workers) / count / 1024:6.1f} MB  "
+                f"USS: {sum(w['uss'] for w in workers) / count / 1024:6.1f} MB  "
+                f"total PSS: {(result['master']['pss'] + sum(w['pss'] for w in workers)) / 1024:7.1f} MB"
+            )
+    
+    def measure(self, preload, workers, timeout):
+        port = get_free_port()
+        env = dict(
+            os.environ,
+            GUNICORN_PRELOAD=str(preload),
+            GUNICORN_WORKERS=str(workers),
+            GUNICORN_BIND=f'127.0.0.1:{port}',
+        )
+        start = time.monotonic()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'modular_django.wsgi'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            # Booted once every worker has answered the readiness check
+            ready = set()
+            while len(ready) < workers:
+                if time.monotonic() - start > timeout:
+                    raise CommandError(f"Only {len(ready)} of {workers} workers became ready within {timeout}s")
+                if process.poll() is not None:
+                    raise CommandError("gunicorn exited during startup")
+                try:
+                    with urllib.request.urlopen(f'http://127.0.0.1:{port}/modules/ready/', timeout=1) as response:
+                        ready.add(json.load(response)['pid'])
+                except (OSError, ValueError, KeyError):
+                    time.sleep(0.05)
+            boot = time.monotonic() - start
+            return {
+                'boot': boot,
+                'master': read_memory(process.pid),
+                'workers': [read_memory(pid) for pid in get_children(process.pid)],
+            }
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
@@ -0,0 +1,55 @@
+# module_engine/management/commands/prerender_pages.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from module_engine.prerender import (
+    get_page_hook, get_prerendered_modules, prerender_module, prerender_queued, remove_tree,
+)
+from module_engine.registry import get_module_info
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the public pages of modules into the static root'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('modules', nargs='*', help='Module identifiers (default: all with a prerender hook)')
+        parser.add_argument('--clear', action='store_true',
+                            help="Remove a module's pre-rendered pages before rendering")
+        parser.add_argument('--queued', action='store_true',
+                            help='Only regenerate the pages queued by changes since the last run')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='With --queued, keep working through the queue every N seconds')
+    
+    def handle(self, *args, **options):
+        identifiers = options['modules'] or get_prerendered_modules()
+        for identifier in identifiers:
+            if get_page_hook(identifier) is None:
+                raise CommandError(f"Module '{identifier}' has no prerender hook or is not loaded")
+        
+        if options['queued']:
+            return self.handle_queued(identifiers, options)
+        
+        for identifier in identifiers:
+            if options['clear']:
+                remove_tree(f"/{get_module_info(identifier)['url_prefix'].strip('/')}/")
+            
+            written, skipped = prerender_module(identifier)
+            self.stdout.write(self.style.SUCCESS(
+                f"Pre-rendered {written} pages of '{identifier}'" + (f" ({skipped} skipped)" if skipped else "")
+            ))
+    
+    def handle_queued(self, identifiers, options):
+        while True:
+            for identifier in identifiers:
+                written, skipped = prerender_queued(identifier)
+                if written or skipped or options['verbosity'] > 1:
+                    self.stdout.write(
+                        f"Regenerated {written} queued pages of '{identifier}'"
+                        + (f" ({skipped} skipped)" if skipped else "")
+                    )
+            if not options['interval']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+# module_engine/management/commands/purge_module_data.py
+from django.core.management.base import BaseCommand, CommandError
+
+from module_engine.models import ModulePurge
+from module_engine.purge import run_purge
+
+
+class Command(BaseCommand):
+    help = "Archive and delete an uninstalled module's data in batches (resumable)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('module_id', type=str, help='Module identifier')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows archived or deleted per batch')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between batches')
+    
+    def handle(self, *args, **options):
+        module_id = options['module_id']
+        purge = ModulePurge.objects.filter(identifier=module_id).exclude(status=ModulePurge.DONE).first()
+        if purge is None:
+            raise CommandError(
+                f"No pending data purge for '{module_id}'. Start one with: uninstall_module {module_id} --purge-data"
+            )
+        
+        self.stdout.write(f"Resuming purge of '{module_id}' at phase '{purge.status}', archive in {purge.archive_dir}")
+        try:
+            for status, table, rows in run_purge(purge, options['batch_size'], options['sleep']):
+                if table:
+                    self.stdout.write(f"{purge.get_status_display()} {table}: {rows} rows")
+        except Exception as e:
+            raise CommandError(f"Purge of '{module_id}' stopped, run again to resume: {e}")
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged '{module_id}': {purge.rows_archived} rows archived, {purge.rows_deleted} deleted, tables dropped"
+        ))
@@ -0,0 +1,25 @@
+# module_engine/management/commands/purge_sessions.py
+from django.core.management.base import BaseCommand
+
+from module_engine.sessions import flush_pending_touches, purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in bounded chunks'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between chunks')
+        parser.add_argument('--grace', type=int, default=None,
+                            help='Only purge sessions expired for at least this many seconds')
+    
+    def handle(self, *args, **options):
+        # Make sure expiry dates buffered by this process are on disk first
+        flush_pending_touches()
+        
+        total = 0
+        for deleted in purge_expired(options['batch_size'], options['sleep'], options['grace']):
+            total += deleted
+            self.stdout.write(f"Deleted {deleted} expired sessions ({total} so far)")
+        
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} expired sessions"))
@@ -0,0 +1,45 @@
+# module_engine/management/commands/rolling_upgrade.py
+import importlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from module_engine.models import Module
+from module_engine.rolling import get_live_workers, get_migration_phases, rolling_upgrade
+
+
+class Command(BaseCommand):
+    help = 'Upgrade a module across all workers: expand migrations, rolling restart, contract migrations'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('module_id', type=str, help='Module identifier')
+        parser.add_argument('--timeout', type=int, default=600,
+                            help='Seconds to wait for every worker to switch to the new version')
+        parser.add_argument('--dry-run', action='store_true', help='Show the plan without applying it')
+    
+    def handle(self, *args, **options):
+        module_id = options['module_id']
+        try:
+            module = Module.objects.get(identifier=module_id, installed=True)
+        except Module.DoesNotExist:
+            raise CommandError(f"Module '{module_id}' is not installed.")
+        
+        # The code deployed on this node is the version being rolled out
+        version = importlib.import_module(f"{module_id}.module_info").MODULE_INFO['version']
+        if module.version == version:
+            self.stdout.write(f"Module '{module_id}' is already at version {version}")
+            return
+        
+        expand, contract = get_migration_phases(module_id)
+        self.stdout.write(f"Upgrading '{module_id}' from {module.version} to {version}")
+        self.stdout.write(f"  expand migrations:   {', '.join(m.name for m in expand) or '-'}")
+        self.stdout.write(f"  contract migrations: {', '.join(m.name for m in contract) or '-'}")
+        self.stdout.write(f"  live workers:        {get_live_workers().count()}")
+        if options['dry_run']:
+            return
+        
+        try:
+            rolling_upgrade(module_id, version, timeout=options['timeout'], log=self.stdout.write)
+        except Exception as e:
+            raise CommandError(f"Rolling upgrade failed: {e}")
+        
+        self.stdout.write(self.style.SUCCESS(f"Module '{module_id}' upgraded to {version} on all workers"))
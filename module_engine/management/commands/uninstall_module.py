@@ -1,9 +1,12 @@
 # module_engine/management/commands/uninstall_module.py
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 import os
 
+from module_engine import events
 from module_engine.models import Module
+from module_engine.purge import start_purge
 
 
 class Command(BaseCommand):
@@ -12,6 +15,10 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('module_id', type=str, help='Module identifier')
         parser.add_argument('--force', action='store_true', help='Force uninstallation even if module not found')
+        parser.add_argument('--purge-data', action='store_true',
+                            help="Archive the module's data, delete it in batches and drop its tables")
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per batch when purging data')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between purge batches')
     
     def handle(self, *args, **options):
         module_id = options['module_id']
@@ -26,6 +33,14 @@ class Command(BaseCommand):
                     raise CommandError(f"Module '{module_id}' not found in registry.")
                 self.stdout.write(f"Module '{module_id}' not found in registry. Proceeding with removal from settings.")
             
+            if options['purge_data']:
+                # Plan while the module's models are still loaded in this process
+                try:
+                    purge = start_purge(module_id)
+                except LookupError:
+                    raise CommandError(f"Module '{module_id}' is not loaded, cannot find its tables to purge.")
+                self.stdout.write(f"Archiving {len(purge.tables)} tables to {purge.archive_dir}")
+            
             # Update settings to remove the module
             settings_path = os.path.join(settings.BASE_DIR, 'modular_django', 'settings.py')
             with open(settings_path, 'r') as f:
@@ -57,9 +72,18 @@ class Command(BaseCommand):
                 module.installed = False
                 module.active = False
                 module.save()
+                events.publish('module_uninstalled', module=module_id, instance=module)
                 self.stdout.write(self.style.SUCCESS(f"Module '{module_id}' marked as uninstalled in database"))
             
             self.stdout.write(self.style.SUCCESS(f"Module '{module_id}' uninstalled successfully"))
             
+            if options['purge_data']:
+                call_command(
+                    'purge_module_data', module_id,
+                    batch_size=options['batch_size'], sleep=options['sleep'], stdout=self.stdout,
+                )
+            
+        except CommandError:
+            raise
         except Exception as e:
             raise CommandError(f"Failed to uninstall module: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,11 @@
 # module_engine/management/commands/upgrade_module.py
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
 import importlib
 
+from module_engine import events
 from module_engine.models import Module
+from module_engine.schema import get_pending_migrations, get_schema_fingerprint
 
 
 class Command(BaseCommand):
@@ -10,6 +13,7 @@ class Command(BaseCommand):
     
     def add_arguments(self, parser):
         parser.add_argument('module_id', type=str, help='Module identifier')
+        parser.add_argument('--migrate', action='store_true', help='Generate and apply migrations if the schema changed')
     
     def handle(self, *args, **options):
         module_id = options['module_id']
@@ -39,20 +43,34 @@ class Command(BaseCommand):
                 self.stdout.write(f"Module '{module_id}' is already at version {new_version}")
                 return
             
+            fingerprint = get_schema_fingerprint(module_id)
+            schema_changed = fingerprint is None or fingerprint != module.schema_fingerprint
+            
+            if schema_changed and options['migrate']:
+                call_command('makemigrations', module_id)
+                importlib.invalidate_caches()
+                if get_pending_migrations(module_id):
+                    call_command('migrate', module_id)
+                module.schema_fingerprint = get_schema_fingerprint(module_id) or ''
+            
             # Update module version in database
             module.version = new_version
             module.save()
+            events.publish('module_upgraded', module=module_id, instance=module)
             
             self.stdout.write(self.style.SUCCESS(
                 f"Module '{module_id}' upgraded from {current_version} to {new_version}"
             ))
             
-            # Reminder about migrations
-            self.stdout.write(
-                "Don't forget to run migrations to apply any schema changes:\n"
-                f"  python manage.py makemigrations {module_id}\n"
-                f"  python manage.py migrate {module_id}"
-            )
+            if not schema_changed:
+                self.stdout.write(f"Schema of '{module_id}' is unchanged, no migrations needed")
+            elif not options['migrate']:
+                # Reminder about migrations
+                self.stdout.write(
+                    "Don't forget to run migrations to apply any schema changes:\n"
+                    f"  python manage.py makemigrations {module_id}\n"
+                    f"  python manage.py migrate {module_id}"
+                )
             
         except Exception as e:
             raise CommandError(f"Failed to upgrade module: {str(e)}")
\ No newline at end of file
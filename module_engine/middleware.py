@@ -0,0 +1,117 @@
+# module_engine/middleware.py
+import logging
+import time
+
+from django.http import HttpResponse
+
+from .admission import get_limiter, request_finished, request_started
+from .budgets import count_queries, get_budgets, record_request
+from .profiling import Profile, get_profile_module, save_profile, should_profile
+from .registry import get_module_for_path
+from .tenants import get_tenant_urlconf, resolve_tenant
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionControlMiddleware:
+    """
+    Enforce the per-module concurrency limits declared in MODULE_INFO.
+
+    Requests over a module's share of the worker's threads get an immediate
+    503 with Retry-After.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        info = get_module_for_path(request.path_info)
+        limiter = get_limiter(info) if info else None
+        
+        if limiter is not None and not limiter.acquire():
+            response = HttpResponse(
+                f"{info['name']} is busy, please retry shortly.",
+                status=503, content_type='text/plain',
+            )
+            response['Retry-After'] = str(limiter.retry_after)
+            return response
+        
+        request_started()
+        try:
+            return self.get_response(request)
+        finally:
+            request_finished()
+            if limiter is not None:
+                limiter.release()
+
+
+class ProfilerMiddleware:
+    """
+    Profile sampled requests and requests carrying the profiling token.
+    
+    Stack samples and query timelines are saved per module; profiled responses
+    carry an X-Profile-Id header.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+        
+        profile = Profile(request, get_profile_module(request))
+        with profile:
+            response = self.get_response(request)
+        save_profile(profile, response.status_code)
+        response['X-Profile-Id'] = profile.id
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Log requests that go over the query or latency budget of their view.
+    
+    Only requests to modules that declare budgets in MODULE_INFO are counted.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        info = get_module_for_path(request.path_info)
+        budgets = get_budgets(info)
+        if not budgets:
+            return self.get_response(request)
+        
+        started = time.perf_counter()
+        with count_queries() as counter:
+            response = self.get_response(request)
+        ms = (time.perf_counter() - started) * 1000
+        
+        match = getattr(request, 'resolver_match', None)
+        budget = budgets.get(match.url_name) if match else None
+        if budget:
+            problems = record_request(info['identifier'], match.url_name, budget, counter.count, ms)
+            if problems:
+                logger.warning("%s %s (%s) is over budget: %s", request.method, request.path, match.url_name, problems)
+        return response
+
+
+class TenantMiddleware:
+    """
+    Route each request through the URLconf of its tenant's module set.
+
+    Requests that don't match a tenant keep the global ROOT_URLCONF.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        request.tenant_id = None
+        tenant = resolve_tenant(request)
+        if tenant is not None:
+            request.tenant_id, identifiers = tenant
+            request.urlconf = get_tenant_urlconf(identifiers)
+        return self.get_response(request)
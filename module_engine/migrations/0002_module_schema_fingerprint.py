@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("module_engine", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="module",
+            name="schema_fingerprint",
+            field=models.CharField(
+                blank=True, max_length=64, verbose_name="Schema fingerprint"
+            ),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("module_engine", "0003_tenant"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ModulePurge",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "identifier",
+                    models.SlugField(max_length=100, verbose_name="Module identifier"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("archiving", "Archiving"),
+                            ("deleting", "Deleting"),
+                            ("dropping", "Dropping tables"),
+                            ("done", "Done"),
+                        ],
+                        default="archiving",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("tables", models.JSONField(default=list, verbose_name="Tables")),
+                (
+                    "table_index",
+                    models.IntegerField(default=0, verbose_name="Current table"),
+                ),
+                (
+                    "last_pk",
+                    models.JSONField(
+                        blank=True, null=True, verbose_name="Last archived key"
+                    ),
+                ),
+                (
+                    "archive_dir",
+                    models.CharField(max_length=500, verbose_name="Archive directory"),
+                ),
+                (
+                    "archive_offset",
+                    models.BigIntegerField(
+                        default=0, verbose_name="Archive file offset"
+                    ),
+                ),
+                (
+                    "rows_archived",
+                    models.BigIntegerField(default=0, verbose_name="Rows archived"),
+                ),
+                (
+                    "rows_deleted",
+                    models.BigIntegerField(default=0, verbose_name="Rows deleted"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished at"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Module data purge",
+                "verbose_name_plural": "Module data purges",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,151 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("module_engine", "0004_module_purge"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ModuleLock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=200, unique=True, verbose_name="Lock name"
+                    ),
+                ),
+                ("owner", models.CharField(max_length=200, verbose_name="Owner")),
+                ("acquired_at", models.DateTimeField(verbose_name="Acquired at")),
+                ("expires_at", models.DateTimeField(verbose_name="Expires at")),
+            ],
+            options={
+                "verbose_name": "Module lock",
+                "verbose_name_plural": "Module locks",
+            },
+        ),
+        migrations.CreateModel(
+            name="WorkerHeartbeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "worker_id",
+                    models.CharField(
+                        max_length=200, unique=True, verbose_name="Worker"
+                    ),
+                ),
+                ("hostname", models.CharField(max_length=200, verbose_name="Host")),
+                ("pid", models.IntegerField(verbose_name="Process ID")),
+                (
+                    "module_versions",
+                    models.JSONField(default=dict, verbose_name="Module versions"),
+                ),
+                (
+                    "draining",
+                    models.BooleanField(default=False, verbose_name="Draining"),
+                ),
+                (
+                    "in_flight",
+                    models.IntegerField(default=0, verbose_name="Requests in flight"),
+                ),
+                ("started_at", models.DateTimeField(verbose_name="Started at")),
+                (
+                    "last_seen",
+                    models.DateTimeField(db_index=True, verbose_name="Last seen"),
+                ),
+            ],
+            options={
+                "verbose_name": "Worker heartbeat",
+                "verbose_name_plural": "Worker heartbeats",
+                "ordering": ["hostname", "pid"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ModuleUpgrade",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_version",
+                    models.CharField(max_length=20, verbose_name="From version"),
+                ),
+                (
+                    "to_version",
+                    models.CharField(max_length=20, verbose_name="To version"),
+                ),
+                (
+                    "phase",
+                    models.CharField(
+                        choices=[
+                            ("expanding", "Applying expand migrations"),
+                            ("rolling", "Restarting workers"),
+                            ("contracting", "Applying contract migrations"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="expanding",
+                        max_length=20,
+                        verbose_name="Phase",
+                    ),
+                ),
+                ("owner", models.CharField(max_length=200, verbose_name="Coordinator")),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "started_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Started at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished at"
+                    ),
+                ),
+                (
+                    "module",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upgrades",
+                        to="module_engine.module",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Module upgrade",
+                "verbose_name_plural": "Module upgrades",
+                "ordering": ["-started_at"],
+            },
+        ),
+    ]
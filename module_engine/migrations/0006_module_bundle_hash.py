@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("module_engine", "0005_rolling_upgrades"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="module",
+            name="bundle_hash",
+            field=models.CharField(
+                blank=True, max_length=64, verbose_name="Bundle hash"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('module_engine', '0006_module_bundle_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrerenderTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifier', models.SlugField(max_length=100, verbose_name='Module identifier')),
+                ('path', models.CharField(blank=True, max_length=500, verbose_name='Path')),
+                ('first_page', models.IntegerField(default=1, verbose_name='First page')),
+                ('last_page', models.IntegerField(blank=True, null=True, verbose_name='Last page')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+            ],
+            options={
+                'verbose_name': 'Pre-render task',
+                'verbose_name_plural': 'Pre-render tasks',
+                'ordering': ['id'],
+            },
+        ),
+    ]
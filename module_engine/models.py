@@ -10,6 +10,8 @@ class Module(models.Model):
     version = models.CharField(_("Version"), max_length=20)
     installed = models.BooleanField(_("Installed"), default=False)
     active = models.BooleanField(_("Active"), default=False)
+    schema_fingerprint = models.CharField(_("Schema fingerprint"), max_length=64, blank=True)
+    bundle_hash = models.CharField(_("Bundle hash"), max_length=64, blank=True)
     install_date = models.DateTimeField(_("Install date"), auto_now_add=True)
     update_date = models.DateTimeField(_("Update date"), auto_now=True)
     
@@ -37,4 +39,146 @@ class ModuleField(models.Model):
         verbose_name_plural = _("Module fields")
     
     def __str__(self):
-        return f"{self.module.name} - {self.model_name}.{self.field_name}"
\ No newline at end of file
+        return f"{self.module.name} - {self.model_name}.{self.field_name}"
+
+class Tenant(models.Model):
+    """A customer served by this deployment with its own set of active modules."""
+    name = models.CharField(_("Tenant name"), max_length=100)
+    slug = models.SlugField(_("Tenant identifier"), max_length=100, unique=True)
+    domain = models.CharField(_("Domain"), max_length=255, unique=True, null=True, blank=True)
+    modules = models.ManyToManyField(Module, blank=True, related_name='tenants', verbose_name=_("Active modules"))
+    active = models.BooleanField(_("Active"), default=True)
+    
+    class Meta:
+        verbose_name = _("Tenant")
+        verbose_name_plural = _("Tenants")
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class ModulePurge(models.Model):
+    """Progress of archiving and deleting an uninstalled module's data."""
+    ARCHIVING = 'archiving'
+    DELETING = 'deleting'
+    DROPPING = 'dropping'
+    DONE = 'done'
+    STATUS_CHOICES = [
+        (ARCHIVING, _("Archiving")),
+        (DELETING, _("Deleting")),
+        (DROPPING, _("Dropping tables")),
+        (DONE, _("Done")),
+    ]
+    
+    identifier = models.SlugField(_("Module identifier"), max_length=100)
+    status = models.CharField(_("Status"), max_length=20, choices=STATUS_CHOICES, default=ARCHIVING)
+    # Tables in deletion order (referencing tables first) with their pk column
+    tables = models.JSONField(_("Tables"), default=list)
+    table_index = models.IntegerField(_("Current table"), default=0)
+    last_pk = models.JSONField(_("Last archived key"), null=True, blank=True)
+    archive_dir = models.CharField(_("Archive directory"), max_length=500)
+    archive_offset = models.BigIntegerField(_("Archive file offset"), default=0)
+    rows_archived = models.BigIntegerField(_("Rows archived"), default=0)
+    rows_deleted = models.BigIntegerField(_("Rows deleted"), default=0)
+    # Last error; the purge stays in its phase and resumes from there
+    error = models.TextField(_("Error"), blank=True)
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+    finished_at = models.DateTimeField(_("Finished at"), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _("Module data purge")
+        verbose_name_plural = _("Module data purges")
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.identifier} ({self.get_status_display()})"
+
+
+class ModuleLock(models.Model):
+    """A named lease held by one node, e.g. while it migrates a module."""
+    name = models.CharField(_("Lock name"), max_length=200, unique=True)
+    owner = models.CharField(_("Owner"), max_length=200)
+    acquired_at = models.DateTimeField(_("Acquired at"))
+    expires_at = models.DateTimeField(_("Expires at"))
+    
+    class Meta:
+        verbose_name = _("Module lock")
+        verbose_name_plural = _("Module locks")
+    
+    def __str__(self):
+        return f"{self.name} ({self.owner})"
+
+
+class WorkerHeartbeat(models.Model):
+    """Last report of a serving worker process and the module versions it runs."""
+    worker_id = models.CharField(_("Worker"), max_length=200, unique=True)
+    hostname = models.CharField(_("Host"), max_length=200)
+    pid = models.IntegerField(_("Process ID"))
+    module_versions = models.JSONField(_("Module versions"), default=dict)
+    draining = models.BooleanField(_("Draining"), default=False)
+    in_flight = models.IntegerField(_("Requests in flight"), default=0)
+    started_at = models.DateTimeField(_("Started at"))
+    last_seen = models.DateTimeField(_("Last seen"), db_index=True)
+    
+    class Meta:
+        verbose_name = _("Worker heartbeat")
+        verbose_name_plural = _("Worker heartbeats")
+        ordering = ['hostname', 'pid']
+    
+    def __str__(self):
+        return self.worker_id
+
+
+class ModuleUpgrade(models.Model):
+    """A rolling upgrade of one module across all workers."""
+    EXPANDING = 'expanding'
+    ROLLING = 'rolling'
+    CONTRACTING = 'contracting'
+    DONE = 'done'
+    FAILED = 'failed'
+    PHASE_CHOICES = [
+        (EXPANDING, _("Applying expand migrations")),
+        (ROLLING, _("Restarting workers")),
+        (CONTRACTING, _("Applying contract migrations")),
+        (DONE, _("Done")),
+        (FAILED, _("Failed")),
+    ]
+    
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='upgrades')
+    from_version = models.CharField(_("From version"), max_length=20)
+    to_version = models.CharField(_("To version"), max_length=20)
+    phase = models.CharField(_("Phase"), max_length=20, choices=PHASE_CHOICES, default=EXPANDING)
+    owner = models.CharField(_("Coordinator"), max_length=200)
+    error = models.TextField(_("Error"), blank=True)
+    started_at = models.DateTimeField(_("Started at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+    finished_at = models.DateTimeField(_("Finished at"), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _("Module upgrade")
+        verbose_name_plural = _("Module upgrades")
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"{self.module.identifier} {self.from_version} -> {self.to_version} ({self.get_phase_display()})"
+
+
+class PrerenderTask(models.Model):
+    """Pre-rendered pages of a module waiting to be regenerated by ``prerender_pages --queued``."""
+    identifier = models.SlugField(_("Module identifier"), max_length=100)
+    # Blank for every page of the module
+    path = models.CharField(_("Path"), max_length=500, blank=True)
+    first_page = models.IntegerField(_("First page"), default=1)
+    # Null for every page from first_page on
+    last_page = models.IntegerField(_("Last page"), null=True, blank=True)
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Pre-render task")
+        verbose_name_plural = _("Pre-render tasks")
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.identifier} {self.path or '*'} {self.first_page}-{self.last_page or 'end'}"
@@ -0,0 +1,42 @@
+# module_engine/preload.py
+"""
+Preload-and-fork serving.
+
+With ``MODULE_PRELOAD=True`` (set by ``gunicorn.conf.py`` when ``preload_app``
+is on) the WSGI module warms every active module synchronously in the master
+process: imports, templates, URL resolvers and content types. Database
+connections are then closed and the heap is frozen with ``gc.freeze()`` so the
+garbage collector does not write to inherited objects and forked workers keep
+sharing those pages copy-on-write.
+"""
+import gc
+import os
+
+from django.db import connections
+
+from .warmup import warm_up
+
+
+def is_preloading():
+    return os.environ.get('MODULE_PRELOAD', 'False') == 'True'
+
+
+def prepare_fork():
+    """Drop state that must not be shared with children and freeze the heap."""
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def preload():
+    """Warm everything in the master before workers are forked."""
+    warm_up()
+    prepare_fork()
+
+
+def after_fork():
+    """Per-worker setup that must not happen in the master."""
+    # Connections are per process; a child never reuses the master's
+    connections.close_all()
+    from .rolling import start_heartbeat
+    start_heartbeat()
@@ -0,0 +1,286 @@
+# module_engine/prerender.py
+"""
+Static pre-rendering of public module pages.
+
+Modules list the pages worth pre-rendering with a hook named in MODULE_INFO::
+
+    'prerender': 'product_module.prerender.get_pages',
+
+The hook yields ``(path, page, data)`` tuples. Each page is rendered as an
+anonymous visitor would see it and written below PRERENDER_ROOT (inside the
+static root), as ``<path>/index.html`` or ``<path>/page-<n>.html``, with
+``data`` written next to it as JSON. The static layer serves these files to
+anonymous visitors: Vercel routes them from the static build output, and
+elsewhere ``PrerenderedPages`` wraps the WSGI application so they are sent
+before Django, its middleware or the database are involved. Pages that were
+not generated fall through to the dynamic view.
+
+Regenerating pages after a write can take longer than the write itself, so
+modules render only the pages a change touches directly and queue the rest
+(``queue_pages``). ``prerender_pages --queued`` works through the queue,
+merging overlapping ranges, with a module's ``'prerender_range'`` hook::
+
+    'prerender_range': 'product_module.prerender.get_list_pages',
+
+which yields the ``(path, page, data)`` tuples for pages ``first..last`` of a
+path (``last`` None for every page from ``first`` on).
+"""
+import json
+import logging
+import os
+import re
+import shutil
+from importlib import import_module
+from urllib.parse import parse_qs
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Max
+from django.core.handlers.wsgi import get_path_info
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import parse_cookie
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+
+from .models import PrerenderTask
+from .registry import get_module_apps, get_module_info
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'html': 'text/html; charset=utf-8',
+    'json': 'application/json',
+}
+ALLOWED_PARAMS = {'page', 'format'}
+# Page numbers as the list views write them: no zero, sign or leading zeros
+PAGE_NUMBER = re.compile(r'[1-9][0-9]*')
+
+
+def get_prerender_root():
+    return getattr(
+        settings, 'PRERENDER_ROOT',
+        os.path.join(settings.STATIC_ROOT, 'prerendered'),
+    )
+
+
+def get_page_file(path, page=None, ext='html'):
+    """Return the file a page is stored in, or None for paths that cannot be stored."""
+    if not path.startswith('/') or not path.endswith('/') or '..' in path.split('/'):
+        return None
+    name = f"page-{page}" if page and int(page) > 1 else 'index'
+    return os.path.join(get_prerender_root(), path.strip('/'), f"{name}.{ext}")
+
+
+def get_prerendered_file(environ):
+    """Return ``(file, ext)`` to serve for a WSGI request, or None to pass it to Django."""
+    if environ.get('REQUEST_METHOD') not in ('GET', 'HEAD'):
+        return None
+    # Anyone with a session might be logged in and see a personalised page
+    if settings.SESSION_COOKIE_NAME in parse_cookie(environ.get('HTTP_COOKIE', '')):
+        return None
+    # Tenants can have a different module set than the pre-rendered site
+    if environ.get(getattr(settings, 'TENANT_HEADER', 'HTTP_X_TENANT')):
+        return None
+    hosts = getattr(settings, 'PRERENDER_HOSTS', [])
+    if hosts and environ.get('HTTP_HOST', '').split(':')[0].lower() not in hosts:
+        return None
+    params = parse_qs(environ.get('QUERY_STRING', ''), keep_blank_values=True)
+    if not set(params) <= ALLOWED_PARAMS or any(len(values) > 1 for values in params.values()):
+        return None
+    page = params.get('page', [None])[0]
+    if page is not None and not PAGE_NUMBER.fullmatch(page):
+        return None
+    ext = 'json' if params.get('format') == ['json'] else 'html'
+    file = get_page_file(get_path_info(environ), page, ext)
+    if file is None or not os.path.isfile(file):
+        return None
+    return file, ext
+
+
+class PrerenderedPages:
+    """
+    Serve pre-rendered pages ahead of a WSGI application.
+
+    Requests without a matching file, or that may not get one (sessions,
+    tenants, other query parameters), are passed on to the application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    def __call__(self, environ, start_response):
+        found = get_prerendered_file(environ)
+        if found is not None:
+            file, ext = found
+            try:
+                f = open(file, 'rb')
+            except OSError:
+                # Removed since it was found; the view renders it
+                pass
+            else:
+                start_response('200 OK', [
+                    ('Content-Type', CONTENT_TYPES[ext]),
+                    ('Content-Length', str(os.fstat(f.fileno()).st_size)),
+                    ('Cache-Control', f"public, max-age={getattr(settings, 'PRERENDER_MAX_AGE', 60)}"),
+                    ('Vary', 'Cookie'),
+                    ('X-Prerendered', '1'),
+                ])
+                if environ['REQUEST_METHOD'] == 'HEAD':
+                    f.close()
+                    return []
+                return environ.get('wsgi.file_wrapper', FileWrapper)(f, 8192)
+        return self.application(environ, start_response)
+
+
+def render_page(path, page=None):
+    """Render a page as an anonymous visitor; return the HTML or None if it is not a 200."""
+    request = RequestFactory().get(path, {'page': page} if page else {})
+    request.user = AnonymousUser()
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def _write(file, content):
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    tmp_file = f"{file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_file, file)
+
+
+def write_page(path, page=None, data=None):
+    """Pre-render one page (and its JSON); returns False if the page no longer exists."""
+    content = render_page(path, page)
+    if content is None:
+        remove_page(path, page)
+        return False
+    try:
+        _write(get_page_file(path, page), content)
+        if data is not None:
+            _write(
+                get_page_file(path, page, 'json'),
+                json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode(),
+            )
+    except OSError as e:
+        # Read-only filesystems (e.g. Vercel at runtime) keep the build's pages
+        logger.debug("Could not write pre-rendered page %s: %s", path, e)
+        return False
+    return True
+
+
+def remove_page(path, page=None):
+    for ext in CONTENT_TYPES:
+        try:
+            os.remove(get_page_file(path, page, ext))
+        except OSError:
+            pass
+
+
+def remove_pages_after(path, last_page):
+    """Remove ``page-<n>`` files of a paginated path beyond ``last_page``."""
+    directory = os.path.dirname(get_page_file(path))
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        stem, _, ext = name.partition('.')
+        if stem.startswith('page-') and stem[5:].isdigit() and int(stem[5:]) > last_page:
+            remove_page(path, int(stem[5:]))
+
+
+def remove_tree(path):
+    """Remove every pre-rendered file below a path."""
+    shutil.rmtree(os.path.dirname(get_page_file(path)), ignore_errors=True)
+
+
+def get_page_hook(identifier, key='prerender'):
+    info = get_module_info(identifier) or {}
+    if not info.get(key):
+        return None
+    module_path, _, name = info[key].rpartition('.')
+    return getattr(import_module(module_path), name)
+
+
+def prerender_module(identifier):
+    """Pre-render every page a module lists; returns ``(written, skipped)``."""
+    hook = get_page_hook(identifier)
+    if hook is None:
+        return 0, 0
+    written = skipped = 0
+    for path, page, data in hook():
+        if write_page(path, page, data):
+            written += 1
+        else:
+            skipped += 1
+    return written, skipped
+
+
+def queue_pages(identifier, path='', first=1, last=None):
+    """
+    Queue pages ``first..last`` of a path (every page of the module without one).
+
+    The task is written in the caller's transaction, so a rolled back change
+    queues nothing. A pending whole-module task makes further ones redundant.
+    """
+    tasks = PrerenderTask.objects.filter(identifier=identifier)
+    if tasks.filter(path='').exists():
+        return
+    if not path:
+        tasks.delete()
+    PrerenderTask.objects.create(identifier=identifier, path=path, first_page=first, last_page=last)
+
+
+def merge_ranges(ranges):
+    """Merge ``(first, last)`` page ranges, ``last`` None meaning open-ended."""
+    merged = []
+    for first, last in sorted(ranges, key=lambda r: (r[0], float('inf') if r[1] is None else r[1])):
+        if merged and (merged[-1][1] is None or first <= merged[-1][1] + 1):
+            previous = merged[-1][1]
+            merged[-1][1] = None if previous is None or last is None else max(previous, last)
+        else:
+            merged.append([first, last])
+    return [tuple(r) for r in merged]
+
+
+def prerender_queued(identifier):
+    """Regenerate a module's queued pages; returns ``(written, skipped)``."""
+    tasks = PrerenderTask.objects.filter(identifier=identifier)
+    # Tasks queued while this runs wait for the next pass
+    last_id = tasks.aggregate(last_id=Max('id'))['last_id']
+    if last_id is None:
+        return 0, 0
+    tasks = tasks.filter(id__lte=last_id)
+    ranges = {}
+    for path, first, last in tasks.values_list('path', 'first_page', 'last_page'):
+        ranges.setdefault(path, []).append((first, last))
+
+    hook = get_page_hook(identifier, 'prerender_range')
+    if '' in ranges or hook is None:
+        result = prerender_module(identifier)
+    else:
+        written = skipped = 0
+        for path, path_ranges in ranges.items():
+            for first, last in merge_ranges(path_ranges):
+                for page_path, page, data in hook(path, first, last):
+                    if write_page(page_path, page, data):
+                        written += 1
+                    else:
+                        skipped += 1
+        result = written, skipped
+    tasks.delete()
+    return result
+
+
+def get_prerendered_modules():
+    """Return the identifiers of loaded modules with a pre-render hook."""
+    return [info['identifier'] for _, info in get_module_apps() if info.get('prerender')]
@@ -0,0 +1,302 @@
+# module_engine/profiling.py
+"""
+Sampling request profiler.
+
+ProfilerMiddleware profiles a random fraction of requests
+(PROFILER_SAMPLE_RATE) and every request that sends the PROFILER_TOKEN in an
+``X-Module-Profile`` header. While a request is profiled, a shared sampler
+thread records the request thread's stack every PROFILER_INTERVAL seconds
+and a database execute wrapper records when each query started, how long it
+took and its SQL.
+
+Profiles are attributed to the module whose ``url_prefix`` matches the path
+(``site`` for everything else) and written below PROFILE_ROOT/<module>/:
+
+* ``stacks.folded``: folded stacks (``frame;frame;frame count``), the input
+  format of flamegraph.pl and speedscope, which sum repeated stacks;
+* ``requests/<id>.json``: the request's query timeline and its top stacks.
+"""
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .registry import get_module_for_path
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_MODULE_PROFILE'
+SITE = 'site'
+MAX_DEPTH = 128
+MAX_SQL_LENGTH = 1000
+FOLDED_FILE = 'stacks.folded'
+
+
+def get_profile_root():
+    return getattr(settings, 'PROFILE_ROOT', os.path.join(settings.BASE_DIR, '.cache', 'profiles'))
+
+
+def get_interval():
+    return getattr(settings, 'PROFILER_INTERVAL', 0.005)
+
+
+def should_profile(request):
+    """Return True if this request is sampled or carries the profiling token."""
+    token = getattr(settings, 'PROFILER_TOKEN', '')
+    header = request.META.get(PROFILE_HEADER)
+    if token and header and hmac.compare_digest(header.encode(), token.encode()):
+        return True
+    rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0)
+    return rate > 0 and random.random() < rate
+
+
+def fold_stack(frame):
+    """Return a frame's stack as ``outermost;...;innermost`` of ``module:function``."""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Sampler:
+    """One thread sampling the stacks of every thread with an active profile."""
+
+    def __init__(self):
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, thread_id, profile):
+        with self._lock:
+            self._profiles[thread_id] = profile
+            # Threads do not survive a fork, so check rather than remember
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run, name='module-profiler', daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def remove(self, thread_id):
+        with self._lock:
+            self._profiles.pop(thread_id, None)
+
+    def run(self):
+        while True:
+            self._wake.wait()
+            # Each pass holds the lock, so remove() returns only once no sample
+            # of that profile is in flight and its stacks can be read safely
+            with self._lock:
+                if not self._profiles:
+                    self._wake.clear()
+                    continue
+                frames = sys._current_frames()
+                for thread_id, profile in self._profiles.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        profile.stacks[fold_stack(frame)] += 1
+                del frames
+            time.sleep(get_interval())
+
+
+sampler = Sampler()
+
+
+class Profile:
+    """Stack samples and query timeline of one request."""
+
+    def __init__(self, request, module):
+        self.id = uuid.uuid4().hex[:16]
+        self.module = module
+        self.method = request.method
+        self.path = request.path_info
+        self.timestamp = timezone.now()
+        self.stacks = Counter()
+        self.queries = []
+        self.started = None
+        self.duration = None
+        self._exit_stack = None
+
+    def query_wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.queries.append({
+                    'db': alias,
+                    'start_ms': round((start - self.started) * 1000, 3),
+                    'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+                    'sql': sql[:MAX_SQL_LENGTH],
+                    'many': many,
+                })
+        return wrapper
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self._exit_stack = ExitStack()
+        for connection in connections.all():
+            self._exit_stack.enter_context(connection.execute_wrapper(self.query_wrapper(connection.alias)))
+        sampler.add(threading.get_ident(), self)
+        return self
+
+    def __exit__(self, *exc_info):
+        sampler.remove(threading.get_ident())
+        self._exit_stack.close()
+        self.duration = time.perf_counter() - self.started
+
+
+def get_module_dir(module):
+    return os.path.join(get_profile_root(), module)
+
+
+def save_profile(profile, status):
+    """Append a profile's stacks to its module's folded file and write its timeline."""
+    module_dir = get_module_dir(profile.module)
+    stacks = profile.stacks.most_common()
+    record = {
+        'id': profile.id,
+        'module': profile.module,
+        'method': profile.method,
+        'path': profile.path,
+        'status': status,
+        'timestamp': profile.timestamp.isoformat(),
+        'duration_ms': round(profile.duration * 1000, 3),
+        'interval_ms': get_interval() * 1000,
+        'samples': sum(profile.stacks.values()),
+        'query_count': len(profile.queries),
+        'query_ms': round(sum(query['duration_ms'] for query in profile.queries), 3),
+        'queries': profile.queries,
+        'top_stacks': stacks[:20],
+    }
+    try:
+        os.makedirs(os.path.join(module_dir, 'requests'), exist_ok=True)
+        rotate(os.path.join(module_dir, FOLDED_FILE))
+        # One write per request keeps concurrent appends from interleaving lines
+        with open(os.path.join(module_dir, FOLDED_FILE), 'a') as f:
+            f.write(''.join(f"{stack} {count}\n" for stack, count in stacks))
+        with open(os.path.join(module_dir, 'requests', f"{profile.id}.json"), 'w') as f:
+            json.dump(record, f)
+        prune_requests(module_dir)
+    except OSError as e:
+        logger.debug("Could not write profile %s: %s", profile.id, e)
+
+
+def rotate(path):
+    """Start a new folded file once it outgrows PROFILER_MAX_FOLDED_BYTES."""
+    try:
+        if os.path.getsize(path) > getattr(settings, 'PROFILER_MAX_FOLDED_BYTES', 8 * 1024 * 1024):
+            os.replace(path, f"{path}.1")
+    except OSError:
+        pass
+
+
+def prune_requests(module_dir):
+    """Keep the newest PROFILER_MAX_REQUESTS request timelines of a module."""
+    limit = getattr(settings, 'PROFILER_MAX_REQUESTS', 200)
+    files = list_request_files(module_dir)
+    for name in files[limit:]:
+        try:
+            os.remove(os.path.join(module_dir, 'requests', name))
+        except OSError:
+            pass
+
+
+def list_request_files(module_dir):
+    """Return a module's request timeline files, newest first."""
+    directory = os.path.join(module_dir, 'requests')
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return [entry.name for entry in entries if entry.name.endswith('.json')]
+
+
+# Reports
+
+def get_profiled_modules():
+    """Return ``[{'module': ..., 'requests': ...}]`` for every module with profiles."""
+    try:
+        names = sorted(os.listdir(get_profile_root()))
+    except OSError:
+        return []
+    return [
+        {'module': name, 'requests': len(list_request_files(get_module_dir(name)))}
+        for name in names if os.path.isdir(get_module_dir(name))
+    ]
+
+
+def is_profiled_module(module):
+    return module in {entry['module'] for entry in get_profiled_modules()}
+
+
+def get_folded_stacks(module):
+    """Return a Counter of every recorded stack of a module, repeated stacks summed."""
+    stacks = Counter()
+    path = os.path.join(get_module_dir(module), FOLDED_FILE)
+    for name in (f"{path}.1", path):
+        try:
+            with open(name) as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack and count.isdigit():
+                        stacks[stack] += int(count)
+        except OSError:
+            continue
+    return stacks
+
+
+def get_hot_frames(stacks, limit=30):
+    """
+    Return the frames with the most samples as ``(frame, self, total)``.
+
+    ``self`` counts samples where the frame was running, ``total`` samples
+    where it was anywhere on the stack.
+    """
+    own, total = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return [(frame, own[frame], count) for frame, count in total.most_common(limit)]
+
+
+def get_recent_requests(module, limit=50):
+    """Return the newest request timelines of a module, without their queries."""
+    module_dir = get_module_dir(module)
+    found = []
+    for name in list_request_files(module_dir)[:limit]:
+        record = load_request(module, name[:-len('.json')])
+        if record is not None:
+            record.pop('queries', None)
+            found.append(record)
+    return found
+
+
+def load_request(module, profile_id):
+    if not profile_id.isalnum():
+        return None
+    try:
+        with open(os.path.join(get_module_dir(module), 'requests', f"{profile_id}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def get_profile_module(request):
+    info = get_module_for_path(request.path_info)
+    return info['identifier'] if info else SITE
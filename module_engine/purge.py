@@ -0,0 +1,288 @@
+# module_engine/purge.py
+"""
+Chunked purge of an uninstalled module's data.
+
+A purge runs in three resumable phases, with its progress kept in a
+``ModulePurge`` row:
+
+1. archive: every table is exported in primary key order to
+   ``<archive_dir>/<table>.jsonl.gz``, one gzip member per batch, recording the
+   last key and file offset after each batch;
+2. delete: rows up to the last archived key are deleted in bounded batches,
+   referencing tables first, each batch in its own short transaction;
+3. drop: once every table is empty, and as many rows were deleted as were
+   archived, the tables are dropped and the module's migrations, content types
+   and permissions are forgotten.
+
+Workers that have not restarted yet may still write to the tables. Rows that
+arrive after a table was archived are left alone by the delete phase; the drop
+then sends the purge back to archiving and stops, and the next run archives
+and deletes them.
+
+The table list is captured when the purge is planned, so a purge can be
+resumed after the module has been removed from INSTALLED_APPS.
+"""
+import gzip
+import json
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils import timezone
+
+from .models import Module, ModulePurge
+from .schema import invalidate_migration_graph_cache
+
+
+def get_archive_root():
+    return getattr(settings, 'MODULE_ARCHIVE_ROOT', os.path.join(settings.BASE_DIR, 'archives'))
+
+
+def order_for_deletion(references):
+    """
+    Order tables so that each comes after every table referencing it.
+
+    ``references`` maps each table to the tables it references. Tables in a
+    reference cycle are each visited once, in name order.
+    """
+    ordered = []
+    visited = set()
+
+    def visit(table):
+        # Tables already placed or on the current path (a reference cycle)
+        if table in visited:
+            return
+        visited.add(table)
+        # Everything that references this table has to be emptied first
+        for other, targets in sorted(references.items()):
+            if table in targets:
+                visit(other)
+        ordered.append(table)
+
+    for table in sorted(references):
+        visit(table)
+    return ordered
+
+
+def get_module_tables(app_label):
+    """
+    Return ``[{'table': ..., 'pk': ...}]`` for an app's existing tables.
+
+    Tables are ordered so that a table comes before the tables it references,
+    which is the order rows can be deleted in without breaking foreign keys.
+    """
+    models = {
+        model._meta.db_table: model
+        for model in apps.get_app_config(app_label).get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    }
+    existing = set(connection.introspection.table_names())
+    references = {
+        table: {
+            field.related_model._meta.db_table
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model._meta.db_table in models
+            and field.related_model._meta.db_table != table
+        }
+        for table, model in models.items()
+    }
+
+    ordered = order_for_deletion(references)
+    return [
+        {'table': table, 'pk': models[table]._meta.pk.column}
+        for table in ordered if table in existing
+    ]
+
+
+def start_purge(identifier):
+    """Return the unfinished purge of a module, planning a new one if there is none."""
+    purge = ModulePurge.objects.filter(identifier=identifier).exclude(status=ModulePurge.DONE).first()
+    if purge is not None:
+        return purge
+    tables = get_module_tables(apps.get_app_config(identifier).label)
+    stamp = timezone.now().strftime('%Y%m%d%H%M%S')
+    archive_dir = os.path.join(get_archive_root(), f"{identifier}-{stamp}")
+    os.makedirs(archive_dir, exist_ok=True)
+    version = Module.objects.filter(identifier=identifier).values_list('version', flat=True).first()
+    with open(os.path.join(archive_dir, 'manifest.json'), 'w') as f:
+        json.dump({'module': identifier, 'version': version, 'created': stamp, 'tables': tables}, f, indent=2)
+    return ModulePurge.objects.create(identifier=identifier, tables=tables, archive_dir=archive_dir)
+
+
+def start_table(purge):
+    """Point the archive cursor past what was already archived of the current table."""
+    entry = {}
+    if purge.status == ModulePurge.ARCHIVING and purge.table_index < len(purge.tables):
+        entry = purge.tables[purge.table_index]
+    purge.last_pk = entry.get('archived_pk')
+    purge.archive_offset = entry.get('archive_offset', 0)
+
+
+def archive_batch(purge, entry, batch_size):
+    """Append the next batch of a table to its archive; return the number of rows."""
+    qn = connection.ops.quote_name
+    table, pk = qn(entry['table']), qn(entry['pk'])
+    with connection.cursor() as cursor:
+        if purge.last_pk is None:
+            cursor.execute(f"SELECT * FROM {table} ORDER BY {pk} LIMIT %s", [batch_size])
+        else:
+            cursor.execute(f"SELECT * FROM {table} WHERE {pk} > %s ORDER BY {pk} LIMIT %s", [purge.last_pk, batch_size])
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+    if not rows:
+        return 0
+
+    lines = [json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n' for row in rows]
+    path = os.path.join(purge.archive_dir, f"{entry['table']}.jsonl.gz")
+    with open(path, 'ab') as f:
+        # Drop anything written after the last recorded batch (an interrupted run)
+        f.truncate(purge.archive_offset)
+        f.write(gzip.compress(''.join(lines).encode()))
+        f.flush()
+        os.fsync(f.fileno())
+        purge.archive_offset = f.tell()
+
+    purge.last_pk = rows[-1][columns.index(entry['pk'])]
+    purge.rows_archived += len(rows)
+    entry['archived_rows'] = entry.get('archived_rows', 0) + len(rows)
+    purge.save(update_fields=['last_pk', 'archive_offset', 'rows_archived', 'tables', 'updated_at'])
+    return len(rows)
+
+
+def delete_batch(purge, entry, batch_size):
+    """Delete the next batch of archived rows from a table; return the number of rows."""
+    if entry.get('archived_pk') is None:
+        return 0
+    qn = connection.ops.quote_name
+    table, pk = qn(entry['table']), qn(entry['pk'])
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {pk} IN "
+                f"(SELECT {pk} FROM {table} WHERE {pk} <= %s ORDER BY {pk} LIMIT %s)",
+                [entry['archived_pk'], batch_size],
+            )
+            deleted = cursor.rowcount
+        if deleted:
+            purge.rows_deleted += deleted
+            entry['deleted_rows'] = entry.get('deleted_rows', 0) + deleted
+            purge.save(update_fields=['rows_deleted', 'tables', 'updated_at'])
+    return deleted
+
+
+def table_is_empty(entry):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT 1 FROM {connection.ops.quote_name(entry['table'])} LIMIT 1")
+        return cursor.fetchone() is None
+
+
+def lock_tables(cursor, tables):
+    """Keep other writers out of ``tables`` until the transaction ends."""
+    if not tables:
+        return
+    names = [connection.ops.quote_name(table) for table in tables]
+    if connection.vendor == 'postgresql':
+        cursor.execute(f"LOCK TABLE {', '.join(names)} IN ACCESS EXCLUSIVE MODE")
+    elif connection.vendor == 'sqlite' and getattr(connection, 'transaction_mode', 'DEFERRED') == 'DEFERRED':
+        # A write statement takes the database write lock; module_engine's
+        # backend already took it with BEGIN IMMEDIATE
+        cursor.execute(f"DELETE FROM {names[0]} WHERE 0 = 1")
+
+
+def drop_tables(purge):
+    """Drop the (empty) tables and forget the module's schema."""
+    existing = set(connection.introspection.table_names())
+    tables = [entry for entry in purge.tables if entry['table'] in existing]
+    # Checked and dropped under one lock, so no row can arrive in between
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            lock_tables(cursor, [entry['table'] for entry in tables])
+            for entry in tables:
+                if not table_is_empty(entry):
+                    raise RuntimeError(f"Table {entry['table']} is not empty, refusing to drop it")
+            for entry in tables:
+                cursor.execute(f"DROP TABLE {connection.ops.quote_name(entry['table'])}")
+        # Permissions and group assignments go with the content types
+        ContentType.objects.filter(app_label=purge.identifier).delete()
+        MigrationRecorder.Migration.objects.filter(app=purge.identifier).delete()
+        Module.objects.filter(identifier=purge.identifier).update(schema_fingerprint='')
+    ContentType.objects.clear_cache()
+    invalidate_migration_graph_cache()
+
+
+def check_counts(purge):
+    """Refuse to drop tables that lost rows which were never archived."""
+    for entry in purge.tables:
+        archived, deleted = entry.get('archived_rows', 0), entry.get('deleted_rows', 0)
+        if archived != deleted:
+            raise RuntimeError(
+                f"Table {entry['table']}: {archived} rows archived but {deleted} deleted, refusing to drop it"
+            )
+
+
+def advance(purge, status):
+    purge.status = status
+    purge.table_index = 0
+    start_table(purge)
+    purge.save(update_fields=['status', 'table_index', 'last_pk', 'archive_offset', 'updated_at'])
+
+
+def run_purge(purge, batch_size=1000, pause=0):
+    """
+    Run (or resume) a purge, yielding ``(status, table, rows)`` after each batch.
+
+    ``pause`` seconds are slept between batches to leave room for other writers.
+    """
+    if purge.error:
+        purge.error = ''
+        purge.save(update_fields=['error', 'updated_at'])
+    try:
+        for status, process in ((ModulePurge.ARCHIVING, archive_batch), (ModulePurge.DELETING, delete_batch)):
+            if purge.status != status:
+                continue
+            while purge.table_index < len(purge.tables):
+                entry = purge.tables[purge.table_index]
+                rows = process(purge, entry, batch_size)
+                if rows:
+                    yield status, entry['table'], rows
+                    if pause:
+                        time.sleep(pause)
+                    continue
+                if status == ModulePurge.ARCHIVING and purge.last_pk is not None:
+                    # The delete phase stops at the last archived key
+                    entry['archived_pk'] = purge.last_pk
+                    entry['archive_offset'] = purge.archive_offset
+                purge.table_index += 1
+                start_table(purge)
+                purge.save(update_fields=['table_index', 'last_pk', 'archive_offset', 'tables', 'updated_at'])
+            advance(purge, ModulePurge.DELETING if status == ModulePurge.ARCHIVING else ModulePurge.DROPPING)
+
+        if purge.status == ModulePurge.DROPPING:
+            existing = set(connection.introspection.table_names())
+            late = [
+                entry['table'] for entry in purge.tables
+                if entry['table'] in existing and not table_is_empty(entry)
+            ]
+            if late:
+                # Written by workers still serving the module; archive them next run
+                advance(purge, ModulePurge.ARCHIVING)
+                raise RuntimeError(
+                    f"Rows arrived in {', '.join(late)} after archiving; run the purge again "
+                    f"once every worker has restarted to archive and delete them"
+                )
+            check_counts(purge)
+            drop_tables(purge)
+            purge.status = ModulePurge.DONE
+            purge.finished_at = timezone.now()
+            purge.save(update_fields=['status', 'finished_at', 'updated_at'])
+            yield purge.status, None, 0
+    except Exception as e:
+        # Keep the phase so the next run resumes where this one stopped
+        purge.error = str(e)
+        purge.save(update_fields=['error', 'updated_at'])
+        raise
@@ -0,0 +1,45 @@
+# module_engine/registry.py
+"""Lookup helpers for module metadata declared in ``module_info.py``."""
+import functools
+from importlib import import_module
+
+from django.apps import apps
+
+
+def get_module_info(app_name):
+    """Return the MODULE_INFO dict of an app, or None if it is not a module."""
+    try:
+        module_info = import_module(f"{app_name}.module_info")
+    except ImportError:
+        # App doesn't have a module_info.py file
+        return None
+    return getattr(module_info, 'MODULE_INFO', None)
+
+
+def get_module_apps():
+    """Return (app_config, MODULE_INFO) pairs for every loaded module app."""
+    modules = []
+    for app_config in apps.get_app_configs():
+        info = get_module_info(app_config.name)
+        if info is not None:
+            modules.append((app_config, info))
+    return modules
+
+
+@functools.lru_cache(maxsize=None)
+def get_url_prefixes():
+    """Return ``('/prefix/', MODULE_INFO)`` pairs, longest prefix first."""
+    prefixes = [
+        (f"/{info['url_prefix'].strip('/')}/", info)
+        for _, info in get_module_apps()
+        if info.get('url_prefix')
+    ]
+    return sorted(prefixes, key=lambda item: len(item[0]), reverse=True)
+
+
+def get_module_for_path(path):
+    """Return the MODULE_INFO of the module serving a URL path, or None."""
+    for prefix, info in get_url_prefixes():
+        if path.startswith(prefix):
+            return info
+    return None
@@ -0,0 +1,116 @@
+# module_engine/roles.py
+"""
+Role synchronisation for modules.
+
+Modules declare roles in MODULE_INFO::
+
+    'roles': {'manager': {'can_view': True, 'can_delete': True}, ...},
+    'role_models': ['product'],
+    'role_group_prefix': 'product',
+
+Each role maps to a group named ``<prefix>_<role>``. After a module's
+migrations (a ``post_migrate`` event on the module event bus) the engine diffs the permissions each group should have against the rows in the
+group/permission through table and applies only the difference with bulk
+inserts and deletes.
+"""
+from collections import defaultdict
+
+from django.apps import apps
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+
+from . import events
+from .registry import get_module_apps, get_module_info
+
+
+def get_group_name(group_prefix, role):
+    """Return the group name used for a module role."""
+    return f"{group_prefix}_{role}"
+
+
+def sync_roles(app_label, roles, models, group_prefix):
+    """
+    Bring the role groups of a module in line with its role declaration.
+
+    Only permissions on the given models are managed; permissions from other
+    apps that were granted to the groups by hand are left alone. Returns a
+    tuple ``(added, removed)``, or None if the permissions do not exist yet.
+    """
+    permissions = dict(
+        Permission.objects.filter(content_type__app_label=app_label, content_type__model__in=models)
+        .values_list('codename', 'pk')
+    )
+    if not permissions:
+        return None
+    
+    group_roles = {get_group_name(group_prefix, role): role for role in roles}
+    groups = dict(Group.objects.filter(name__in=group_roles).values_list('name', 'pk'))
+    missing = [name for name in group_roles if name not in groups]
+    if missing:
+        Group.objects.bulk_create([Group(name=name) for name in missing], ignore_conflicts=True)
+        groups = dict(Group.objects.filter(name__in=group_roles).values_list('name', 'pk'))
+    
+    # Desired (group, permission) pairs, e.g. 'can_view' -> 'view_product'
+    desired = set()
+    for name, role in group_roles.items():
+        for grant, allowed in roles[role].items():
+            if not allowed:
+                continue
+            action = grant[len('can_'):] if grant.startswith('can_') else grant
+            for model in models:
+                permission_id = permissions.get(f"{action}_{model}")
+                if permission_id:
+                    desired.add((groups[name], permission_id))
+    
+    through = Group.permissions.through
+    current = set(
+        through.objects.filter(group_id__in=groups.values(), permission_id__in=permissions.values())
+        .values_list('group_id', 'permission_id')
+    )
+    
+    to_add = desired - current
+    to_remove = current - desired
+    if not to_add and not to_remove:
+        return 0, 0
+    
+    with transaction.atomic():
+        if to_add:
+            through.objects.bulk_create(
+                [through(group_id=group_id, permission_id=permission_id) for group_id, permission_id in to_add],
+                ignore_conflicts=True,
+            )
+        removals = defaultdict(list)
+        for group_id, permission_id in to_remove:
+            removals[group_id].append(permission_id)
+        for group_id, permission_ids in removals.items():
+            through.objects.filter(group_id=group_id, permission_id__in=permission_ids).delete()
+    
+    return len(to_add), len(to_remove)
+
+
+def sync_module_roles(app_label):
+    """Sync the roles declared in an app's MODULE_INFO, if it declares any."""
+    info = get_module_info(apps.get_app_config(app_label).name)
+    if not info or not info.get('roles'):
+        return None
+    return sync_roles(
+        app_label,
+        info['roles'],
+        info.get('role_models', []),
+        info.get('role_group_prefix', info['identifier']),
+    )
+
+
+def sync_roles_after_migrate(sender, **kwargs):
+    """Sync module roles once an app's migrations and permissions are in place."""
+    sync_module_roles(sender.label)
+
+
+def subscribe_role_sync():
+    """Run the role sync after migrate for modules that declare roles only."""
+    for app_config, info in get_module_apps():
+        if info.get('roles'):
+            events.subscribe('post_migrate', sync_roles_after_migrate, module=app_config.label)
+
+
+subscribe_role_sync()
@@ -0,0 +1,274 @@
+# module_engine/rolling.py
+"""
+Rolling module upgrades.
+
+An upgrade is coordinated by one node (``rolling_upgrade`` command) in phases:
+
+1. expand: under a database lock, apply the module's pending migrations up to
+   the first one marked ``phase = 'contract'``. Expand migrations only add, so
+   workers still running the old code keep working against the new schema.
+2. rolling: every worker reports the module versions it has loaded in a
+   heartbeat. A worker running an older version than the upgrade's target
+   takes the ``drain`` lock (so one worker at a time), stops reporting ready,
+   waits for its in-flight requests and exits for gunicorn to replace it. The
+   lock is handed to the replacement, which releases it once it is ready, so
+   the next worker only drains when this one's capacity is back. Processes
+   nobody replaces (runserver, ASGI servers) never drain; they log that they
+   need a restart.
+3. contract: once every live worker reports the new version, the remaining
+   (contract) migrations are applied and ``Module.version`` is updated.
+
+Migrations opt into the contract phase with a class attribute::
+
+    class Migration(migrations.Migration):
+        phase = 'contract'
+"""
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import events
+from .admission import get_in_flight
+from .locks import acquire_lock, get_owner_id, refresh_lock, release_lock, transfer_lock
+from .models import Module, ModuleUpgrade, WorkerHeartbeat
+from .preload import is_preloading
+from .registry import get_module_apps
+from .schema import get_pending_migrations, get_schema_fingerprint
+from .warmup import is_ready
+
+logger = logging.getLogger(__name__)
+
+CONTRACT = 'contract'
+DRAIN_LOCK = 'module_engine:drain'
+
+_draining = threading.Event()
+_started = threading.Event()
+_worker = {'started_at': None, 'warned': False}
+
+
+def get_heartbeat_interval():
+    return getattr(settings, 'WORKER_HEARTBEAT_INTERVAL', 10)
+
+
+def get_heartbeat_timeout():
+    """Seconds after which a worker without a heartbeat is considered gone."""
+    return getattr(settings, 'WORKER_HEARTBEAT_TIMEOUT', 3 * get_heartbeat_interval())
+
+
+def is_draining():
+    return _draining.is_set()
+
+
+def get_loaded_versions():
+    """Return the MODULE_INFO version of every module this process imported."""
+    return {info['identifier']: info['version'] for _, info in get_module_apps()}
+
+
+# Worker side
+
+def send_heartbeat():
+    now = timezone.now()
+    WorkerHeartbeat.objects.update_or_create(
+        worker_id=get_owner_id(),
+        defaults={
+            'hostname': socket.gethostname(),
+            'pid': os.getpid(),
+            'module_versions': get_loaded_versions(),
+            'draining': is_draining(),
+            'in_flight': get_in_flight(),
+            'started_at': _worker['started_at'] or now,
+            'last_seen': now,
+        },
+    )
+
+
+def needs_restart():
+    """Return True if a rolling upgrade targets a version this worker does not run."""
+    loaded = get_loaded_versions()
+    upgrades = ModuleUpgrade.objects.filter(phase=ModuleUpgrade.ROLLING).select_related('module')
+    return any(
+        upgrade.module.identifier in loaded and loaded[upgrade.module.identifier] != upgrade.to_version
+        for upgrade in upgrades
+    )
+
+
+def is_supervised():
+    """True if a process manager (gunicorn's master) replaces this worker when it exits."""
+    return 'gunicorn' in sys.modules
+
+
+def get_handoff_owner():
+    """Owner of the drain lock between a worker's exit and its replacement being ready."""
+    return f"{socket.gethostname()}:restarting"
+
+
+def release_handoff():
+    """Release a drain lock handed over by a worker that exited before this one started."""
+    release_lock(DRAIN_LOCK, owner=get_handoff_owner(), acquired_before=_worker['started_at'])
+
+
+def drain_and_restart():
+    """Stop taking traffic, let in-flight requests finish, then exit for a replacement."""
+    _draining.set()
+    send_heartbeat()
+    deadline = time.monotonic() + getattr(settings, 'WORKER_DRAIN_TIMEOUT', 30)
+    # Give the load balancer a readiness check to notice, then wait for requests
+    time.sleep(getattr(settings, 'WORKER_DRAIN_GRACE', 2))
+    while get_in_flight() > 0 and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    WorkerHeartbeat.objects.filter(worker_id=get_owner_id()).delete()
+    # The replacement releases the lock once ready; the lease covers a replacement that never is
+    transfer_lock(DRAIN_LOCK, get_handoff_owner())
+    logger.info("Restarting worker %s for a module upgrade", get_owner_id())
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def check_for_upgrade():
+    """Drain and restart this worker if a rolling upgrade needs it to."""
+    if is_draining() or not needs_restart():
+        return
+    if not is_supervised():
+        # Nothing would start a replacement; draining would take this process out for good
+        if not _worker['warned']:
+            logger.warning("Worker %s runs an outdated module version and must be restarted", get_owner_id())
+            _worker['warned'] = True
+    elif is_preloading():
+        # A replacement would be forked from the master's old code and restart
+        # again; the coordinator times out instead
+        logger.error(
+            "Worker %s cannot load a module upgrade: preloaded workers need the master restarted",
+            get_owner_id(),
+        )
+    else:
+        # One worker drains at a time; the lease outlives a stuck drain or a
+        # replacement that never becomes ready
+        ttl = getattr(settings, 'WORKER_DRAIN_TIMEOUT', 30) * 2
+        if acquire_lock(DRAIN_LOCK, ttl=ttl):
+            drain_and_restart()
+
+
+def heartbeat_loop():
+    while True:
+        try:
+            send_heartbeat()
+            if is_ready():
+                release_handoff()
+            check_for_upgrade()
+        except Exception:
+            logger.exception("Worker heartbeat failed")
+        finally:
+            close_old_connections()
+        time.sleep(get_heartbeat_interval())
+
+
+def start_heartbeat():
+    """Start reporting this worker's module versions, once per process."""
+    if _started.is_set() or not getattr(settings, 'ROLLING_UPGRADES', False):
+        return
+    _started.set()
+    _worker['started_at'] = timezone.now()
+    threading.Thread(target=heartbeat_loop, name='module-heartbeat', daemon=True).start()
+
+
+# Coordinator side
+
+def get_live_workers():
+    cutoff = timezone.now() - timedelta(seconds=get_heartbeat_timeout())
+    return WorkerHeartbeat.objects.filter(last_seen__gte=cutoff)
+
+
+def get_outdated_workers(identifier, version):
+    """Return live workers not yet running ``version`` of a module."""
+    return [
+        worker for worker in get_live_workers()
+        if worker.module_versions.get(identifier, version) != version
+    ]
+
+
+def get_migration_phases(app_label):
+    """
+    Split an app's pending migrations into expand and contract migrations.
+
+    Everything from the first ``phase = 'contract'`` migration on is contract.
+    """
+    expand, contract = [], []
+    for migration, backwards in get_pending_migrations(app_label):
+        if contract or getattr(migration, 'phase', None) == CONTRACT:
+            contract.append(migration)
+        else:
+            expand.append(migration)
+    return expand, contract
+
+
+def get_upgrade_lock_name(identifier):
+    return f"module_engine:upgrade:{identifier}"
+
+
+def rolling_upgrade(identifier, version, timeout=600, poll=2, log=logger.info):
+    """Run a rolling upgrade of a module to ``version`` (the code on this node)."""
+    lock_name = get_upgrade_lock_name(identifier)
+    if not acquire_lock(lock_name, ttl=timeout + 60):
+        raise RuntimeError(f"Another node is already upgrading '{identifier}'")
+
+    module = Module.objects.get(identifier=identifier)
+    upgrade = ModuleUpgrade.objects.create(
+        module=module, from_version=module.version, to_version=version, owner=get_owner_id(),
+    )
+    try:
+        expand, contract = get_migration_phases(identifier)
+        if expand:
+            log(f"Applying {len(expand)} expand migrations")
+            own = [migration for migration in expand if migration.app_label == identifier]
+            for migration in expand:
+                # Prerequisites from other apps go first
+                if migration.app_label != identifier:
+                    call_command('migrate', migration.app_label, migration.name, verbosity=0)
+            if own:
+                call_command('migrate', identifier, own[-1].name, verbosity=0)
+
+        upgrade.phase = ModuleUpgrade.ROLLING
+        upgrade.save(update_fields=['phase', 'updated_at'])
+        deadline = time.monotonic() + timeout
+        while True:
+            outdated = get_outdated_workers(identifier, version)
+            if not outdated:
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{len(outdated)} workers did not switch to {version} within {timeout}s")
+            log(f"Waiting for {len(outdated)} workers to restart on {version}")
+            refresh_lock(lock_name, ttl=timeout + 60)
+            time.sleep(poll)
+
+        upgrade.phase = ModuleUpgrade.CONTRACTING
+        upgrade.save(update_fields=['phase', 'updated_at'])
+        if contract:
+            log(f"Applying {len(contract)} contract migrations")
+            call_command('migrate', identifier, verbosity=0)
+
+        module.version = version
+        module.schema_fingerprint = get_schema_fingerprint(identifier) or ''
+        module.save()
+        events.publish('module_upgraded', module=identifier, instance=module)
+
+        upgrade.phase = ModuleUpgrade.DONE
+        upgrade.finished_at = timezone.now()
+        upgrade.save(update_fields=['phase', 'finished_at', 'updated_at'])
+        return upgrade
+    except Exception as e:
+        upgrade.phase = ModuleUpgrade.FAILED
+        upgrade.error = str(e)
+        upgrade.save(update_fields=['phase', 'error', 'updated_at'])
+        raise
+    finally:
+        release_lock(lock_name)
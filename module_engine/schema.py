@@ -0,0 +1,267 @@
+# module_engine/schema.py
+"""
+Schema fingerprints and a persisted migration graph cache.
+
+A module's fingerprint hashes its model and migration source files as they are
+on disk, so an upgrade can tell without running ``makemigrations`` or
+``migrate`` whether anything about the schema changed. Reading the files rather
+than the loaded models also works for modules that are not loaded in the
+current process (e.g. right after an install from the web view) and for model
+changes that the running process has not imported yet.
+"""
+import hashlib
+import importlib.util
+import logging
+import os
+import pickle
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.graph import MigrationGraph
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+logger = logging.getLogger(__name__)
+
+
+def get_app_directory(app_label):
+    """Return the package directory of an app, without importing it if it is not loaded."""
+    try:
+        return apps.get_app_config(app_label).path
+    except LookupError:
+        pass
+    try:
+        spec = importlib.util.find_spec(app_label)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return list(spec.submodule_search_locations)[0]
+
+
+def get_python_files(directory):
+    """Return the .py files directly inside a directory, sorted by name."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith('.py') and name[0] not in '_~'
+    )
+
+
+def get_migration_files(app_label):
+    """Return the migration source files of an app, sorted by name."""
+    try:
+        module_name, _ = MigrationLoader.migrations_module(app_label)
+    except LookupError:
+        # Not loaded in this process: use the package's migrations directory
+        directory = get_app_directory(app_label)
+        return get_python_files(os.path.join(directory, 'migrations')) if directory else []
+    if module_name is None:
+        return []
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except ImportError:
+        return []
+    if spec is None or not spec.submodule_search_locations:
+        return []
+    files = []
+    for directory in spec.submodule_search_locations:
+        files.extend(get_python_files(directory))
+    return sorted(files)
+
+
+def get_model_files(app_label):
+    """Return the source files defining an app's models (models.py or a models package)."""
+    directory = get_app_directory(app_label)
+    if directory is None:
+        return []
+    path = os.path.join(directory, 'models.py')
+    if os.path.isfile(path):
+        return [path]
+    package = os.path.join(directory, 'models')
+    files = [os.path.join(package, '__init__.py')] if os.path.isfile(os.path.join(package, '__init__.py')) else []
+    return files + get_python_files(package)
+
+
+def hash_files(digest, paths):
+    """Feed each file's name and contents into a hashlib digest."""
+    for path in paths:
+        digest.update(os.path.basename(path).encode() + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+
+
+def get_schema_fingerprint(app_label):
+    """
+    Return a SHA-256 fingerprint of an app's model and migration files.
+
+    Returns None if the app cannot be found on disk.
+    """
+    if get_app_directory(app_label) is None:
+        return None
+    digest = hashlib.sha256()
+    hash_files(digest, get_model_files(app_label))
+    digest.update(b'migrations\0')
+    hash_files(digest, get_migration_files(app_label))
+    return digest.hexdigest()
+
+
+def get_graph_cache_path():
+    """Location of the pickled migration graph."""
+    return getattr(
+        settings, 'MIGRATION_GRAPH_CACHE',
+        os.path.join(settings.BASE_DIR, '.cache', 'migration_graph.pickle'),
+    )
+
+
+def invalidate_migration_graph_cache():
+    """Remove the persisted migration graph so the next load rebuilds it."""
+    try:
+        os.remove(get_graph_cache_path())
+    except FileNotFoundError:
+        pass
+
+
+class LazyMigrations(dict):
+    """
+    Migration keys mapped to Migration instances that are created on first access.
+
+    Planning an up-to-date app only needs the graph's keys and edges, so
+    restoring a cached graph imports no migration modules until a migration
+    is actually looked up.
+    """
+
+    def __init__(self, keys, load):
+        super().__init__((key, None) for key in keys)
+        self._load = load
+
+    def __getitem__(self, key):
+        migration = super().__getitem__(key)
+        if migration is None:
+            migration = self._load(key)
+            super().__setitem__(key, migration)
+        return migration
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+
+class CachedMigrationLoader(MigrationLoader):
+    """
+    Migration loader that persists the built graph between processes.
+
+    Only migration keys, module paths and resolved dependency edges are stored;
+    the Migration classes are imported lazily after a restore. The cache is
+    keyed on the contents of every migration file plus the set of applied
+    migrations, so adding, editing or applying a migration invalidates it but
+    a fresh checkout of the same files does not.
+    """
+
+    def get_cache_key(self):
+        digest = hashlib.sha256()
+        for app_config in apps.get_app_configs():
+            digest.update(f"{app_config.label}\n".encode())
+            hash_files(digest, get_migration_files(app_config.label))
+        self._recorded = {}
+        if self.connection is not None:
+            digest.update(self.connection.alias.encode())
+            recorder = MigrationRecorder(self.connection)
+            if recorder.has_table():
+                self._recorded = recorder.applied_migrations()
+                for key in sorted(self._recorded):
+                    digest.update(f"{key[0]}.{key[1]}\n".encode())
+        return digest.hexdigest()
+
+    def dump(self, key):
+        """Return the picklable form of the built loader state."""
+        return {
+            'key': key,
+            'migrations': {
+                migration_key: type(migration).__module__
+                for migration_key, migration in self.disk_migrations.items()
+            },
+            'unmigrated_apps': self.unmigrated_apps,
+            'migrated_apps': self.migrated_apps,
+            'replacements': list(self.replacements),
+            'applied': list(self.applied_migrations),
+            'nodes': list(self.graph.nodes),
+            'edges': [
+                (node_key, parent.key)
+                for node_key, node in self.graph.node_map.items()
+                for parent in node.parents
+            ],
+        }
+
+    def restore(self, cached):
+        """Rebuild the loader state from the output of dump()."""
+        modules = cached['migrations']
+        self.disk_migrations = LazyMigrations(
+            modules, lambda key: import_module(modules[key]).Migration(key[1], key[0]),
+        )
+        self.unmigrated_apps = cached['unmigrated_apps']
+        self.migrated_apps = cached['migrated_apps']
+        self.replacements = {key: self.disk_migrations[key] for key in cached['replacements']}
+        # Squashed migrations count as applied once everything they replace is
+        self.applied_migrations = {
+            key: self._recorded.get(key) or self.disk_migrations[key]
+            for key in cached['applied']
+        }
+        self.graph = MigrationGraph()
+        for key in cached['nodes']:
+            self.graph.add_node(key, None)
+        for child, parent in cached['edges']:
+            self.graph.add_dependency(None, child, parent, skip_validation=True)
+        self.graph.validate_consistency()
+        self.graph.nodes = LazyMigrations(cached['nodes'], self.disk_migrations.__getitem__)
+
+    def build_graph(self):
+        path = get_graph_cache_path()
+        key = self.get_cache_key()
+        try:
+            with open(path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['key'] == key:
+                self.restore(cached)
+                return
+        except Exception:
+            # Missing, stale or unreadable cache: fall back to a full build
+            pass
+
+        super().build_graph()
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.dump(key), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Read-only filesystems (e.g. Vercel) just skip the cache
+            logger.debug("Could not persist migration graph: %s", e)
+
+
+class CachedMigrationExecutor(MigrationExecutor):
+    """Migration executor backed by the cached loader."""
+
+    def __init__(self, connection, progress_callback=None):
+        self.connection = connection
+        self.loader = CachedMigrationLoader(self.connection)
+        self.recorder = MigrationRecorder(self.connection)
+        self.progress_callback = progress_callback
+
+
+def get_pending_migrations(app_label, using=DEFAULT_DB_ALIAS):
+    """Return the (migration, backwards) plan needed to bring an app up to date."""
+    executor = CachedMigrationExecutor(connections[using])
+    targets = [key for key in executor.loader.graph.leaf_nodes() if key[0] == app_label]
+    return executor.migration_plan(targets)
@@ -0,0 +1,184 @@
+# module_engine/sessions.py
+"""
+Write-coalescing session backend.
+
+Reads are served from the session cache and only fall back to the
+``django_session`` table on a miss. Saves that only move the expiry date, which
+is every save of an unchanged session under SESSION_SAVE_EVERY_REQUEST, are
+buffered in-process and written in periodic batches; any change to the session
+data itself is written through immediately.
+
+The cache is only used when it is shared between workers (files on one host,
+or memcached). With a per-process (local memory) sessions cache, a logout or
+key rotation in one worker would leave the old session valid in the others, so
+sessions are read from the database instead.
+"""
+import atexit
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router, transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+KEY_PREFIX = "module_engine.sessions"
+
+# Expiry key written by SessionBase.set_expiry(); changes to it alone are touches
+EXPIRY_KEY = '_session_expiry'
+
+_pending_touches = {}
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def get_touch_interval():
+    """Seconds between batched expiry writes."""
+    return getattr(settings, 'SESSION_TOUCH_INTERVAL', 60)
+
+
+def get_touch_batch_size():
+    """Maximum number of sessions updated by one batched write."""
+    return getattr(settings, 'SESSION_TOUCH_BATCH_SIZE', 500)
+
+
+def schedule_touch(session_key, expire_date):
+    """Record a new expiry date for a session and flush if the buffer is due."""
+    global _last_flush
+    with _pending_lock:
+        _pending_touches[session_key] = expire_date
+        due = (
+            time.monotonic() - _last_flush >= get_touch_interval()
+            or len(_pending_touches) >= get_touch_batch_size()
+        )
+        if not due:
+            return
+        touches = dict(_pending_touches)
+        _pending_touches.clear()
+        _last_flush = time.monotonic()
+    _write_touches(touches)
+
+
+def flush_pending_touches():
+    """Write every buffered expiry date to the database now."""
+    global _last_flush
+    with _pending_lock:
+        touches = dict(_pending_touches)
+        _pending_touches.clear()
+        _last_flush = time.monotonic()
+    _write_touches(touches)
+
+
+def _write_touches(touches):
+    """Update expire_date for many sessions with one UPDATE per batch."""
+    if not touches:
+        return
+    model = SessionStore.get_model_class()
+    using = router.db_for_write(model)
+    keys = list(touches)
+    batch_size = get_touch_batch_size()
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        expire_date = Case(
+            *[When(session_key=key, then=Value(touches[key])) for key in batch],
+            output_field=DateTimeField(),
+        )
+        with transaction.atomic(using=using):
+            model.objects.using(using).filter(session_key__in=batch).update(expire_date=expire_date)
+
+
+def purge_expired(batch_size=1000, pause=0, grace=None):
+    """
+    Delete expired sessions in bounded chunks and yield the size of each chunk.
+
+    Rows are only considered expired once they are older than the touch interval
+    so that sessions with a pending expiry write are not removed.
+    """
+    if grace is None:
+        grace = get_touch_interval()
+    model = SessionStore.get_model_class()
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    while True:
+        keys = list(
+            model.objects.filter(expire_date__lt=cutoff)
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return
+        deleted, _ = model.objects.filter(session_key__in=keys).delete()
+        yield deleted
+        if pause:
+            time.sleep(pause)
+
+
+atexit.register(flush_pending_touches)
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cached, database backed sessions with coalesced expiry writes.
+    """
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_state = None
+
+    @property
+    def _cache_is_shared(self):
+        return not isinstance(self._cache, LocMemCache)
+
+    def _cache_session(self, data, expiry_age):
+        if self._cache_is_shared:
+            self._cache.set(self.cache_key, data, expiry_age)
+
+    def _state_of(self, data):
+        """Serialized session data without the expiry key."""
+        substantive = {key: value for key, value in data.items() if key != EXPIRY_KEY}
+        return self.serializer().dumps(substantive)
+
+    def load(self):
+        data = None
+        if self._cache_is_shared:
+            try:
+                data = self._cache.get(self.cache_key)
+            except Exception:
+                # Some backends raise on invalid keys; treat it as a miss
+                data = None
+
+        if data is None:
+            s = self._get_session_from_db()
+            if not s:
+                return {}
+            data = self.decode(s.session_data)
+            self._cache_session(data, self.get_expiry_age(expiry=s.expire_date))
+        self._loaded_state = self._state_of(data)
+        return data
+
+    def save(self, must_create=False):
+        if (
+            not must_create
+            and self.session_key is not None
+            and self._loaded_state is not None
+            and self._state_of(self._session) == self._loaded_state
+        ):
+            # Only the expiry moved: extend the cached entry now, write the row
+            # later. touch() never brings back an entry deleted meanwhile.
+            if self._cache_is_shared:
+                self._cache.touch(self.cache_key, self.get_expiry_age())
+            schedule_touch(self.session_key, self.get_expiry_date())
+            return
+
+        # A row deleted meanwhile (logout, cycle_key) raises UpdateError, which
+        # SessionMiddleware turns into SessionInterrupted
+        super(CachedDBStore, self).save(must_create)
+        self._cache_session(self._session, self.get_expiry_age())
+        self._loaded_state = self._state_of(self._session)
+
+    @classmethod
+    def clear_expired(cls):
+        for _ in purge_expired():
+            pass
@@ -0,0 +1,86 @@
+# module_engine/templating.py
+"""
+Optional Jinja2 engine for module templates.
+
+A module opts in with ``'template_engine': 'jinja2'`` in MODULE_INFO and ships
+its Jinja2 templates in a ``jinja2/`` directory next to ``templates/``. Compiled
+templates are kept in a bytecode cache on disk so new workers skip compiling.
+Jinja2 pages share the site layout by extending ``layout.html``, which renders
+their blocks inside the Django ``base.html``.
+
+If Jinja2 is not installed, modules fall back to their Django templates.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.template import engines
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+
+from .registry import get_module_info
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+logger = logging.getLogger(__name__)
+
+JINJA2_ENGINE = 'jinja2'
+LAYOUT_TEMPLATE = 'module_engine/jinja2_layout.html'
+
+
+def get_bytecode_cache_dir():
+    return getattr(
+        settings, 'JINJA2_BYTECODE_CACHE',
+        os.path.join(settings.BASE_DIR, '.cache', 'jinja2'),
+    )
+
+
+def get_bytecode_cache():
+    """Return a filesystem bytecode cache, or None if the directory is not writable."""
+    directory = get_bytecode_cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        pass
+    if not os.access(directory, os.W_OK):
+        # Read-only filesystems (e.g. Vercel) compile in memory only
+        logger.debug("Jinja2 bytecode cache disabled, %s is not writable", directory)
+        return None
+    return jinja2.FileSystemBytecodeCache(directory)
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def render_layout(request, **blocks):
+    """Render Jinja2-rendered blocks inside the Django base.html."""
+    context = {name: mark_safe(value) for name, value in blocks.items()}
+    return mark_safe(render_to_string(LAYOUT_TEMPLATE, context, request=request, using='django'))
+
+
+def environment(**options):
+    """Jinja2 environment factory used by the ``jinja2`` TEMPLATES entry."""
+    options.setdefault('bytecode_cache', get_bytecode_cache())
+    env = jinja2.Environment(**options)
+    env.globals.update({
+        'static': static,
+        'url': url,
+        'render_layout': render_layout,
+    })
+    return env
+
+
+def get_template_engine(identifier):
+    """Return the template engine alias a module renders with (None for the default)."""
+    info = get_module_info(identifier) or {}
+    if info.get('template_engine') != JINJA2_ENGINE or jinja2 is None:
+        return None
+    if JINJA2_ENGINE not in [engine.name for engine in engines.all()]:
+        return None
+    return JINJA2_ENGINE
@@ -0,0 +1,164 @@
+# module_engine/tenants.py
+"""
+Tenant-aware module activation.
+
+Each request is mapped to a tenant by its host, or by the ``X-Tenant`` header
+when it comes from one of TENANT_TRUSTED_PROXIES.
+Tenants with the same set of active modules share one URLconf, which is built
+and populated once and then assigned to ``request.urlconf``. Both the tenant
+lookups and the URLconfs are held in bounded LRU caches.
+"""
+import threading
+import time
+import types
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib import admin
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.urls import clear_url_caches, get_resolver, include, path
+
+from .models import Module, Tenant
+from .registry import get_module_apps
+
+
+class LRUCache:
+    """Small thread-safe LRU mapping with an optional time-to-live."""
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, stored = item
+            if self.ttl is not None and time.monotonic() - stored > self.ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value and return the entries evicted to make room."""
+        evicted = []
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False))
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_tenant_lookups = LRUCache(
+    getattr(settings, 'TENANT_LOOKUP_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'TENANT_CACHE_TTL', 60),
+)
+_urlconfs = LRUCache(getattr(settings, 'TENANT_URLCONF_CACHE_SIZE', 32))
+
+
+def build_urlpatterns(identifiers=None):
+    """
+    Return the site's URL patterns with the given modules mounted.
+
+    With ``identifiers=None`` every loaded module with a ``url_prefix`` is
+    mounted, which is what the global ROOT_URLCONF uses.
+    """
+    urlpatterns = [
+        path('admin/', admin.site.urls),
+        path('modules/', include('module_engine.urls')),
+    ]
+    for app_config, info in get_module_apps():
+        if 'url_prefix' not in info:
+            continue
+        if identifiers is not None and info['identifier'] not in identifiers:
+            continue
+        # Add the URL pattern if the app has a urls.py
+        try:
+            urlpatterns.append(path(f"{info['url_prefix']}/", include(f"{app_config.name}.urls")))
+        except ImportError:
+            pass
+    return urlpatterns
+
+
+def get_tenant_urlconf(identifiers):
+    """Return the (shared, pre-populated) URLconf for a set of module identifiers."""
+    key = frozenset(identifiers)
+    urlconf = _urlconfs.get(key)
+    if urlconf is not None:
+        return urlconf
+
+    urlconf = types.ModuleType(f"tenant_urls_{'_'.join(sorted(key)) or 'none'}")
+    urlconf.urlpatterns = build_urlpatterns(key)
+    # Build the reverse and namespace dicts now rather than on first request
+    get_resolver(urlconf)._populate()
+
+    if _urlconfs.set(key, urlconf):
+        # Django's resolver cache is unbounded; drop it along with our entry
+        clear_url_caches()
+    return urlconf
+
+
+def is_trusted_proxy(request):
+    """True if the request comes from an address allowed to send the tenant header."""
+    proxies = getattr(settings, 'TENANT_TRUSTED_PROXIES', [])
+    return '*' in proxies or request.META.get('REMOTE_ADDR') in proxies
+
+
+def resolve_tenant(request):
+    """
+    Return ``(tenant_id, module identifiers)`` for a request, or None.
+
+    The header named by TENANT_HEADER takes precedence over the host, but only
+    on requests from TENANT_TRUSTED_PROXIES; anyone else could pick a tenant.
+    """
+    slug = None
+    if is_trusted_proxy(request):
+        slug = request.META.get(getattr(settings, 'TENANT_HEADER', 'HTTP_X_TENANT'))
+    if slug:
+        key = ('slug', slug)
+    else:
+        key = ('domain', request.get_host().split(':')[0].lower())
+
+    cached = _tenant_lookups.get(key, False)
+    if cached is not False:
+        return cached
+
+    tenant = Tenant.objects.filter(active=True, **{key[0]: key[1]}).first()
+    result = None
+    if tenant is not None:
+        identifiers = frozenset(
+            tenant.modules.filter(installed=True).values_list('identifier', flat=True)
+        )
+        result = (tenant.pk, identifiers)
+    _tenant_lookups.set(key, result)
+    return result
+
+
+def clear_tenant_caches():
+    """Forget cached tenant lookups in this process."""
+    _tenant_lookups.clear()
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=Module)
+def tenant_changed(sender, **kwargs):
+    clear_tenant_caches()
+
+
+@receiver(m2m_changed, sender=Tenant.modules.through)
+def tenant_modules_changed(sender, **kwargs):
+    clear_tenant_caches()
@@ -0,0 +1,121 @@
+# module_engine/testing.py
+"""
+Generated view tests for modules.
+
+``budget_test_case(identifier)`` builds a TestCase with one test per named URL
+pattern of a module. Each test requests the page as a superuser and fails if
+it errors or goes over the module's budget for that URL name in
+MODULE_INFO['budgets']. Modules seed data and fill in URL arguments::
+
+    class ProductBudgetTests(budget_test_case('product_module')):
+
+        @classmethod
+        def setUpTestData(cls):
+            super().setUpTestData()
+            cls.product = Product.objects.create(...)
+
+        def get_url_kwargs(self, url_name):
+            return {'pk': self.product.pk}
+
+Queries are counted on a warmed-up request. Latency depends on the machine,
+so it is only checked when BUDGET_TEST_LATENCY_FACTOR is set: the ``ms``
+budgets are multiplied by it and compared with the fastest of ``timed_runs``
+requests (e.g. 1 on a dedicated runner, 3 on a shared one).
+"""
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+
+from .budgets import check_budget, get_budget
+from .sessions import flush_pending_touches
+
+
+def get_test_budget(budget):
+    """Return the budget to test against: without ``ms`` unless latency is checked."""
+    factor = getattr(settings, 'BUDGET_TEST_LATENCY_FACTOR', None)
+    budget = dict(budget)
+    if budget.get('ms') is not None and factor:
+        budget['ms'] *= factor
+    else:
+        budget.pop('ms', None)
+    return budget
+
+
+def get_url_patterns(urlpatterns):
+    """Yield ``(url_name, argument_names)`` for the named patterns of a URLconf."""
+    for pattern in urlpatterns:
+        if isinstance(pattern, URLResolver):
+            for name, arguments in get_url_patterns(pattern.url_patterns):
+                yield name, list(pattern.pattern.converters) + arguments
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, list(pattern.pattern.converters)
+
+
+class ModuleBudgetTestCase(TestCase):
+    """Base class of the generated cases; see budget_test_case()."""
+    identifier = None
+    # Fail URL names that have no budget instead of only checking for errors
+    require_budgets = False
+    warm_up_runs = 1
+    timed_runs = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.budget_user = get_user_model().objects.create_superuser('budget', 'budget@example.com', 'budget')
+
+    def get_url_kwargs(self, url_name):
+        """Return the URL arguments for a pattern, from the seeded data."""
+        return {}
+
+    def check_url(self, url_name, argument_names):
+        budget = get_budget(self.identifier, url_name)
+        if budget is None and self.require_budgets:
+            self.fail(f"{self.identifier} declares no budget for '{url_name}'")
+        kwargs = self.get_url_kwargs(url_name)
+        missing = [name for name in argument_names if name not in kwargs]
+        if missing:
+            self.fail(f"get_url_kwargs('{url_name}') gives no value for {', '.join(missing)}")
+        url = reverse(url_name, kwargs={name: kwargs[name] for name in argument_names})
+
+        self.client.force_login(self.budget_user)
+        # Write buffered session touches while the test database still exists
+        self.addCleanup(flush_pending_touches)
+        for _ in range(self.warm_up_runs):
+            self.client.get(url)
+        timings = []
+        for _ in range(self.timed_runs):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.assertLess(response.status_code, 500, f"GET {url} failed")
+
+        if budget:
+            over_queries, over_latency, problems = check_budget(get_test_budget(budget), len(captured), min(timings))
+            if problems:
+                queries = '\n'.join(query['sql'] for query in captured.captured_queries)
+                self.fail(f"GET {url} ({url_name}) is over budget: {problems}\n{queries}")
+
+
+def make_test(url_name, argument_names):
+    def test(self):
+        self.check_url(url_name, argument_names)
+    test.__name__ = f"test_{url_name}_budget"
+    test.__doc__ = f"GET {url_name} stays within its budget."
+    return test
+
+
+def budget_test_case(identifier):
+    """Return a ModuleBudgetTestCase with a test for every named URL of a module."""
+    urlconf = import_module(f"{identifier}.urls")
+    attrs = {'identifier': identifier, '__module__': __name__}
+    for url_name, argument_names in get_url_patterns(urlconf.urlpatterns):
+        attrs[f"test_{url_name}_budget"] = make_test(url_name, argument_names)
+    class_name = ''.join(part.title() for part in identifier.split('_'))
+    return type(f"{class_name}BudgetTestCase", (ModuleBudgetTestCase,), attrs)
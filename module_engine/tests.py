@@ -1,3 +1,657 @@
-from django.test import TestCase
+# module_engine/tests.py
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import events, rolling
+from .admission import ModuleLimiter, get_limiter, get_max_concurrency
+from .budgets import check_budget, get_budget_stats, record_request
+from .bundles import BundleError, build_bundle, get_bundle_hash, read_manifest
+from .cache import NAMESPACE_KEY, get_module_cache
+from .changelist import get_prefix_upper_bound
+from .middleware import AdmissionControlMiddleware, QueryBudgetMiddleware
+from .locks import acquire_lock
+from .models import Module, ModuleLock, ModulePurge, Tenant
+from .prerender import PrerenderedPages, get_page_file
+from .profiling import Sampler
+from .purge import drop_tables, order_for_deletion, run_purge
+from .roles import get_group_name, sync_roles
+from .schema import CachedMigrationLoader, LazyMigrations, get_migration_files, get_schema_fingerprint
+from .sessions import SessionStore, flush_pending_touches
+from .tenants import clear_tenant_caches, get_tenant_urlconf, resolve_tenant
+from .testing import get_test_budget
+
+INFO = {
+    'identifier': 'budget_test',
+    'budgets': {'budget_view': {'queries': 2, 'ms': 1000}},
+}
+
+
+class CheckBudgetTests(SimpleTestCase):
+    
+    def test_within_budget(self):
+        self.assertEqual(check_budget({'queries': 2, 'ms': 50}, 2, 50.0), (False, False, ''))
+    
+    def test_over_queries(self):
+        over_queries, over_latency, problems = check_budget({'queries': 2, 'ms': 50}, 3, 10.0)
+        self.assertTrue(over_queries)
+        self.assertFalse(over_latency)
+        self.assertEqual(problems, '3 queries (budget 2)')
+    
+    def test_over_both(self):
+        over_queries, over_latency, problems = check_budget({'queries': 2, 'ms': 50}, 3, 75.5)
+        self.assertTrue(over_queries and over_latency)
+        self.assertEqual(problems, '3 queries (budget 2), 75.5 ms (budget 50 ms)')
+    
+    def test_missing_limits_are_not_checked(self):
+        self.assertEqual(check_budget({'queries': 1}, 1, 10 ** 6), (False, False, ''))
+        self.assertEqual(check_budget({}, 100, 10 ** 6), (False, False, ''))
+
+
+class RecordRequestTests(SimpleTestCase):
+    
+    def test_counts_requests_and_violations(self):
+        budget = {'queries': 2, 'ms': 50}
+        self.assertEqual(record_request('record_test', 'view', budget, 1, 10.0), '')
+        self.assertEqual(record_request('record_test', 'view', budget, 5, 60.0), '5 queries (budget 2), 60.0 ms (budget 50 ms)')
+        self.assertEqual(get_budget_stats()['record_test:view'], {
+            'requests': 2,
+            'query_violations': 1,
+            'latency_violations': 1,
+            'max_queries': 5,
+            'max_ms': 60.0,
+        })
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    
+    def get_response(self, queries, url_name='budget_view'):
+        def view(request):
+            request.resolver_match = SimpleNamespace(url_name=url_name)
+            for _ in range(queries):
+                get_user_model().objects.exists()
+            return HttpResponse()
+        return view
+    
+    def call(self, queries, url_name='budget_view', info=INFO):
+        request = RequestFactory().get('/budget-test/')
+        with mock.patch('module_engine.middleware.get_module_for_path', return_value=info):
+            return QueryBudgetMiddleware(self.get_response(queries, url_name))(request)
+    
+    def test_within_budget_is_not_logged(self):
+        with mock.patch('module_engine.middleware.logger') as logger:
+            self.call(2, info=dict(INFO, identifier='budget_within'))
+        logger.warning.assert_not_called()
+        stats = get_budget_stats()['budget_within:budget_view']
+        self.assertEqual((stats['requests'], stats['max_queries'], stats['query_violations']), (1, 2, 0))
+    
+    def test_over_budget_is_logged(self):
+        with self.assertLogs('module_engine.middleware', 'WARNING') as logs:
+            self.call(3)
+        self.assertIn('budget_view', logs.output[0])
+        self.assertIn('3 queries (budget 2)', logs.output[0])
+    
+    def test_views_without_a_budget_are_not_counted(self):
+        self.call(5, url_name='other_view')
+        self.call(5, info={'identifier': 'no_budgets'})
+        stats = get_budget_stats()
+        self.assertNotIn('budget_test:other_view', stats)
+        self.assertNotIn('no_budgets:other_view', stats)
+
+
+class TestBudgetTests(SimpleTestCase):
+    
+    def test_latency_is_not_tested_by_default(self):
+        self.assertEqual(get_test_budget({'queries': 2, 'ms': 50}), {'queries': 2})
+    
+    @override_settings(BUDGET_TEST_LATENCY_FACTOR=3)
+    def test_latency_is_scaled(self):
+        self.assertEqual(get_test_budget({'queries': 2, 'ms': 50}), {'queries': 2, 'ms': 150})
+
+
+class PurgeTests(TestCase):
+    
+    def test_referencing_tables_come_first(self):
+        order = order_for_deletion({'item': {'order'}, 'order': {'customer'}, 'customer': set()})
+        self.assertEqual(order, ['item', 'order', 'customer'])
+    
+    def test_reference_cycles_terminate(self):
+        order = order_for_deletion({'a': {'b'}, 'b': {'a'}, 'c': {'c', 'a'}})
+        self.assertEqual(sorted(order), ['a', 'b', 'c'])
+        self.assertLess(order.index('c'), order.index('a'))
+    
+    def test_drop_refuses_non_empty_tables(self):
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE purge_test_item (id integer PRIMARY KEY)")
+            cursor.execute("INSERT INTO purge_test_item (id) VALUES (1)")
+        purge = ModulePurge.objects.create(
+            identifier='purge_test', tables=[{'table': 'purge_test_item', 'pk': 'id'}], archive_dir='unused',
+        )
+        with self.assertRaisesMessage(RuntimeError, 'not empty'):
+            drop_tables(purge)
+        self.assertIn('purge_test_item', connection.introspection.table_names())
+        
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM purge_test_item")
+        drop_tables(purge)
+        self.assertNotIn('purge_test_item', connection.introspection.table_names())
+    
+    def test_rows_inserted_after_archiving_are_kept_for_the_next_run(self):
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE purge_late_item (id integer PRIMARY KEY, name varchar(20))")
+            cursor.executemany("INSERT INTO purge_late_item (id, name) VALUES (%s, %s)", [(1, 'a'), (2, 'b')])
+        archive_dir = tempfile.mkdtemp()
+        purge = ModulePurge.objects.create(
+            identifier='purge_late', tables=[{'table': 'purge_late_item', 'pk': 'id'}], archive_dir=archive_dir,
+        )
+        
+        steps = run_purge(purge)
+        self.assertEqual(next(steps), (ModulePurge.ARCHIVING, 'purge_late_item', 2))
+        self.assertEqual(next(steps), (ModulePurge.DELETING, 'purge_late_item', 2))
+        # Another worker still serving the module inserts a row
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO purge_late_item (id, name) VALUES (3, 'late')")
+        with self.assertRaisesMessage(RuntimeError, 'after archiving'):
+            list(steps)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM purge_late_item")
+            self.assertEqual(cursor.fetchall(), [(3,)])
+        purge.refresh_from_db()
+        self.assertEqual((purge.status, purge.rows_archived, purge.rows_deleted), (ModulePurge.ARCHIVING, 2, 2))
+        
+        list(run_purge(purge))
+        self.assertEqual((purge.status, purge.rows_archived, purge.rows_deleted), (ModulePurge.DONE, 3, 3))
+        self.assertNotIn('purge_late_item', connection.introspection.table_names())
+        with gzip.open(f"{archive_dir}/purge_late_item.jsonl.gz", 'rt') as f:
+            self.assertEqual([json.loads(line)['name'] for line in f], ['a', 'b', 'late'])
+
+
+class PrefixSearchTests(SimpleTestCase):
+    
+    def test_upper_bound(self):
+        self.assertEqual(get_prefix_upper_bound('Item'), 'Iten')
+        self.assertEqual(get_prefix_upper_bound('a\U0010ffff'), 'b')
+        self.assertEqual(get_prefix_upper_bound('\ud7ff'), '\ue000')
+        self.assertIsNone(get_prefix_upper_bound('\U0010ffff'))
+
+
+class PrerenderedPagesTests(SimpleTestCase):
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PRERENDER_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        for page in (None, 2):
+            file = get_page_file('/catalog/', page)
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            with open(file, 'w') as f:
+                f.write(f"page {page or 1}")
+    
+    def call(self, query='', **extra):
+        def application(environ, start_response):
+            start_response('200 OK', [])
+            return [b'dynamic']
+        request = RequestFactory().get(f"/catalog/{query}", **extra)
+        return b''.join(PrerenderedPages(application)(request.environ, lambda status, headers: None))
+    
+    def test_pages_are_served_before_the_application(self):
+        self.assertEqual(self.call(), b'page 1')
+        self.assertEqual(self.call('?page=2'), b'page 2')
+    
+    def test_other_requests_reach_the_application(self):
+        self.assertEqual(self.call('?page=0'), b'dynamic')
+        self.assertEqual(self.call('?page=02'), b'dynamic')
+        self.assertEqual(self.call('?page=3'), b'dynamic')
+        self.assertEqual(self.call('?sort=name'), b'dynamic')
+        self.assertEqual(self.call(HTTP_COOKIE='sessionid=abc'), b'dynamic')
+        self.assertEqual(self.call(HTTP_X_TENANT='acme'), b'dynamic')
+
+
+class AdmissionTests(SimpleTestCase):
+    
+    def test_limit_is_a_share_of_the_worker_threads(self):
+        self.assertEqual(get_max_concurrency({'max_share': 0.5}, threads=8), 4)
+        self.assertEqual(get_max_concurrency({'max_share': 0.25}, threads=2), 1)
+        self.assertEqual(get_max_concurrency({}, threads=4), 2)
+        with override_settings(WORKER_THREADS=16):
+            self.assertEqual(get_limiter({'identifier': 'admission_share', 'admission': {'max_share': 0.75}}).max_concurrency, 12)
+    
+    def test_requests_over_the_limit_are_shed_without_waiting(self):
+        limiter = ModuleLimiter('admission_limit', max_concurrency=2)
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+        self.assertEqual(limiter.get_stats(), {'in_flight': 2, 'admitted': 3, 'rejected': 1, 'max_concurrency': 2})
+    
+    def test_middleware_returns_503_when_the_module_is_saturated(self):
+        info = {'identifier': 'admission_busy', 'name': 'Busy', 'admission': {'retry_after': 3}}
+        with override_settings(WORKER_THREADS=2):
+            limiter = get_limiter(info)
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse('served'))
+        request = RequestFactory().get('/busy/')
+        with mock.patch('module_engine.middleware.get_module_for_path', return_value=info):
+            self.assertEqual(middleware(request).content, b'served')
+            self.assertEqual(limiter.in_flight, 0)
+            limiter.acquire()
+            response = middleware(request)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertEqual(limiter.get_stats()['rejected'], 1)
+
+
+class SessionTests(TestCase):
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        caches = dict(settings.CACHES, sessions={
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory.name,
+        })
+        cache_settings = override_settings(CACHES=caches)
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+        self.addCleanup(flush_pending_touches)
+        self.session = SessionStore()
+        self.session['cart'] = [1]
+        self.session.create()
+    
+    def call(self, view):
+        request = RequestFactory().get('/')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = self.session.session_key
+        return SessionMiddleware(view)(request)
+    
+    def get_row(self):
+        return SessionStore.get_model_class().objects.get(session_key=self.session.session_key)
+    
+    def test_unchanged_session_makes_no_queries(self):
+        def view(request):
+            return HttpResponse(str(request.session['cart']))
+        expire_date = self.get_row().expire_date
+        with self.assertNumQueries(0):
+            self.assertEqual(self.call(view).content, b'[1]')
+            self.assertEqual(self.call(view).content, b'[1]')
+        # The sliding expiry reaches the database with the next batch
+        flush_pending_touches()
+        self.assertGreater(self.get_row().expire_date, expire_date)
+    
+    def test_changed_session_is_written_immediately(self):
+        def view(request):
+            request.session['cart'] = [1, 2]
+            return HttpResponse()
+        self.call(view)
+        self.assertEqual(SessionStore().decode(self.get_row().session_data), {'cart': [1, 2]})
+    
+    def test_expiry_save_does_not_bring_back_a_deleted_session(self):
+        store = SessionStore(self.session.session_key)
+        self.assertEqual(store['cart'], [1])
+        # Logged out by another worker
+        SessionStore(self.session.session_key).delete()
+        store.save()
+        self.assertEqual(SessionStore(self.session.session_key).load(), {})
+    
+    def test_local_memory_cache_is_not_trusted(self):
+        caches = dict(settings.CACHES, sessions={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'})
+        with override_settings(CACHES=caches):
+            with self.assertNumQueries(1):
+                self.assertEqual(SessionStore(self.session.session_key)['cart'], [1])
+
+
+@override_settings(WORKER_DRAIN_GRACE=0)
+class RollingRestartTests(TestCase):
+    
+    def setUp(self):
+        self.addCleanup(rolling._draining.clear)
+        patcher = mock.patch.object(rolling, 'needs_restart', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_unsupervised_process_keeps_serving(self):
+        with mock.patch.object(rolling, 'is_supervised', return_value=False), \
+                mock.patch.object(rolling, 'drain_and_restart') as drain:
+            with self.assertLogs('module_engine.rolling', 'WARNING'):
+                rolling.check_for_upgrade()
+            rolling.check_for_upgrade()
+        drain.assert_not_called()
+        self.assertFalse(rolling.is_draining())
+        self.assertFalse(ModuleLock.objects.filter(name=rolling.DRAIN_LOCK).exists())
+    
+    def test_drain_lock_is_held_until_the_replacement_is_ready(self):
+        with mock.patch.object(rolling, 'is_supervised', return_value=True), \
+                mock.patch.object(rolling, 'is_preloading', return_value=False), \
+                mock.patch.object(rolling.os, 'kill') as kill:
+            rolling.check_for_upgrade()
+        kill.assert_called_once()
+        lock = ModuleLock.objects.get(name=rolling.DRAIN_LOCK)
+        self.assertEqual(lock.owner, rolling.get_handoff_owner())
+        # Other workers cannot start draining meanwhile
+        self.assertFalse(acquire_lock(rolling.DRAIN_LOCK, owner='other:1'))
+        
+        # A worker that was already running does not release it
+        with mock.patch.dict(rolling._worker, started_at=lock.acquired_at - timedelta(seconds=1)):
+            rolling.release_handoff()
+        self.assertTrue(ModuleLock.objects.filter(name=rolling.DRAIN_LOCK).exists())
+        # The replacement does, once it is ready
+        with mock.patch.dict(rolling._worker, started_at=timezone.now()):
+            rolling.release_handoff()
+        self.assertTrue(acquire_lock(rolling.DRAIN_LOCK, owner='other:1'))
+
+
+class ReadinessTests(TestCase):
+    
+    def test_failures_report_component_names_only(self):
+        state = {'errors': {'core': 'could not connect to db.internal as admin'}, 'modules': {}}
+        with mock.patch('module_engine.views.get_warm_up_state', return_value=state), \
+                mock.patch('module_engine.views.retry_warm_up'):
+            response = self.client.get(reverse('module_readiness'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'failed', 'errors': ['core']})
+
+
+class ModuleCacheTests(TestCase):
+    
+    def test_version_bump_invalidates_entries(self):
+        module = Module.objects.create(name='Cached', identifier='cache_bump', version='1.0')
+        cache = get_module_cache('cache_bump')
+        cache.set('report', 'old')
+        self.assertEqual(cache.get('report'), 'old')
+        module.version = '1.1'
+        module.save()
+        self.assertIsNone(cache.get('report'))
+        cache.set('report', 'new')
+        self.assertEqual(cache.get('report'), 'new')
+    
+    def test_namespace_is_kept_in_process_memory(self):
+        Module.objects.create(name='Cached', identifier='cache_memo', version='1.0')
+        cache = get_module_cache('cache_memo')
+        cache.set('a', 1)
+        with self.assertNumQueries(0), mock.patch.object(cache.cache, 'get', wraps=cache.cache.get) as get:
+            cache.get('a')
+            cache.get('b')
+        self.assertEqual(get.call_count, 2)
+    
+    @override_settings(MODULE_CACHE_NAMESPACE_TTL=0)
+    def test_upgrade_by_another_process_is_seen_through_a_shared_cache(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name}
+        with override_settings(CACHES=dict(settings.CACHES, modules=shared)):
+            Module.objects.create(name='Cached', identifier='cache_shared', version='1.0')
+            cache = get_module_cache('cache_shared')
+            cache.set('report', 'old')
+            with self.assertNumQueries(0):
+                self.assertEqual(cache.get('report'), 'old')
+            # Another process saves the new version
+            caches['modules'].set(NAMESPACE_KEY.format('cache_shared'), '2.0', None)
+            self.assertIsNone(cache.get('report'))
+
+
+class SamplerTests(SimpleTestCase):
+    
+    def test_remove_waits_for_the_sample_in_flight(self):
+        sampling = threading.Event()
+        
+        def slow_fold(frame):
+            sampling.set()
+            time.sleep(0.05)
+            return 'module:view'
+        
+        profile = SimpleNamespace(stacks=Counter())
+        sampler = Sampler()
+        with mock.patch('module_engine.profiling.fold_stack', side_effect=slow_fold):
+            sampler.add(threading.get_ident(), profile)
+            self.assertTrue(sampling.wait(1))
+            sampler.remove(threading.get_ident())
+            samples = sum(profile.stacks.values())
+            time.sleep(0.1)
+        self.assertGreater(samples, 0)
+        self.assertEqual(sum(profile.stacks.values()), samples)
+
+
+class SchemaTests(TestCase):
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        settings_override = override_settings(MIGRATION_GRAPH_CACHE=os.path.join(self.root, 'graph.pickle'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+    
+    def write(self, path, content):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+    
+    def test_fingerprint_of_a_module_that_is_not_loaded(self):
+        self.write('unloaded_module/__init__.py', '')
+        self.write('unloaded_module/models.py', 'class Thing:\n    pass\n')
+        self.write('unloaded_module/migrations/__init__.py', '')
+        self.write('unloaded_module/migrations/0001_initial.py', '# initial\n')
+        with mock.patch('sys.path', [self.root] + sys.path):
+            fingerprint = get_schema_fingerprint('unloaded_module')
+            self.assertIsNotNone(fingerprint)
+            self.assertNotIn('unloaded_module', sys.modules)
+            
+            # Only the contents count, not the modification times
+            os.utime(os.path.join(self.root, 'unloaded_module', 'models.py'), (0, 0))
+            self.assertEqual(get_schema_fingerprint('unloaded_module'), fingerprint)
+            
+            # makemigrations writing a migration for a model change is a new schema
+            self.write('unloaded_module/models.py', 'class Thing:\n    size = 1\n')
+            changed = get_schema_fingerprint('unloaded_module')
+            self.write('unloaded_module/migrations/0002_thing_size.py', '# size\n')
+            migrated = get_schema_fingerprint('unloaded_module')
+            self.assertEqual(len({fingerprint, changed, migrated}), 3)
+            self.assertEqual(get_schema_fingerprint('unloaded_module'), migrated)
+        self.assertIsNone(get_schema_fingerprint('missing_module'))
+    
+    def test_restored_graph_imports_migrations_on_demand(self):
+        built = CachedMigrationLoader(connection)
+        with mock.patch('module_engine.schema.import_module', wraps=import_module) as importer:
+            restored = CachedMigrationLoader(connection)
+            self.assertIsInstance(restored.graph.nodes, LazyMigrations)
+            self.assertEqual(set(restored.graph.nodes), set(built.graph.nodes))
+            self.assertEqual(restored.graph.leaf_nodes(), built.graph.leaf_nodes())
+            importer.assert_not_called()
+            
+            migration = restored.graph.nodes['product_module', '0001_initial']
+        importer.assert_called_once_with('product_module.migrations.0001_initial')
+        self.assertEqual(migration.name, '0001_initial')
+        self.assertIs(restored.disk_migrations['product_module', '0001_initial'], migration)
+    
+    def test_cache_key_ignores_modification_times(self):
+        loader = CachedMigrationLoader(connection)
+        key = loader.get_cache_key()
+        path = get_migration_files('product_module')[0]
+        stat = os.stat(path)
+        self.addCleanup(os.utime, path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.utime(path, (0, 0))
+        self.assertEqual(loader.get_cache_key(), key)
+
+
+class RoleSyncTests(TestCase):
+    
+    def permissions_of(self, role):
+        group = Group.objects.get(name=get_group_name('roletest', role))
+        return set(group.permissions.values_list('codename', flat=True))
+    
+    def test_only_the_difference_is_applied(self):
+        roles = {'viewer': {'can_view': True}, 'editor': {'can_view': True, 'can_change': True}}
+        self.assertEqual(sync_roles('product_module', roles, ['product'], 'roletest'), (3, 0))
+        self.assertEqual(self.permissions_of('viewer'), {'view_product'})
+        self.assertEqual(self.permissions_of('editor'), {'view_product', 'change_product'})
+        self.assertEqual(sync_roles('product_module', roles, ['product'], 'roletest'), (0, 0))
+        
+        # Permissions of other apps granted by hand are not managed
+        editor = Group.objects.get(name=get_group_name('roletest', 'editor'))
+        editor.permissions.add(Permission.objects.get(codename='view_module'))
+        roles['editor'] = {'can_view': True, 'can_change': False, 'can_delete': True}
+        with self.assertNumQueries(7):
+            self.assertEqual(sync_roles('product_module', roles, ['product'], 'roletest'), (1, 1))
+        self.assertEqual(self.permissions_of('editor'), {'view_product', 'delete_product', 'view_module'})
+        self.assertEqual(self.permissions_of('viewer'), {'view_product'})
+    
+    def test_missing_permissions_are_skipped(self):
+        self.assertIsNone(sync_roles('product_module', {'viewer': {'can_view': True}}, ['missing'], 'roletest'))
+        self.assertFalse(Group.objects.filter(name__startswith='roletest_').exists())
+
+
+@override_settings(ALLOWED_HOSTS=['*'], TENANT_TRUSTED_PROXIES=['10.0.0.1'])
+class TenantTests(TestCase):
+    
+    @classmethod
+    def setUpTestData(cls):
+        products = Module.objects.create(name='Products', identifier='product_module', version='1.0', installed=True)
+        cls.shop = Tenant.objects.create(name='Shop', slug='shop', domain='shop.example.com')
+        cls.shop.modules.add(products)
+        cls.blog = Tenant.objects.create(name='Blog', slug='blog', domain='blog.example.com')
+    
+    def setUp(self):
+        clear_tenant_caches()
+        self.addCleanup(clear_tenant_caches)
+    
+    def test_tenants_only_see_their_modules(self):
+        self.assertEqual(self.client.get('/products/list/', HTTP_HOST='shop.example.com').status_code, 200)
+        self.assertEqual(self.client.get('/products/list/', HTTP_HOST='blog.example.com').status_code, 404)
+        # Hosts without a tenant keep the global URLconf
+        self.assertEqual(self.client.get('/products/list/', HTTP_HOST='other.example.com').status_code, 200)
+    
+    def test_header_is_only_honored_from_trusted_proxies(self):
+        response = self.client.get('/products/list/', HTTP_HOST='blog.example.com', HTTP_X_TENANT='shop')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            '/products/list/', HTTP_HOST='blog.example.com', HTTP_X_TENANT='shop', REMOTE_ADDR='10.0.0.1',
+        )
+        self.assertEqual(response.status_code, 200)
+    
+    def test_changing_the_module_set_takes_effect(self):
+        self.assertEqual(self.client.get('/products/list/', HTTP_HOST='shop.example.com').status_code, 200)
+        self.shop.modules.clear()
+        self.assertEqual(self.client.get('/products/list/', HTTP_HOST='shop.example.com').status_code, 404)
+    
+    def test_tenants_with_the_same_modules_share_a_urlconf(self):
+        self.blog.modules.set(self.shop.modules.all())
+        shop = get_tenant_urlconf(resolve_tenant(RequestFactory().get('/', HTTP_HOST='shop.example.com'))[1])
+        blog = get_tenant_urlconf(resolve_tenant(RequestFactory().get('/', HTTP_HOST='blog.example.com'))[1])
+        self.assertIs(shop, blog)
+
+
+class EventBusTests(TestCase):
+    
+    def subscribe(self, event, handler, **kwargs):
+        events.subscribe(event, handler, **kwargs)
+        self.addCleanup(events.unsubscribe, event, handler, module=kwargs.get('module'), model=kwargs.get('model'))
+        return handler
+    
+    def test_events_only_reach_their_scope(self):
+        calls = []
+        self.subscribe('bus_test', lambda **payload: calls.append(('product', payload['n'])), module='product_module')
+        self.subscribe('bus_test', lambda **payload: calls.append(('other', payload['n'])), module='other_module')
+        self.subscribe('bus_test', lambda payloads: calls.append(('batch', len(payloads))), batch=True)
+        events.publish_many('bus_test', [{'n': 1}, {'n': 2}], module='product_module')
+        self.assertEqual(calls, [('product', 1), ('product', 2), ('batch', 2)])
+    
+    def test_handler_errors_stop_delivery_and_reach_the_publisher(self):
+        calls = []
+        
+        def failing(**payload):
+            raise ValueError('handler failed')
+        
+        self.subscribe('bus_test', failing, module='product_module')
+        self.subscribe('bus_test', lambda **payload: calls.append(payload))
+        with self.assertRaisesMessage(ValueError, 'handler failed'):
+            events.publish('bus_test', module='product_module', n=1)
+        self.assertEqual(calls, [])
+    
+    def test_pre_save_handler_errors_veto_the_save(self):
+        def veto(instance, **kwargs):
+            raise ValueError(f"{instance.identifier} is locked")
+        
+        self.subscribe('pre_save', veto, model=Module)
+        with self.assertRaisesMessage(ValueError, 'bus_locked is locked'):
+            Module.objects.create(name='Locked', identifier='bus_locked', version='1.0')
+        self.assertFalse(Module.objects.filter(identifier='bus_locked').exists())
+    
+    def test_on_commit_handlers_skip_rolled_back_transactions(self):
+        calls = []
+        self.subscribe('bus_test', lambda **payload: calls.append(payload['n']), on_commit=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            events.publish('bus_test', n=1)
+        self.assertEqual(calls, [1])
+        
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    events.publish('bus_test', n=2)
+                    raise ValueError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(calls, [1])
+
+
+class BundleTests(SimpleTestCase):
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+    
+    def test_bundle_hash_is_stable(self):
+        first, manifest = build_bundle('product_module', os.path.join(self.root, 'first'))
+        # Rebuilding after the sources were touched gives the same archive
+        path = os.path.join(os.path.dirname(import_module('product_module').__file__), 'module_info.py')
+        stat = os.stat(path)
+        self.addCleanup(os.utime, path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.utime(path, None)
+        second, rebuilt = build_bundle('product_module', os.path.join(self.root, 'second'))
+        self.assertEqual(rebuilt['hash'], manifest['hash'])
+        with open(first, 'rb') as a, open(second, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+    
+    def test_bundle_hash_follows_the_file_list(self):
+        files = {'demo/a.py': 'aa', 'demo/b.py': 'bb'}
+        self.assertEqual(get_bundle_hash(files), get_bundle_hash(dict(reversed(list(files.items())))))
+        self.assertNotEqual(get_bundle_hash(files), get_bundle_hash({**files, 'demo/b.py': 'cc'}))
+        self.assertNotEqual(get_bundle_hash(files), get_bundle_hash({**files, 'demo/c.py': 'bb'}))
+    
+    def test_modified_bundles_are_rejected(self):
+        path, manifest = build_bundle('product_module', self.root)
+        tampered = os.path.join(self.root, 'tampered.zip')
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(tampered, 'w') as target:
+            for item in source.infolist():
+                data = source.read(item.filename)
+                if item.filename == 'product_module/module_info.py':
+                    data += b'\n# changed\n'
+                target.writestr(item, data)
+        with zipfile.ZipFile(tampered) as bundle:
+            with self.assertRaisesMessage(BundleError, 'product_module/module_info.py does not match its hash'):
+                read_manifest(bundle)
+        with zipfile.ZipFile(path) as bundle:
+            self.assertEqual(read_manifest(bundle)['hash'], manifest['hash'])
@@ -4,6 +4,14 @@ from . import views
 
 urlpatterns = [
     path('', views.module_list, name='module_list'),
+    path('ready/', views.readiness, name='module_readiness'),
+    path('stats/cache/', views.cache_stats, name='module_cache_stats'),
+    path('stats/admission/', views.admission_stats, name='module_admission_stats'),
+    path('stats/budgets/', views.budget_stats, name='module_budget_stats'),
+    path('profiles/', views.profile_list, name='module_profiles'),
+    path('profiles/<slug:module>/', views.profile_detail, name='module_profile_detail'),
+    path('profiles/<slug:module>/stacks.folded', views.profile_stacks, name='module_profile_stacks'),
+    path('profiles/<slug:module>/requests/<slug:profile_id>/', views.profile_request, name='module_profile_request'),
     path('<int:module_id>/install/', views.install_module, name='install_module'),
     path('<int:module_id>/upgrade/', views.upgrade_module, name='upgrade_module'),
     path('<int:module_id>/uninstall/', views.uninstall_module, name='uninstall_module'),
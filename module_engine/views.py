@@ -1,7 +1,9 @@
 # module_engine/views.py
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponse, JsonResponse
 from django.urls import reverse
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
@@ -10,7 +12,16 @@ import subprocess
 import sys
 import os
 
-from .models import Module
+from . import events
+from .models import Module, ModuleUpgrade
+from .schema import get_pending_migrations, get_schema_fingerprint
+from .warmup import get_warm_up_state, is_ready, retry_warm_up
+from .cache import get_cache_stats
+from .admission import get_admission_stats, get_in_flight
+from .budgets import get_budget_stats
+from .profiling import get_folded_stacks, get_hot_frames, get_profiled_modules, get_recent_requests, is_profiled_module, load_request
+from .purge import start_purge
+from .rolling import is_draining
 
 
 @login_required
@@ -84,7 +95,9 @@ def install_module(request, module_id):
             # Update module status in database (this works in both environments)
             module.installed = True
             module.active = True
+            module.schema_fingerprint = get_schema_fingerprint(module_name) or ''
             module.save()
+            events.publish('module_installed', module=module_name, instance=module)
             
             messages.success(request, _(f"Module {module.name} installed successfully."))
             
@@ -114,18 +127,28 @@ def upgrade_module(request, module_id):
             module_info = importlib.import_module(f"{module_name}.module_info")
             
             # Check if upgrade is needed
-            if module.version != module_info.MODULE_INFO['version']:
-                # Run migrations
-                subprocess.check_call([
-                    sys.executable, 'manage.py', 'makemigrations', module_name
-                ])
-                subprocess.check_call([
-                    sys.executable, 'manage.py', 'migrate', module_name
-                ])
+            if module.upgrades.exclude(phase__in=[ModuleUpgrade.DONE, ModuleUpgrade.FAILED]).exists():
+                messages.error(request, _(f"A rolling upgrade of {module.name} is in progress."))
+            elif module.version != module_info.MODULE_INFO['version']:
+                # Only touch migrations when the models or migration files changed
+                fingerprint = get_schema_fingerprint(module_name)
+                if fingerprint is None or fingerprint != module.schema_fingerprint:
+                    subprocess.check_call([
+                        sys.executable, 'manage.py', 'makemigrations', module_name
+                    ])
+                    importlib.invalidate_caches()
+                    
+                    # The cached planner decides whether migrate is needed at all
+                    if get_pending_migrations(module_name):
+                        subprocess.check_call([
+                            sys.executable, 'manage.py', 'migrate', module_name
+                        ])
+                    module.schema_fingerprint = get_schema_fingerprint(module_name) or ''
                 
                 # Update module version
                 module.version = module_info.MODULE_INFO['version']
                 module.save()
+                events.publish('module_upgraded', module=module_name, instance=module)
                 
                 messages.success(request, _(f"Module {module.name} upgraded to version {module.version}."))
             else:
@@ -156,6 +179,9 @@ def uninstall_module(request, module_id):
                 # Check if we're in a read-only environment (like Vercel)
                 readonly_env = os.environ.get('VERCEL', False)
                 
+                # Plan the data purge while the module's models are loaded
+                purge = start_purge(module_name) if request.POST.get('purge_data') else None
+                
                 if not readonly_env:
                     # For traditional deployments - update settings.py file
                     settings_path = settings.BASE_DIR / 'modular_django' / 'settings.py'
@@ -173,9 +199,21 @@ def uninstall_module(request, module_id):
                 module.installed = False
                 module.active = False
                 module.save()
+                events.publish('module_uninstalled', module=module_name, instance=module)
                 
                 messages.success(request, _(f"Module {module.name} uninstalled successfully."))
                 
+                if purge is not None:
+                    if readonly_env:
+                        messages.info(request, _(f"Run 'python manage.py purge_module_data {module_name}' to archive and delete its data."))
+                    else:
+                        # Batched and throttled; runs on after this request returns
+                        subprocess.Popen(
+                            [sys.executable, 'manage.py', 'purge_module_data', module_name],
+                            cwd=settings.BASE_DIR, start_new_session=True,
+                        )
+                        messages.info(request, _(f"Module data is being archived to {purge.archive_dir} and deleted in the background."))
+                
                 if readonly_env:
                     messages.info(request, _("You'll need to restart the application for the changes to take effect."))
                     
@@ -188,4 +226,105 @@ def uninstall_module(request, module_id):
     
     return render(request, 'module_engine/confirm_uninstall.html', {
         'module': module
+    })
+
+
+@login_required
+def cache_stats(request):
+    """Per-module cache hit/miss/eviction counters for this worker."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+    return JsonResponse({'cache': get_cache_stats()})
+
+
+@login_required
+def admission_stats(request):
+    """In-flight and queued request counts per module for this worker."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+    return JsonResponse(get_admission_stats())
+
+
+@login_required
+def budget_stats(request):
+    """Requests and budget violations per module view for this worker."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+    return JsonResponse(get_budget_stats())
+
+
+@staff_member_required
+def profile_list(request):
+    """Modules with recorded request profiles."""
+    return render(request, 'module_engine/profiles.html', {
+        'modules': get_profiled_modules(),
+    })
+
+
+@staff_member_required
+def profile_detail(request, module):
+    """Hot frames and recent profiled requests of one module."""
+    if not is_profiled_module(module):
+        raise Http404(_("No profiles recorded for this module."))
+    stacks = get_folded_stacks(module)
+    return render(request, 'module_engine/profile_detail.html', {
+        'module': module,
+        'samples': sum(stacks.values()),
+        'hot_frames': get_hot_frames(stacks),
+        'requests': get_recent_requests(module),
+    })
+
+
+@staff_member_required
+def profile_stacks(request, module):
+    """Download a module's aggregated stacks in folded (flame graph) format."""
+    if not is_profiled_module(module):
+        raise Http404(_("No profiles recorded for this module."))
+    stacks = get_folded_stacks(module)
+    response = HttpResponse(
+        ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common()),
+        content_type='text/plain; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{module}.folded"'
+    return response
+
+
+@staff_member_required
+def profile_request(request, module, profile_id):
+    """Query timeline and top stacks of one profiled request."""
+    record = load_request(module, profile_id) if is_profiled_module(module) else None
+    if record is None:
+        raise Http404(_("Profile not found."))
+    return JsonResponse(record)
+
+
+def readiness(request):
+    """Report whether this worker has finished warming up."""
+    state = get_warm_up_state()
+    if is_draining():
+        # Restarting for a rolling module upgrade
+        return JsonResponse({'status': 'draining', 'in_flight': get_in_flight()}, status=503)
+    if 'core' in state['errors']:
+        # Never send traffic to a worker whose warm-up failed; try again
+        retry_warm_up()
+        # Only the names of what failed: the details (logged by warm_up) can
+        # include hostnames or credentials and this endpoint is public
+        response = JsonResponse({'status': 'failed', 'errors': sorted(state['errors'])}, status=503)
+        response['Retry-After'] = '5'
+        return response
+    if not is_ready():
+        response = JsonResponse({'status': 'warming', 'modules': state['modules']}, status=503)
+        response['Retry-After'] = '1'
+        return response
+    
+    duration = None
+    if state['started'] and state['finished']:
+        duration = round(state['finished'] - state['started'], 3)
+    return JsonResponse({
+        'status': 'ready',
+        'pid': os.getpid(),
+        'warmup_seconds': duration,
+        'in_flight': get_in_flight(),
+        'modules': state['modules'],
+        'errors': sorted(state['errors']),
     })
\ No newline at end of file
@@ -0,0 +1,185 @@
+# module_engine/warmup.py
+"""
+Worker warm-up.
+
+After the application is loaded, each active module is primed in its own
+thread: its views and URLconf are imported, its templates compiled, its named
+URLs reversed and its content types cached. The readiness endpoint only reports
+healthy once this has finished, and not at all while the shared (core) part
+has failed; each readiness check then starts another attempt.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import NoReverseMatch, get_resolver, reverse
+
+from .registry import get_module_apps
+from .templating import get_template_engine
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_started = threading.Event()
+_warming = threading.Lock()
+_state = {
+    'started': None,
+    'finished': None,
+    'modules': {},
+    'errors': {},
+}
+
+
+def is_ready():
+    """Return True once warm-up has completed, or if it was never started, unless the core failed."""
+    if 'core' in _state['errors']:
+        return False
+    return _ready.is_set() or not _started.is_set()
+
+
+def has_failed():
+    return 'core' in _state['errors']
+
+
+def get_warm_up_state():
+    """Return a copy of the warm-up progress for the readiness endpoint."""
+    state = dict(_state)
+    state['modules'] = dict(_state['modules'])
+    state['errors'] = dict(_state['errors'])
+    return state
+
+
+def get_active_module_apps():
+    """Return (app_config, MODULE_INFO) pairs for modules marked active."""
+    modules = get_module_apps()
+    try:
+        from .models import Module
+        active = set(Module.objects.filter(active=True).values_list('identifier', flat=True))
+    except Exception:
+        # Registry table not there yet; warm everything that is loaded
+        return modules
+    return [(app_config, info) for app_config, info in modules if info['identifier'] in active]
+
+
+def warm_templates(app_path, directory='templates', using=None):
+    """Compile every template shipped in an app's templates (or jinja2) directory."""
+    count = 0
+    template_dir = os.path.join(app_path, directory)
+    for root, _, files in os.walk(template_dir):
+        for name in files:
+            if not name.endswith('.html'):
+                continue
+            template_name = os.path.relpath(os.path.join(root, name), template_dir).replace(os.sep, '/')
+            get_template(template_name, using=using)
+            count += 1
+    return count
+
+
+def warm_urls(app_name):
+    """Reverse every named URL of an app with placeholder arguments."""
+    try:
+        urls = import_module(f"{app_name}.urls")
+    except ImportError:
+        return 0
+    count = 0
+    for pattern in getattr(urls, 'urlpatterns', []):
+        if not getattr(pattern, 'name', None):
+            continue
+        converters = getattr(pattern.pattern, 'converters', {})
+        kwargs = {
+            key: 1 if converter.regex == '[0-9]+' else 'x'
+            for key, converter in converters.items()
+        }
+        try:
+            reverse(pattern.name, kwargs=kwargs or None)
+            count += 1
+        except NoReverseMatch:
+            pass
+    return count
+
+
+def warm_module(app_config, info):
+    """Prime a single module; runs in a warm-up thread."""
+    start = time.monotonic()
+    try:
+        for submodule in ('views', 'urls'):
+            try:
+                import_module(f"{app_config.name}.{submodule}")
+            except ImportError:
+                pass
+        templates = warm_templates(app_config.path)
+        engine = get_template_engine(info['identifier'])
+        if engine:
+            templates += warm_templates(app_config.path, engine, using=engine)
+        urls = warm_urls(app_config.name)
+        models = list(app_config.get_models())
+        if models:
+            # Opens this thread's connection and fills the shared content type cache
+            ContentType.objects.get_for_models(*models)
+        _state['modules'][info['identifier']] = {
+            'templates': templates,
+            'urls': urls,
+            'seconds': round(time.monotonic() - start, 3),
+        }
+    except Exception as e:
+        logger.exception("Warm-up of module %s failed", info['identifier'])
+        _state['errors'][info['identifier']] = str(e)
+    finally:
+        connections.close_all()
+
+
+def warm_up():
+    """Warm the shared parts of the site, then every active module in parallel."""
+    if not _warming.acquire(blocking=False):
+        return
+    _ready.clear()
+    _state['started'] = time.time()
+    _state['errors'].clear()
+    try:
+        # Shared pieces every module page needs
+        get_resolver()._populate()
+        get_template('base.html')
+        warm_templates(apps.get_app_config('module_engine').path)
+        # Fail readiness early if the database is unreachable
+        connections['default'].ensure_connection()
+
+        modules = get_active_module_apps()
+        if modules:
+            max_workers = getattr(settings, 'MODULE_WARMUP_THREADS', None) or len(modules)
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='warmup') as executor:
+                for app_config, info in modules:
+                    executor.submit(warm_module, app_config, info)
+    except Exception as e:
+        logger.exception("Worker warm-up failed")
+        _state['errors']['core'] = str(e)
+    finally:
+        connections.close_all()
+        _state['finished'] = time.time()
+        _ready.set()
+        _warming.release()
+
+
+def start_warm_up():
+    """Start warm-up in a background thread, once per process."""
+    if _started.is_set():
+        return
+    _started.set()
+    if not getattr(settings, 'MODULE_WARMUP', True):
+        _ready.set()
+        return
+    threading.Thread(target=warm_up, name='module-warmup', daemon=True).start()
+
+
+def retry_warm_up():
+    """Start another warm-up after the core part failed, unless one is running."""
+    if has_failed() and not _warming.locked():
+        _started.set()
+        threading.Thread(target=warm_up, name='module-warmup', daemon=True).start()
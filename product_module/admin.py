@@ -1,3 +1,71 @@
-from django.contrib import admin
+# product_module/admin.py
+from decimal import Decimal, InvalidOperation
 
-# Register your models here.
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _, ngettext
+
+from module_engine.changelist import HighVolumeModelAdmin
+
+from .inventory import SUMMARY_ID, update_products
+from .models import InventorySummary, Product
+
+
+class ProductActionForm(ActionForm):
+    value = forms.CharField(label=_("Value"), required=False, widget=forms.TextInput(attrs={'size': 8}))
+
+
+@admin.register(Product)
+class ProductAdmin(HighVolumeModelAdmin):
+    list_display = ['name', 'barcode', 'price', 'stock', 'updated_at']
+    # Exact barcode and (case-sensitive) name prefix lookups can both use an index
+    search_fields = ['=barcode', '^name']
+    ordering = ['-pk']
+    readonly_fields = ['created_at', 'updated_at']
+    action_form = ProductActionForm
+    actions = ['add_stock', 'set_stock', 'set_price']
+    
+    def get_estimated_count(self, request):
+        # The inventory summary keeps an exact product count
+        count = InventorySummary.objects.filter(pk=SUMMARY_ID).values_list('product_count', flat=True).first()
+        return count if count is not None else super().get_estimated_count(request)
+    
+    def get_action_value(self, request, integer=False):
+        try:
+            value = Decimal(request.POST.get('value', '').strip())
+        except InvalidOperation:
+            value = None
+        if value is None or not value.is_finite() or (integer and value != value.to_integral_value()):
+            self.message_user(request, _("Enter a valid value for this action."), messages.ERROR)
+            return None
+        return int(value) if integer else value
+    
+    def run_update(self, request, queryset, **changes):
+        count = update_products(queryset, **changes)
+        self.message_user(request, ngettext(
+            "%(count)d product was updated.", "%(count)d products were updated.", count,
+        ) % {'count': count}, messages.SUCCESS)
+    
+    @admin.action(description=_("Add value to stock of selected products"), permissions=['change'])
+    def add_stock(self, request, queryset):
+        value = self.get_action_value(request, integer=True)
+        if value is not None:
+            self.run_update(request, queryset, stock=F('stock') + value)
+    
+    @admin.action(description=_("Set stock of selected products to value"), permissions=['change'])
+    def set_stock(self, request, queryset):
+        value = self.get_action_value(request, integer=True)
+        if value is not None:
+            self.run_update(request, queryset, stock=value)
+    
+    @admin.action(description=_("Set price of selected products to value"), permissions=['change'])
+    def set_price(self, request, queryset):
+        value = self.get_action_value(request)
+        if value is None:
+            return
+        if value < 0:
+            self.message_user(request, _("Prices cannot be negative."), messages.ERROR)
+            return
+        self.run_update(request, queryset, price=value.quantize(Decimal('0.01')))
@@ -8,5 +8,8 @@ class ProductModuleConfig(AppConfig):
     verbose_name = "Product Management"
     
     def ready(self):
-        # Just import the signals - no need to connect them here
-        import product_module.permissions
\ No newline at end of file
+        # Importing these subscribes them on the module event bus
+        # (roles are synced after migrate by module_engine.roles)
+        import product_module.inventory
+        import product_module.changefeed
+        import product_module.prerender
\ No newline at end of file
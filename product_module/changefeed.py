@@ -0,0 +1,162 @@
+# product_module/changefeed.py
+"""
+Delta-sync change feed for catalog clients.
+
+Changes are ordered by ``(timestamp, kind, id)`` where kind 0 is a created or
+updated product (``updated_at``) and kind 1 a deleted one (a tombstone's
+``deleted_at``). A cursor is the position of the last change a client has
+seen, so each page is a keyset range scan on the two indexes.
+
+Cursors handed out in the middle of a full sync carry an ``f`` prefix. Their
+position is the ``updated_at`` of the last product sent, which may be older
+than the tombstone retention window, so only incremental cursors can expire.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+from module_engine import events
+
+from .models import Product, ProductTombstone
+
+UPDATED = 0
+DELETED = 1
+
+# Changes younger than this are held back so that transactions which took
+# their timestamp earlier but commit later are not skipped by clients
+SETTLE_SECONDS = 2
+
+# Tombstones older than this are pruned; older cursors must resync
+TOMBSTONE_RETENTION_DAYS = 30
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+FULL_SYNC_PREFIX = 'f'
+
+PRODUCT_FIELDS = ['id', 'barcode', 'name', 'price', 'stock', 'updated_at']
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def to_micros(value):
+    """Return a datetime as integer microseconds since the epoch."""
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def encode_cursor(micros, kind, pk, full_sync=False):
+    return f"{FULL_SYNC_PREFIX if full_sync else ''}{micros}.{kind}.{pk}"
+
+
+def is_full_sync_cursor(cursor):
+    return cursor.startswith(FULL_SYNC_PREFIX)
+
+
+def decode_cursor(cursor):
+    """Return ``(datetime, kind, id)`` for a cursor string."""
+    if is_full_sync_cursor(cursor):
+        cursor = cursor[len(FULL_SYNC_PREFIX):]
+    try:
+        micros, kind, pk = (int(part) for part in cursor.split('.'))
+    except ValueError:
+        raise InvalidCursor(cursor)
+    if kind not in (UPDATED, DELETED):
+        raise InvalidCursor(cursor)
+    return from_micros(micros), kind, pk
+
+
+def after(field, position, own_kind):
+    """Q for rows of ``own_kind`` that sort after the cursor position."""
+    timestamp, kind, pk = position
+    condition = Q(**{f"{field}__gt": timestamp})
+    if own_kind > kind:
+        condition |= Q(**{field: timestamp})
+    elif own_kind == kind:
+        condition |= Q(**{field: timestamp, 'id__gt': pk})
+    return condition
+
+
+def get_changes(cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return the next page of catalog changes after ``cursor``.
+
+    Without a cursor every product is returned (a full sync) and deletions are
+    omitted. Raises InvalidCursor or CursorExpired.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    horizon = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+
+    full_sync = not cursor or is_full_sync_cursor(cursor)
+    if cursor:
+        position = decode_cursor(cursor)
+        retention = timezone.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        if not full_sync and position[0] < retention:
+            raise CursorExpired(cursor)
+    else:
+        position = (EPOCH, UPDATED, 0)
+
+    updated = list(
+        Product.objects.filter(after('updated_at', position, UPDATED), updated_at__lt=horizon)
+        .order_by('updated_at', 'id')
+        .values_list(*PRODUCT_FIELDS)[:limit + 1]
+    )
+    deleted = []
+    if cursor:
+        deleted = list(
+            ProductTombstone.objects.filter(after('deleted_at', position, DELETED), deleted_at__lt=horizon)
+            .order_by('deleted_at', 'id')
+            .values_list('deleted_at', 'id', 'product_id', 'barcode')[:limit + 1]
+        )
+
+    # Merge both streams in cursor order and cut the page
+    changes = sorted(
+        [(row[5], UPDATED, row[0], row) for row in updated]
+        + [(row[0], DELETED, row[1], row) for row in deleted]
+    )
+    more = len(changes) > limit
+    changes = changes[:limit]
+
+    page = {'fields': PRODUCT_FIELDS, 'updated': [], 'deleted': [], 'cursor': cursor, 'more': more}
+    for timestamp, kind, pk, row in changes:
+        if kind == UPDATED:
+            pk, barcode, name, price, stock, updated_at = row
+            page['updated'].append([pk, barcode, name, str(price), stock, to_micros(updated_at)])
+        else:
+            page['deleted'].append([row[2], row[3]])
+        page['cursor'] = encode_cursor(to_micros(timestamp), kind, pk, full_sync)
+    if not more:
+        # Caught up: everything before the horizon has been seen, so move the
+        # cursor there and keep idle clients inside the retention window
+        page['cursor'] = encode_cursor(to_micros(horizon), UPDATED, 0)
+    return page
+
+
+def prune_tombstones(days=TOMBSTONE_RETENTION_DAYS, batch_size=1000):
+    """Delete tombstones older than the retention window in bounded batches."""
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+    while True:
+        ids = list(ProductTombstone.objects.filter(deleted_at__lt=cutoff).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += ProductTombstone.objects.filter(id__in=ids).delete()[0]
+
+
+@events.receiver('post_delete', model=Product)
+def record_tombstone(sender, instance, **kwargs):
+    """Leave a tombstone behind so sync clients learn about the deletion."""
+    ProductTombstone.objects.create(product_id=instance.pk, barcode=instance.barcode)
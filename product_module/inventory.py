@@ -0,0 +1,251 @@
+# product_module/inventory.py
+"""
+Incrementally maintained inventory aggregates.
+
+Every product save, delete, stock adjustment and bulk update applies the difference between
+the product's old and new contribution to ``InventorySummary`` and
+``PriceBand`` with ``F()`` updates, so dashboards never scan the product table.
+The old contribution is read from the stored row under a row lock, and the
+rows themselves are created by a data migration.
+"""
+import logging
+
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from module_engine import events
+
+from .models import InventorySummary, PriceBand, Product
+
+logger = logging.getLogger(__name__)
+
+# Products with stock at or below this level count as low stock
+LOW_STOCK_THRESHOLD = 5
+
+# Lower bounds of the price histogram buckets; the last band is open-ended
+PRICE_BANDS = [Decimal(bound) for bound in ('0', '10', '25', '50', '100', '250', '500', '1000')]
+
+SUMMARY_ID = 1
+
+
+def get_price_band(price):
+    """Return the index of the price band a price falls into."""
+    return max(bisect_right(PRICE_BANDS, price) - 1, 0)
+
+
+def get_contribution(price, stock):
+    """Return what a single product adds to the aggregates."""
+    return {
+        'count': 1,
+        'stock': stock,
+        'value': price * stock,
+        'low': 1 if stock <= LOW_STOCK_THRESHOLD else 0,
+        'band': get_price_band(price),
+    }
+
+
+def empty_totals():
+    """Return aggregates for an empty catalog."""
+    return {
+        'product_count': 0,
+        'total_stock': 0,
+        'total_stock_value': Decimal('0.00'),
+        'low_stock_count': 0,
+        'bands': {index: {'product_count': 0, 'total_stock': 0} for index in range(len(PRICE_BANDS))},
+    }
+
+
+def add_contribution(totals, contribution, sign=1):
+    """Add (or with sign=-1 remove) a product contribution to a totals dict."""
+    totals['product_count'] += sign * contribution['count']
+    totals['total_stock'] += sign * contribution['stock']
+    totals['total_stock_value'] += sign * contribution['value']
+    totals['low_stock_count'] += sign * contribution['low']
+    band = totals['bands'][contribution['band']]
+    band['product_count'] += sign * contribution['count']
+    band['total_stock'] += sign * contribution['stock']
+    return totals
+
+
+def apply_delta(old=None, new=None):
+    """
+    Apply the change from one product contribution to another.
+
+    ``old`` is None for newly created products and ``new`` is None for deleted
+    ones.
+    """
+    delta = empty_totals()
+    if old:
+        add_contribution(delta, old, sign=-1)
+    if new:
+        add_contribution(delta, new)
+    apply_totals_delta(delta)
+
+
+def apply_totals_delta(delta):
+    """Apply a totals dict (as built by empty_totals) as an F() increment."""
+    with transaction.atomic():
+        updated = InventorySummary.objects.filter(pk=SUMMARY_ID).update(
+            product_count=F('product_count') + delta['product_count'],
+            total_stock=F('total_stock') + delta['total_stock'],
+            total_stock_value=F('total_stock_value') + delta['total_stock_value'],
+            low_stock_count=F('low_stock_count') + delta['low_stock_count'],
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            # Seeded by migration 0005; never rebuilt here, inside a write
+            logger.warning("Inventory summary is missing; run 'manage.py reconcile_inventory' to rebuild it")
+            return
+
+        for index, band in delta['bands'].items():
+            if band['product_count'] or band['total_stock']:
+                PriceBand.objects.filter(index=index).update(
+                    product_count=F('product_count') + band['product_count'],
+                    total_stock=F('total_stock') + band['total_stock'],
+                )
+
+
+def compute_totals(chunk_size=2000):
+    """Recompute the aggregates from the product table, one chunk at a time."""
+    totals = empty_totals()
+    last_pk = 0
+    while True:
+        rows = list(
+            Product.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'price', 'stock')[:chunk_size]
+        )
+        if not rows:
+            return totals
+        for pk, price, stock in rows:
+            add_contribution(totals, get_contribution(price, stock))
+        last_pk = rows[-1][0]
+
+
+def read_totals():
+    """Return the stored aggregates in the same shape as compute_totals."""
+    totals = empty_totals()
+    summary = InventorySummary.objects.filter(pk=SUMMARY_ID).first()
+    if summary:
+        for field in ('product_count', 'total_stock', 'total_stock_value', 'low_stock_count'):
+            totals[field] = getattr(summary, field)
+    for band in PriceBand.objects.all():
+        totals['bands'][band.index] = {
+            'product_count': band.product_count,
+            'total_stock': band.total_stock,
+        }
+    return totals
+
+
+def reconcile_totals(chunk_size=2000, dry_run=False):
+    """
+    Recompute the aggregates and correct the stored ones; return ``(stored, expected)``.
+
+    The summary row stays locked until the corrected totals are written, so
+    saves that commit meanwhile wait and apply their change on top instead of
+    being overwritten.
+    """
+    with transaction.atomic():
+        list(InventorySummary.objects.select_for_update().filter(pk=SUMMARY_ID))
+        stored = read_totals()
+        expected = compute_totals(chunk_size)
+        if not dry_run and stored != expected:
+            write_totals(expected)
+    return stored, expected
+
+
+def write_totals(totals):
+    """Overwrite the stored aggregates with the given totals."""
+    with transaction.atomic():
+        InventorySummary.objects.update_or_create(pk=SUMMARY_ID, defaults={
+            'product_count': totals['product_count'],
+            'total_stock': totals['total_stock'],
+            'total_stock_value': totals['total_stock_value'],
+            'low_stock_count': totals['low_stock_count'],
+        })
+        PriceBand.objects.exclude(index__in=totals['bands'].keys()).delete()
+        for index, band in totals['bands'].items():
+            upper = PRICE_BANDS[index + 1] if index + 1 < len(PRICE_BANDS) else None
+            PriceBand.objects.update_or_create(index=index, defaults={
+                'lower_bound': PRICE_BANDS[index],
+                'upper_bound': upper,
+                'product_count': band['product_count'],
+                'total_stock': band['total_stock'],
+            })
+
+
+def adjust_stock(product_id, delta):
+    """Atomically add ``delta`` to a product's stock and update the aggregates."""
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        old = get_contribution(product.price, product.stock)
+        Product.objects.filter(pk=product_id).update(stock=F('stock') + delta, updated_at=timezone.now())
+        product.refresh_from_db(fields=['stock', 'updated_at'])
+        apply_delta(old, get_contribution(product.price, product.stock))
+        # update() sends no model signals, so tell subscribers directly
+        events.publish('product_updated', model=Product, instance=product)
+    return product
+
+
+def update_products(queryset, chunk_size=1000, **changes):
+    """
+    Apply ``changes`` to the selected products with set-based ``update()``.
+
+    The selection is walked in primary key chunks, each in its own transaction:
+    the chunk's contributions are read before and after the update and the
+    difference is applied to the aggregates. Each chunk is stamped with its own
+    ``updated_at`` so change feed readers that have moved past an earlier
+    chunk's commit still see the later ones. Returns the number of products.
+    """
+    selection = queryset.order_by('pk').values_list('pk', flat=True)
+    updated = 0
+    last_pk = 0
+    while True:
+        chunk = list(selection.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return updated
+        with transaction.atomic():
+            rows = Product.objects.filter(pk__in=chunk)
+            delta = empty_totals()
+            for price, stock in rows.select_for_update().values_list('price', 'stock'):
+                add_contribution(delta, get_contribution(price, stock), sign=-1)
+            updated += rows.update(**changes, updated_at=timezone.now())
+            products = list(rows.only('id', 'name', 'price', 'stock'))
+            for product in products:
+                add_contribution(delta, get_contribution(product.price, product.stock))
+            apply_totals_delta(delta)
+            events.publish_many('product_updated', [{'instance': product} for product in products], model=Product)
+        last_pk = chunk[-1]
+
+
+@events.receiver('pre_save', model=Product)
+@events.receiver('pre_delete', model=Product)
+def remember_inventory_state(sender, instance, **kwargs):
+    """Lock the stored row and record its price and stock before a save or delete."""
+    instance._inventory_old = None
+    if instance.pk and not kwargs.get('raw'):
+        instance._inventory_old = (
+            Product.objects.select_for_update().filter(pk=instance.pk).values_list('price', 'stock').first()
+        )
+
+
+@events.receiver('post_save', model=Product)
+def update_inventory_on_save(sender, instance, created, **kwargs):
+    """Apply the saved product's change to the aggregates."""
+    if kwargs.get('raw'):
+        return
+    old_state = getattr(instance, '_inventory_old', None)
+    old = get_contribution(*old_state) if old_state else None
+    apply_delta(old, get_contribution(Decimal(str(instance.price)), instance.stock))
+
+
+@events.receiver('post_delete', model=Product)
+def update_inventory_on_delete(sender, instance, **kwargs):
+    """Remove the deleted product, as it was stored, from the aggregates."""
+    old_state = getattr(instance, '_inventory_old', None)
+    if old_state:
+        apply_delta(get_contribution(*old_state), None)
@@ -0,0 +1,16 @@
+# product_module/management/commands/prune_product_tombstones.py
+from django.core.management.base import BaseCommand
+
+from product_module.changefeed import TOMBSTONE_RETENTION_DAYS, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed tombstones older than the retention window'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=TOMBSTONE_RETENTION_DAYS, help='Retention in days')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+    
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} tombstones"))
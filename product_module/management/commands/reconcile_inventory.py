@@ -0,0 +1,37 @@
+# product_module/management/commands/reconcile_inventory.py
+from django.core.management.base import BaseCommand
+
+from product_module.inventory import reconcile_totals
+
+
+class Command(BaseCommand):
+    help = 'Recompute the inventory summary from the product table and report drift'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Products read per query')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without correcting it')
+    
+    def handle(self, *args, **options):
+        stored, expected = reconcile_totals(options['chunk_size'], dry_run=options['dry_run'])
+        
+        drift = []
+        for field in ('product_count', 'total_stock', 'total_stock_value', 'low_stock_count'):
+            if stored[field] != expected[field]:
+                drift.append((field, stored[field], expected[field]))
+        for index, band in expected['bands'].items():
+            stored_band = stored['bands'].get(index, {'product_count': 0, 'total_stock': 0})
+            for field in ('product_count', 'total_stock'):
+                if stored_band[field] != band[field]:
+                    drift.append((f"band {index} {field}", stored_band[field], band[field]))
+        
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Inventory summary is consistent"))
+            return
+        
+        for field, stored_value, expected_value in drift:
+            self.stdout.write(f"  {field}: stored {stored_value}, actual {expected_value}")
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Found drift in {len(drift)} values"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Corrected drift in {len(drift)} values"))
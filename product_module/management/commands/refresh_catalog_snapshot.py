@@ -0,0 +1,31 @@
+# product_module/management/commands/refresh_catalog_snapshot.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from product_module.snapshot import get_snapshot_path, refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Bring the memory-mapped catalog snapshot up to date from the change feed'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild from the product table instead of applying changes')
+        parser.add_argument('--interval', type=float, default=0, help='Keep refreshing every N seconds')
+    
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            started = time.monotonic()
+            rows, changes = refresh_snapshot(full=full)
+            elapsed = time.monotonic() - started
+            if changes is None:
+                self.stdout.write(self.style.SUCCESS(f"Rebuilt {get_snapshot_path()}: {rows} products in {elapsed:.2f}s"))
+            elif changes or options['verbosity'] > 1:
+                self.stdout.write(f"Applied {changes} changes, {rows} products in {elapsed:.2f}s")
+            if not options['interval']:
+                break
+            full = False
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,105 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product_module", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventorySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "product_count",
+                    models.IntegerField(default=0, verbose_name="Product count"),
+                ),
+                (
+                    "total_stock",
+                    models.BigIntegerField(default=0, verbose_name="Total stock"),
+                ),
+                (
+                    "total_stock_value",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="Total stock value",
+                    ),
+                ),
+                (
+                    "low_stock_count",
+                    models.IntegerField(default=0, verbose_name="Low stock count"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+            ],
+            options={
+                "verbose_name": "Inventory summary",
+                "verbose_name_plural": "Inventory summaries",
+            },
+        ),
+        migrations.CreateModel(
+            name="PriceBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "index",
+                    models.PositiveSmallIntegerField(
+                        unique=True, verbose_name="Band index"
+                    ),
+                ),
+                (
+                    "lower_bound",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Lower bound"
+                    ),
+                ),
+                (
+                    "upper_bound",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="Upper bound",
+                    ),
+                ),
+                (
+                    "product_count",
+                    models.IntegerField(default=0, verbose_name="Product count"),
+                ),
+                (
+                    "total_stock",
+                    models.BigIntegerField(default=0, verbose_name="Total stock"),
+                ),
+            ],
+            options={
+                "verbose_name": "Price band",
+                "verbose_name_plural": "Price bands",
+                "ordering": ["index"],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product_module", "0002_inventory_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("product_id", models.BigIntegerField(verbose_name="Product ID")),
+                ("barcode", models.CharField(max_length=100, verbose_name="Barcode")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Deleted at"),
+                ),
+            ],
+            options={
+                "verbose_name": "Product tombstone",
+                "verbose_name_plural": "Product tombstones",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["updated_at", "id"], name="product_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="producttombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="product_tombstone_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product_module", "0003_change_feed"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="name",
+            field=models.CharField(
+                db_index=True, max_length=200, verbose_name="Product name"
+            ),
+        ),
+    ]
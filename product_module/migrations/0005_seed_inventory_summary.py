@@ -0,0 +1,50 @@
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import migrations
+
+# Copies of product_module.inventory's constants as of this migration
+LOW_STOCK_THRESHOLD = 5
+PRICE_BANDS = [Decimal(bound) for bound in ('0', '10', '25', '50', '100', '250', '500', '1000')]
+
+
+def get_price_band(price):
+    return max(bisect_right(PRICE_BANDS, price) - 1, 0)
+
+
+def seed_inventory_summary(apps, schema_editor):
+    """Create the summary row and price bands, so saves only ever apply deltas."""
+    Product = apps.get_model('product_module', 'Product')
+    InventorySummary = apps.get_model('product_module', 'InventorySummary')
+    PriceBand = apps.get_model('product_module', 'PriceBand')
+
+    summary = {'product_count': 0, 'total_stock': 0, 'total_stock_value': Decimal('0.00'), 'low_stock_count': 0}
+    bands = {index: {'product_count': 0, 'total_stock': 0} for index in range(len(PRICE_BANDS))}
+    for price, stock in Product.objects.values_list('price', 'stock').iterator():
+        summary['product_count'] += 1
+        summary['total_stock'] += stock
+        summary['total_stock_value'] += price * stock
+        summary['low_stock_count'] += 1 if stock <= LOW_STOCK_THRESHOLD else 0
+        band = bands[get_price_band(price)]
+        band['product_count'] += 1
+        band['total_stock'] += stock
+
+    InventorySummary.objects.update_or_create(pk=1, defaults=summary)
+    for index, band in bands.items():
+        upper = PRICE_BANDS[index + 1] if index + 1 < len(PRICE_BANDS) else None
+        PriceBand.objects.update_or_create(index=index, defaults={
+            'lower_bound': PRICE_BANDS[index],
+            'upper_bound': upper,
+            **band,
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product_module", "0004_product_name_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_inventory_summary, migrations.RunPython.noop),
+    ]
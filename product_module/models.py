@@ -1,12 +1,12 @@
 # product_module/models.py
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 
 
 class Product(models.Model):
     """Model representing a product."""
-    name = models.CharField(_("Product name"), max_length=200)
+    name = models.CharField(_("Product name"), max_length=200, db_index=True)
     barcode = models.CharField(_("Barcode"), max_length=100, unique=True)
     price = models.DecimalField(_("Price"), max_digits=10, decimal_places=2)
     stock = models.IntegerField(_("Stock"), default=0)
@@ -17,9 +17,71 @@ class Product(models.Model):
         verbose_name = _("Product")
         verbose_name_plural = _("Products")
         ordering = ['name']
+        indexes = [
+            # Keyset index for the change feed
+            models.Index(fields=['updated_at', 'id'], name='product_updated_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        # The inventory handlers lock the stored row in pre_save and apply the
+        # difference in post_save; both have to run in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
-        return reverse('product_detail', args=[str(self.id)])
\ No newline at end of file
+        return reverse('product_detail', args=[str(self.id)])
+
+
+class ProductTombstone(models.Model):
+    """Record of a deleted product, kept so sync clients can remove it."""
+    product_id = models.BigIntegerField(_("Product ID"))
+    barcode = models.CharField(_("Barcode"), max_length=100)
+    deleted_at = models.DateTimeField(_("Deleted at"), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Product tombstone")
+        verbose_name_plural = _("Product tombstones")
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='product_tombstone_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.barcode} (deleted {self.deleted_at})"
+
+
+class InventorySummary(models.Model):
+    """Inventory totals over all products, maintained incrementally."""
+    product_count = models.IntegerField(_("Product count"), default=0)
+    total_stock = models.BigIntegerField(_("Total stock"), default=0)
+    total_stock_value = models.DecimalField(_("Total stock value"), max_digits=20, decimal_places=2, default=0)
+    low_stock_count = models.IntegerField(_("Low stock count"), default=0)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+    
+    class Meta:
+        verbose_name = _("Inventory summary")
+        verbose_name_plural = _("Inventory summaries")
+    
+    def __str__(self):
+        return f"{self.product_count} products, {self.total_stock} in stock"
+
+
+class PriceBand(models.Model):
+    """Histogram bucket counting products whose price falls in a band."""
+    index = models.PositiveSmallIntegerField(_("Band index"), unique=True)
+    lower_bound = models.DecimalField(_("Lower bound"), max_digits=10, decimal_places=2)
+    upper_bound = models.DecimalField(_("Upper bound"), max_digits=10, decimal_places=2, null=True, blank=True)
+    product_count = models.IntegerField(_("Product count"), default=0)
+    total_stock = models.BigIntegerField(_("Total stock"), default=0)
+    
+    class Meta:
+        verbose_name = _("Price band")
+        verbose_name_plural = _("Price bands")
+        ordering = ['index']
+    
+    def __str__(self):
+        if self.upper_bound is None:
+            return f"{self.lower_bound}+"
+        return f"{self.lower_bound} - {self.upper_bound}"
@@ -7,4 +7,52 @@ MODULE_INFO = {
     'description': 'A module for managing products with barcode, price and stock.',
     'author': 'Your Name',
     'url_prefix': 'products',
+    # Render list pages with Jinja2 when it is installed (see module_engine.templating)
+    'template_engine': 'jinja2',
+    # Public catalog pages served as static files to anonymous visitors
+    'prerender': 'product_module.prerender.get_pages',
+    # Regenerates the list pages that product writes queue (prerender_pages --queued)
+    'prerender_range': 'product_module.prerender.get_list_pages',
+    # Per-worker limits enforced by module_engine's admission control
+    'admission': {
+        'max_share': 0.5,
+        'retry_after': 1,
+    },
+    # Query and latency budgets per URL name, logged by module_engine's
+    # QueryBudgetMiddleware and enforced by the generated tests in tests.py
+    # (latency only with BUDGET_TEST_LATENCY_FACTOR)
+    'budgets': {
+        'product_index': {'queries': 3, 'ms': 100},
+        'product_list': {'queries': 5, 'ms': 150},
+        'product_dashboard': {'queries': 5, 'ms': 100},
+        'product_changes': {'queries': 3, 'ms': 150},
+        'product_stock': {'queries': 3, 'ms': 50},
+        'product_create': {'queries': 3, 'ms': 150},
+        'product_detail': {'queries': 4, 'ms': 100},
+        'product_update': {'queries': 4, 'ms': 150},
+        'product_delete': {'queries': 4, 'ms': 100},
+    },
+    # Roles are synced into the product_<role> groups by the module engine
+    'roles': {
+        'manager': {
+            'can_view': True,
+            'can_add': True,
+            'can_change': True,
+            'can_delete': True,
+        },
+        'user': {
+            'can_view': True,
+            'can_add': True,
+            'can_change': True,
+            'can_delete': False,
+        },
+        'public': {
+            'can_view': True,
+            'can_add': False,
+            'can_change': False,
+            'can_delete': False,
+        },
+    },
+    'role_models': ['product'],
+    'role_group_prefix': 'product',
 }
\ No newline at end of file
@@ -0,0 +1,142 @@
+# product_module/prerender.py
+"""
+Pre-rendered public catalog pages.
+
+The landing page, every page of the product list and every product detail page
+are written as static HTML (list and detail pages with JSON alongside). When a
+product changes, its detail page and the list pages it is on are regenerated
+once the transaction commits. The list pages after it, which shift when a
+product is created or deleted, are queued for ``prerender_pages --queued`` so
+that the cost of a write does not grow with the catalog.
+"""
+from django.db import transaction
+from django.urls import reverse
+
+from module_engine import events
+from module_engine.prerender import queue_pages, remove_page, remove_pages_after, write_page
+
+from .models import Product
+
+PAGE_SIZE = 10
+PRODUCT_FIELDS = ['id', 'name', 'barcode', 'price', 'stock', 'updated_at']
+
+def get_page_count():
+    return max(1, -(-Product.objects.count() // PAGE_SIZE))
+
+
+def get_page_range(name):
+    """Return the first and last list page a product with this name can be on."""
+    before = Product.objects.filter(name__lt=name).count()
+    through = Product.objects.filter(name__lte=name).count()
+    return before // PAGE_SIZE + 1, max(before, through - 1) // PAGE_SIZE + 1
+
+
+def get_list_data(number):
+    offset = (number - 1) * PAGE_SIZE
+    products = list(Product.objects.values(*PRODUCT_FIELDS)[offset:offset + PAGE_SIZE])
+    return {'page': number, 'pages': get_page_count(), 'products': products}
+
+
+def get_detail_data(product_id):
+    return Product.objects.filter(pk=product_id).values(*PRODUCT_FIELDS).first()
+
+
+def list_path():
+    return reverse('product_list')
+
+
+def detail_path(product_id):
+    return reverse('product_detail', args=[product_id])
+
+
+def get_pages():
+    """Every public catalog page, for module_engine's pre-renderer."""
+    yield reverse('product_index'), None, None
+    for number in range(1, get_page_count() + 1):
+        yield list_path(), number, get_list_data(number)
+    for product_id in Product.objects.values_list('id', flat=True).iterator():
+        yield detail_path(product_id), None, get_detail_data(product_id)
+
+
+def get_list_pages(path, first, last=None):
+    """List pages ``first..last`` (or through the last page) for the queued pre-renderer."""
+    page_count = get_page_count()
+    for number in range(first, min(page_count, last or page_count) + 1):
+        yield list_path(), number, get_list_data(number)
+    if last is None:
+        remove_pages_after(list_path(), page_count)
+
+
+def regenerate(list_pages=(), details=()):
+    """Rewrite the given list pages and detail pages."""
+    page_count = get_page_count()
+    for number in sorted(list_pages):
+        if number <= page_count:
+            write_page(list_path(), number, get_list_data(number))
+    for product_id in details:
+        data = get_detail_data(product_id)
+        if data is None:
+            remove_page(detail_path(product_id))
+        else:
+            write_page(detail_path(product_id), None, data)
+
+
+def schedule(product_ids, list_pages, tail_from=None):
+    """
+    Regenerate products' detail pages and the given list pages once this transaction commits.
+
+    With ``tail_from`` the list pages from there on are queued for ``prerender_pages --queued``.
+    """
+    details, list_pages = list(product_ids), set(list_pages)
+    if tail_from is not None:
+        queue_pages('product_module', list_path(), tail_from)
+    # The pages belong to this transaction; a rollback discards them with it
+    transaction.on_commit(lambda: regenerate(list_pages, details))
+
+
+@events.receiver('pre_save', model=Product)
+def remember_list_position(sender, instance, **kwargs):
+    instance._prerender_old_name = None
+    if instance.pk and not kwargs.get('raw'):
+        instance._prerender_old_name = (
+            Product.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+        )
+
+
+@events.receiver('post_save', model=Product)
+def product_saved(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    first, last = get_page_range(instance.name)
+    old_name = getattr(instance, '_prerender_old_name', None)
+    if created or old_name is None:
+        # Everything after the new row shifts down; those pages are queued
+        schedule([instance.pk], range(first, last + 1), tail_from=last + 1)
+    elif old_name != instance.name:
+        # Only the pages between the old and new position change
+        old_first, old_last = get_page_range(old_name)
+        schedule([instance.pk], range(min(first, old_first), max(last, old_last) + 1))
+    else:
+        schedule([instance.pk], range(first, last + 1))
+
+
+@events.receiver('post_delete', model=Product)
+def product_deleted(sender, instance, **kwargs):
+    first, _ = get_page_range(instance.name)
+    schedule([instance.pk], [first], tail_from=first + 1)
+
+
+@events.receiver('product_updated', model=Product, batch=True)
+def products_updated(payloads):
+    """Products changed through update(); their names, and so their list pages, did not move."""
+    products = [payload['instance'] for payload in payloads]
+    if len(products) > PAGE_SIZE:
+        # A bulk update: queue one regeneration of every page for the worker.
+        # Later chunks find it pending and add nothing.
+        queue_pages('product_module')
+        return
+    list_pages = set()
+    for product in products:
+        first, last = get_page_range(product.name)
+        list_pages.update(range(first, last + 1))
+    schedule([product.pk for product in products], list_pages)
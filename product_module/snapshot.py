@@ -0,0 +1,294 @@
+# product_module/snapshot.py
+"""
+Memory-mapped catalog snapshot for price and stock reads.
+
+The snapshot is a single file of fixed-width columns, one row per product,
+sorted by a 64-bit hash of the barcode::
+
+    header (128 bytes): magic, row count, generation, watermark, built, cursor
+    hashes  uint64[n]   blake2b of the barcode, ascending
+    checks  uint64[n]   a second, independently keyed hash of the barcode
+    ids     int64[n]    product id, 0 for rows deleted since the last rebuild
+    prices  int64[n]    price in cents
+    stock   int64[n]
+    updated int64[n]    updated_at in microseconds since the epoch
+
+Workers map the file read-only and binary search the hash column in place, so
+every process on a host shares the same page cache copy and a lookup runs no
+query. The refresher (``refresh_catalog_snapshot``) follows the change feed
+from the cursor stored in the header: price and stock changes and deletions
+are patched into a copy of the columns, new products and barcode changes
+re-sort it, and the result atomically replaces the file. Readers pick up a new
+file within SNAPSHOT_CHECK_INTERVAL seconds.
+
+The watermark is the change feed horizon the snapshot is complete up to.
+Reads fall back to the database when it is older than CATALOG_SNAPSHOT_MAX_LAG
+seconds, when the file is missing or unreadable, and for barcodes the
+snapshot does not have. A row only answers for a barcode whose check value
+matches too, so an unknown barcode that collides with a stored hash goes to
+the database rather than returning another product.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from .changefeed import (
+    MAX_PAGE_SIZE, SETTLE_SECONDS, UPDATED, CursorExpired, decode_cursor, encode_cursor,
+    from_micros, get_changes, to_micros,
+)
+from .models import Product
+
+MAGIC = b'CATSNAP2'
+HEADER = struct.Struct('<8sIQqq48s')
+HEADER_SIZE = 128
+COLUMNS = [('hashes', 'Q'), ('checks', 'Q'), ('ids', 'q'), ('prices', 'q'), ('stock', 'q'), ('updated', 'q')]
+ITEM_SIZE = 8
+
+# Seconds a worker trusts its open snapshot before checking for a newer file
+SNAPSHOT_CHECK_INTERVAL = 1.0
+
+_current = {'snapshot': None, 'file': None, 'checked': None}
+_lock = threading.Lock()
+
+
+def get_snapshot_path():
+    return getattr(settings, 'CATALOG_SNAPSHOT_PATH', os.path.join(settings.BASE_DIR, '.cache', 'catalog.snapshot'))
+
+
+def get_max_lag():
+    return getattr(settings, 'CATALOG_SNAPSHOT_MAX_LAG', 30)
+
+
+def barcode_hash(barcode):
+    return int.from_bytes(hashlib.blake2b(barcode.encode(), digest_size=8).digest(), 'little')
+
+
+def barcode_check(barcode):
+    return int.from_bytes(hashlib.blake2b(barcode.encode(), digest_size=8, person=b'barcode-check').digest(), 'little')
+
+
+def to_cents(price):
+    return int(Decimal(price).scaleb(2))
+
+
+def from_cents(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def search(hashes, key):
+    """Return the index of ``key`` in a sorted hash column, or None."""
+    index = bisect_left(hashes, key)
+    if index < len(hashes) and hashes[index] == key:
+        return index
+    return None
+
+
+class Snapshot:
+    """A read-only mapping of a snapshot file; the columns are views into it."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER_SIZE:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        magic, count, generation, watermark, built, cursor = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or len(self._mmap) != HEADER_SIZE + count * ITEM_SIZE * len(COLUMNS):
+            raise ValueError(f"{path} is not a catalog snapshot")
+        self.count = count
+        self.generation = generation
+        self.watermark = watermark
+        self.built = built
+        self.cursor = cursor.rstrip(b'\0').decode()
+        view = memoryview(self._mmap)
+        for position, (name, typecode) in enumerate(COLUMNS):
+            start = HEADER_SIZE + position * count * ITEM_SIZE
+            setattr(self, name, view[start:start + count * ITEM_SIZE].cast(typecode))
+
+    def lag(self):
+        """Seconds between now and the point the snapshot is complete up to."""
+        return time.time() - self.watermark / 1e6
+
+    def get(self, barcode):
+        index = search(self.hashes, barcode_hash(barcode))
+        if index is None or not self.ids[index] or self.checks[index] != barcode_check(barcode):
+            return None
+        return {
+            'id': self.ids[index],
+            'barcode': barcode,
+            'price': from_cents(self.prices[index]),
+            'stock': self.stock[index],
+            'updated_at': from_micros(self.updated[index]),
+        }
+
+
+def get_snapshot():
+    """Return this process's mapping of the current snapshot file, or None."""
+    now = time.monotonic()
+    checked = _current['checked']
+    if checked is not None and now - checked < SNAPSHOT_CHECK_INTERVAL:
+        return _current['snapshot']
+    with _lock:
+        _current['checked'] = now
+        try:
+            stat = os.stat(get_snapshot_path())
+        except OSError:
+            _current.update({'snapshot': None, 'file': None})
+            return None
+        file = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file != _current['file']:
+            try:
+                snapshot = Snapshot(get_snapshot_path())
+            except (OSError, ValueError):
+                snapshot = None
+            # The previous mapping is unmapped once no reader holds it
+            _current.update({'snapshot': snapshot, 'file': file})
+        return _current['snapshot']
+
+
+def get_product_stock(barcode, max_lag=None):
+    """
+    Return ``id``, ``price``, ``stock`` and ``updated_at`` of a product by barcode.
+
+    ``source`` says whether the snapshot or the database answered. Returns
+    None for unknown barcodes.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None and snapshot.lag() <= (get_max_lag() if max_lag is None else max_lag):
+        entry = snapshot.get(barcode)
+        if entry is not None:
+            entry['source'] = 'snapshot'
+            return entry
+    # Missing, lagging, or a product created since the last refresh
+    entry = Product.objects.filter(barcode=barcode).values('id', 'barcode', 'price', 'stock', 'updated_at').first()
+    if entry is not None:
+        entry['source'] = 'database'
+    return entry
+
+
+# Refresher
+
+def empty_columns():
+    return {name: array(typecode) for name, typecode in COLUMNS}
+
+
+def sort_rows(rows):
+    """Return columns for ``(hash, check, id, cents, stock, updated)`` rows, colliding hashes dropped."""
+    rows.sort()
+    columns = empty_columns()
+    for index, row in enumerate(rows):
+        # Two barcodes with one hash cannot be told apart; leave them to the database
+        if (index and rows[index - 1][0] == row[0]) or (index + 1 < len(rows) and rows[index + 1][0] == row[0]):
+            continue
+        for (name, _), value in zip(COLUMNS, row):
+            columns[name].append(value)
+    return columns
+
+
+def build_columns(chunk_size=5000):
+    """Read every product; returns ``(columns, cursor)``."""
+    # Changes from the settle window on are replayed by the next refresh
+    horizon = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+    rows = [
+        (barcode_hash(barcode), barcode_check(barcode), pk, to_cents(price), stock, to_micros(updated_at))
+        for pk, barcode, price, stock, updated_at in Product.objects.order_by().values_list(
+            'id', 'barcode', 'price', 'stock', 'updated_at',
+        ).iterator(chunk_size=chunk_size)
+    ]
+    return sort_rows(rows), encode_cursor(to_micros(horizon), UPDATED, 0)
+
+
+def apply_changes(columns, cursor):
+    """
+    Apply the change feed after ``cursor`` to a copy of the columns.
+
+    Returns ``(columns, cursor, changed)``. Raises CursorExpired when the
+    snapshot is too old to be patched.
+    """
+    hashes, ids = columns['hashes'], columns['ids']
+    upserts = {}
+    changed = 0
+    while True:
+        page = get_changes(cursor, MAX_PAGE_SIZE)
+        for pk, barcode, name, price, stock, updated in page['updated']:
+            row = (barcode_hash(barcode), barcode_check(barcode), pk, to_cents(price), stock, updated)
+            index = search(hashes, row[0])
+            if index is not None and ids[index] == pk:
+                columns['prices'][index], columns['stock'][index], columns['updated'][index] = row[3:]
+            else:
+                # New product or a new barcode: needs a re-sort
+                upserts[pk] = row
+        for pk, barcode in page['deleted']:
+            upserts.pop(pk, None)
+            index = search(hashes, barcode_hash(barcode))
+            if index is not None and ids[index] == pk:
+                ids[index] = 0
+        changed += len(page['updated']) + len(page['deleted'])
+        cursor = page['cursor']
+        if not page['more']:
+            break
+
+    if upserts:
+        rows = [
+            tuple(columns[name][index] for name, _ in COLUMNS)
+            for index in range(len(hashes)) if ids[index] and ids[index] not in upserts
+        ]
+        rows.extend(upserts.values())
+        columns = sort_rows(rows)
+    return columns, cursor, changed
+
+
+def write_snapshot(path, columns, generation, cursor):
+    """Write a snapshot file next to ``path`` and atomically move it into place."""
+    count = len(columns['hashes'])
+    watermark = to_micros(decode_cursor(cursor)[0])
+    header = HEADER.pack(MAGIC, count, generation, watermark, to_micros(timezone.now()), cursor.encode())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        for name, _ in COLUMNS:
+            columns[name].tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def refresh_snapshot(full=False, path=None):
+    """
+    Bring the snapshot file up to date; returns ``(rows, changes)``.
+
+    ``changes`` is None for a full rebuild, which happens without a readable
+    snapshot, with ``full=True`` or when the stored cursor has expired.
+    """
+    path = path or get_snapshot_path()
+    try:
+        current = Snapshot(path)
+    except (OSError, ValueError):
+        current = None
+    generation = current.generation + 1 if current is not None else 1
+
+    changed = None
+    if current is not None and not full:
+        columns = empty_columns()
+        for name, _ in COLUMNS:
+            columns[name].frombytes(getattr(current, name).cast('B'))
+        try:
+            columns, cursor, changed = apply_changes(columns, current.cursor)
+        except CursorExpired:
+            changed = None
+    # Drop the old mapping before replacing the file
+    del current
+    if changed is None:
+        columns, cursor = build_columns()
+    return write_snapshot(path, columns, generation, cursor), changed
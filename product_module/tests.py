@@ -1,3 +1,187 @@
-from django.test import TestCase
+# product_module/tests.py
+import json
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from module_engine.prerender import get_page_file
+from module_engine.templating import LAYOUT_TEMPLATE
+from module_engine.testing import budget_test_case
+
+from .changefeed import TOMBSTONE_RETENTION_DAYS
+from . import inventory, snapshot
+from .models import InventorySummary, Product
+
+
+class ProductBudgetTests(budget_test_case('product_module')):
+    """Every product module page within the budgets declared in MODULE_INFO."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # More than a page of products, so per-row queries show up in the counts
+        Product.objects.bulk_create([
+            Product(name=f"Product {i:02}", barcode=f"BUDGET{i:04}", price=Decimal('9.99') + i, stock=i)
+            for i in range(25)
+        ])
+        cls.product = Product.objects.order_by('pk').first()
+    
+    def get_url_kwargs(self, url_name):
+        return {'pk': self.product.pk, 'barcode': self.product.barcode}
+
+
+class ChangeFeedTests(TestCase):
+    
+    def test_full_sync_of_products_older_than_retention(self):
+        Product.objects.bulk_create([
+            Product(name=f"Old {i}", barcode=f"OLD{i:04}", price=Decimal('1.00'), stock=i)
+            for i in range(5)
+        ])
+        old = timezone.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS + 10)
+        Product.objects.update(updated_at=old)
+        
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(reverse('product_changes'), params)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            seen.extend(row[1] for row in page['updated'])
+            cursor, pages = page['cursor'], pages + 1
+            if not page['more']:
+                break
+        
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, [f"OLD{i:04}" for i in range(5)])
+        # The caught-up cursor is incremental again
+        self.assertFalse(cursor.startswith('f'))
+    
+    def test_stale_incremental_cursor_expires(self):
+        old = timezone.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS + 1)
+        cursor = f"{int(old.timestamp() * 1000000)}.0.0"
+        response = self.client.get(reverse('product_changes'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 410)
+
+
+class SnapshotTests(TestCase):
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(directory.name, 'catalog.snapshot'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        snapshot._current.update({'snapshot': None, 'file': None, 'checked': None})
+        self.product = Product.objects.create(name='Snapshot', barcode='SNAP0001', price=Decimal('2.50'), stock=7)
+        snapshot.refresh_snapshot(full=True)
+    
+    def test_lookup_is_served_from_the_snapshot(self):
+        with self.assertNumQueries(0):
+            entry = snapshot.get_product_stock('SNAP0001')
+        self.assertEqual((entry['source'], entry['price'], entry['stock']), ('snapshot', Decimal('2.50'), 7))
+    
+    def test_hash_collision_falls_back_to_the_database(self):
+        stored_hash = snapshot.barcode_hash('SNAP0001')
+        with mock.patch.object(snapshot, 'barcode_hash', return_value=stored_hash):
+            self.assertIsNone(snapshot.get_product_stock('UNKNOWN'))
+            self.assertEqual(snapshot.get_product_stock('SNAP0001')['source'], 'snapshot')
+
+
+class PrerenderTests(TestCase):
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PRERENDER_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.product = Product.objects.create(name='Prerendered', barcode='PRE0001', price=Decimal('5.00'), stock=1)
+    
+    def read_detail(self, product):
+        path = get_page_file(reverse('product_detail', args=[product.pk]), None, 'json')
+        if not os.path.isfile(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+    
+    def test_each_transaction_renders_its_own_pages(self):
+        with self.captureOnCommitCallbacks() as other:
+            Product.objects.create(name='Other', barcode='PRE0002', price=Decimal('1.00'), stock=1)
+        with self.captureOnCommitCallbacks() as this:
+            self.product.price = Decimal('777.00')
+            self.product.save()
+        
+        # Committing the other transaction first leaves this product's page alone
+        for callback in other:
+            callback()
+        self.assertIsNone(self.read_detail(self.product))
+        for callback in this:
+            callback()
+        self.assertEqual(self.read_detail(self.product)['price'], '777.00')
+
+
+class InventoryTests(TestCase):
+    
+    def setUp(self):
+        self.product = Product.objects.create(name='Stocked', barcode='INV0001', price=Decimal('20.00'), stock=10)
+    
+    def assertTotalsConsistent(self):
+        self.assertEqual(inventory.read_totals(), inventory.compute_totals())
+    
+    def test_summary_is_seeded_and_saves_apply_deltas(self):
+        with mock.patch.object(inventory, 'compute_totals') as compute_totals:
+            Product.objects.create(name='Another', barcode='INV0002', price=Decimal('5.00'), stock=2)
+        compute_totals.assert_not_called()
+        summary = InventorySummary.objects.get()
+        self.assertEqual((summary.product_count, summary.total_stock, summary.low_stock_count), (2, 12, 1))
+        self.assertTotalsConsistent()
+    
+    def test_missing_summary_is_not_rebuilt_in_the_request(self):
+        InventorySummary.objects.all().delete()
+        with mock.patch.object(inventory, 'compute_totals') as compute_totals:
+            with self.assertLogs('product_module.inventory', 'WARNING'):
+                self.product.save()
+        compute_totals.assert_not_called()
+    
+    def test_stale_instances_apply_the_stored_state(self):
+        stale = Product.objects.get(pk=self.product.pk)
+        inventory.adjust_stock(self.product.pk, 5)
+        stale.stock = 7
+        stale.save()
+        self.assertTotalsConsistent()
+        
+        stale = Product.objects.get(pk=self.product.pk)
+        inventory.adjust_stock(self.product.pk, 3)
+        stale.delete()
+        self.assertTotalsConsistent()
+        self.assertEqual(InventorySummary.objects.get().total_stock, 0)
+    
+    def test_reconcile_corrects_drift(self):
+        InventorySummary.objects.update(total_stock=999)
+        stored, expected = inventory.reconcile_totals(dry_run=True)
+        self.assertEqual((stored['total_stock'], expected['total_stock']), (999, 10))
+        self.assertEqual(InventorySummary.objects.get().total_stock, 999)
+        inventory.reconcile_totals()
+        self.assertTotalsConsistent()
+
+
+class TemplateEngineTests(TestCase):
+    
+    def test_product_list_is_rendered_with_jinja2(self):
+        Product.objects.create(name='Rendered', barcode='JIN0001', price=Decimal('3.00'), stock=2)
+        response = self.client.get(reverse('product_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Rendered')
+        
+        template = response.resolve_template(response.template_name)
+        self.assertEqual(template.backend.name, 'jinja2')
+        # Only the shared layout goes through the Django engine
+        rendered = [template.name for template in response.templates]
+        self.assertIn(LAYOUT_TEMPLATE, rendered)
+        self.assertNotIn('product_module/product_list.html', rendered)
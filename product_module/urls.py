@@ -5,6 +5,9 @@ from . import views
 urlpatterns = [
     path('', views.index, name='product_index'),
     path('list/', views.ProductListView.as_view(), name='product_list'),
+    path('dashboard/', views.inventory_dashboard, name='product_dashboard'),
+    path('changes/', views.product_changes, name='product_changes'),
+    path('stock/<str:barcode>/', views.product_stock, name='product_stock'),
     path('create/', views.ProductCreateView.as_view(), name='product_create'),
     path('<int:pk>/', views.ProductDetailView.as_view(), name='product_detail'),
     path('<int:pk>/update/', views.ProductUpdateView.as_view(), name='product_update'),
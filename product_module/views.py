@@ -6,11 +6,19 @@ from django.contrib.auth.decorators import login_required, permission_required
 from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.utils.translation import gettext_lazy as _
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
 
-from .models import Product
+from module_engine.templating import get_template_engine
+
+from .models import Product, InventorySummary, PriceBand
 from .forms import ProductForm
 from .permissions import has_product_permission
+from .inventory import LOW_STOCK_THRESHOLD, SUMMARY_ID
+from .changefeed import DEFAULT_PAGE_SIZE, CursorExpired, InvalidCursor, get_changes
+from .prerender import PAGE_SIZE
+from .snapshot import get_product_stock
 
 
 class ProductListView(ListView):
@@ -18,7 +26,23 @@ class ProductListView(ListView):
     model = Product
     context_object_name = 'products'
     template_name = 'product_module/product_list.html'
-    paginate_by = 10
+    paginate_by = PAGE_SIZE
+    
+    @property
+    def template_engine(self):
+        # Jinja2 if the module opted in and it is installed
+        return get_template_engine('product_module')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Checked once here rather than for every row in the template
+        user = self.request.user
+        context.update({
+            'can_add': user.has_perm('product_module.add_product'),
+            'can_change': user.has_perm('product_module.change_product'),
+            'can_delete': user.has_perm('product_module.delete_product'),
+        })
+        return context
 
 
 class ProductDetailView(DetailView):
@@ -85,6 +109,56 @@ class ProductDeleteView(DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+@login_required
+def inventory_dashboard(request):
+    """Inventory totals and price histogram, read from the maintained summary."""
+    if not has_product_permission(request.user, 'can_view'):
+        return HttpResponseForbidden("You don't have permission to view products.")
+    
+    summary = InventorySummary.objects.filter(pk=SUMMARY_ID).first()
+    bands = list(PriceBand.objects.all())
+    max_count = max([band.product_count for band in bands] + [1])
+    for band in bands:
+        band.percent = round(100 * band.product_count / max_count)
+    
+    return render(request, 'product_module/inventory_dashboard.html', {
+        'summary': summary,
+        'bands': bands,
+        'low_stock_threshold': LOW_STOCK_THRESHOLD,
+    })
+
+
+@require_GET
+@gzip_page
+def product_changes(request):
+    """Products created, updated or deleted since the ``cursor`` parameter."""
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit.'}, status=400)
+    
+    try:
+        page = get_changes(request.GET.get('cursor'), limit)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+    except CursorExpired:
+        # Tombstones for this cursor may be gone; the client must resync
+        return JsonResponse({'error': 'Cursor expired, full resync required.'}, status=410)
+    
+    return JsonResponse(page, json_dumps_params={'separators': (',', ':')})
+
+
+@require_GET
+def product_stock(request, barcode):
+    """Price and stock of a product by barcode, served from the catalog snapshot."""
+    entry = get_product_stock(barcode)
+    if entry is None:
+        return JsonResponse({'error': 'Unknown barcode.'}, status=404)
+    
+    entry['price'] = str(entry['price'])
+    return JsonResponse(entry)
+
+
 def index(request):
     """Landing page for the product module."""
     return render(request, 'product_module/index.html')
\ No newline at end of file